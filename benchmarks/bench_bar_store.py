@@ -0,0 +1,45 @@
+"""Cold vs warm latency of get_historical_bars with the local bar store.
+
+Run with: uv run python -m benchmarks.bench_bar_store
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from ib_async import Stock
+
+from ibkr_mcp.bars import BarStore
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.config import ServerConfig
+from tests.fake_ib import FakeIB
+
+GATEWAY_LATENCY = 0.2
+ROUNDS = 20
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        broker = Broker(ServerConfig(_env_file=None), ib=FakeIB(latency=GATEWAY_LATENCY))
+        broker._bars = BarStore(Path(root))
+
+        start = time.perf_counter()
+        await broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+        cold = time.perf_counter() - start
+
+        warm = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            await broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+            warm.append(time.perf_counter() - start)
+
+    print(f"gateway latency: {GATEWAY_LATENCY * 1000:.0f} ms")
+    print(f"cold (1 Y daily): {cold * 1000:.1f} ms")
+    print(f"warm median:      {statistics.median(warm) * 1000:.2f} ms over {ROUNDS} runs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Latency of loading portfolio_snapshot's inputs: sequential vs concurrent.
+
+Each broker fetch is given the same simulated gateway latency so the numbers
+show the worst case, where neither input is already held in memory.
+
+Run with: uv run python -m benchmarks.bench_portfolio_snapshot
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.config import ServerConfig
+from ibkr_mcp.portfolio import PortfolioSnapshot, load_snapshot
+from tests.fake_ib import FakeIB
+
+GATEWAY_LATENCY = 0.1
+ROUNDS = 10
+
+
+def _with_latency(fn):
+    async def wrapper(*args, **kwargs):
+        await asyncio.sleep(GATEWAY_LATENCY)
+        return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+async def sequential(broker: Broker) -> PortfolioSnapshot:
+    positions = await broker.get_positions()
+    summary = await broker.get_account_summary()
+    return PortfolioSnapshot(positions=positions, summary=summary)
+
+
+async def measure(loader, broker: Broker) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await loader(broker)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def main() -> None:
+    ib = FakeIB()
+    for symbol, shares, cost in (("MSFT", 107, 380.5), ("ARCC", 1643, 19.5), ("NVDA", 67, 195.0)):
+        ib.add_position(symbol, shares, cost)
+    broker = Broker(ServerConfig(_env_file=None), ib=ib)
+    broker.get_positions = _with_latency(broker.get_positions)
+    broker.get_account_summary = _with_latency(broker.get_account_summary)
+
+    before = await measure(sequential, broker)
+    after = await measure(load_snapshot, broker)
+    print(f"per-fetch latency: {GATEWAY_LATENCY * 1000:.0f} ms")
+    print(f"sequential: {before * 1000:.1f} ms")
+    print(f"concurrent: {after * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
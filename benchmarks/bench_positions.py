@@ -0,0 +1,99 @@
+"""Memory and throughput of position records on a 10k-position synthetic book.
+
+Compares the slotted `Position` against an equivalent plain dataclass, and the
+per-object `to_dict` + `json.dumps` path against the bulk `positions_json`
+encoder.
+
+Run with: uv run python -m benchmarks.bench_positions
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import random
+import time
+import tracemalloc
+
+from ib_async import PortfolioItem, Stock
+
+from ibkr_mcp.broker import Position, positions_json
+
+N_POSITIONS = 10_000
+ROUNDS = 5
+
+# Same fields as Position, without slots, as the baseline for memory use.
+PlainPosition = dataclasses.make_dataclass(
+    "PlainPosition", [(f.name, f.type) for f in dataclasses.fields(Position)]
+)
+
+
+def synthetic_portfolio(n: int) -> list[PortfolioItem]:
+    rng = random.Random(42)
+    items = []
+    for i in range(n):
+        shares = float(rng.randint(1, 5000))
+        price = rng.uniform(5, 900)
+        cost = price * rng.uniform(0.6, 1.4)
+        items.append(
+            PortfolioItem(
+                contract=Stock(f"SYM{i}", "NASDAQ", rng.choice(["USD", "EUR", "GBP"]), conId=i),
+                position=shares,
+                marketPrice=price,
+                marketValue=shares * price,
+                averageCost=cost,
+                unrealizedPNL=shares * (price - cost),
+                realizedPNL=0.0,
+                account="U1",
+            )
+        )
+    return items
+
+
+def measure_memory(factory) -> int:
+    tracemalloc.start()
+    objects = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def measure_time(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    items = synthetic_portfolio(N_POSITIONS)
+    positions = [Position.from_portfolio_item(i) for i in items]
+
+    slotted = measure_memory(lambda: [Position.from_portfolio_item(i) for i in items])
+    plain = measure_memory(
+        lambda: [PlainPosition(**{f: getattr(p, f) for f in p.__slots__}) for p in positions]
+    )
+
+    def per_object() -> str:
+        return json.dumps([Position.from_portfolio_item(i).to_dict() for i in items])
+
+    def bulk() -> str:
+        return positions_json(items)
+
+    assert json.loads(per_object()) == json.loads(bulk())
+    t_objects = measure_time(per_object)
+    t_bulk = measure_time(bulk)
+
+    print(f"positions: {N_POSITIONS}")
+    print(f"memory, plain dataclass: {plain / 1024:.0f} KiB")
+    print(f"memory, slotted:         {slotted / 1024:.0f} KiB")
+    print(f"encode via Position.to_dict + json.dumps: {t_objects * 1000:.1f} ms "
+          f"({N_POSITIONS / t_objects:,.0f} positions/s)")
+    print(f"encode via positions_json:                {t_bulk * 1000:.1f} ms "
+          f"({N_POSITIONS / t_bulk:,.0f} positions/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Time from server start to a usable MCP session, with a slow gateway.
+
+Runs the real server over an in-memory transport with the gateway's connect
+taking GATEWAY_CONNECT seconds, and reports how long the handshake plus
+`tools/list` and the first tool call take. The blocking variant awaits the
+connection in the lifespan, as the server did before connecting in the
+background.
+
+Run with: uv run python -m benchmarks.bench_startup
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from unittest.mock import patch
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.config import ServerConfig
+from ibkr_mcp.server import mcp
+from tests.fake_ib import FakeIB
+
+GATEWAY_CONNECT = 1.0
+
+
+async def measure(blocking: bool) -> tuple[float, float]:
+    ib = FakeIB()
+    ib.connect_delay = GATEWAY_CONNECT
+    start = time.perf_counter()
+
+    broker = Broker(ServerConfig(), ib=ib)
+    if blocking:
+        # The old lifespan: nothing is served until the gateway is connected.
+        await broker.connect()
+        broker.start = lambda: None
+
+    with patch("ibkr_mcp.broker.Broker", lambda config: broker):
+        async with create_connected_server_and_client_session(mcp) as session:
+            await session.list_tools()
+            listed = time.perf_counter() - start
+            await session.call_tool("get_account_summary", {})
+            first_call = time.perf_counter() - start
+    return listed, first_call
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)
+    print(f"gateway connect time: {GATEWAY_CONNECT * 1000:.0f} ms")
+    for name, blocking in (("background", False), ("blocking", True)):
+        listed, first_call = await measure(blocking)
+        print(f"{name:>10}: tools/list after {listed * 1000:6.1f} ms, "
+              f"first tool result after {first_call * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
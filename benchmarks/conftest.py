@@ -0,0 +1,75 @@
+"""Fixtures for the pytest-benchmark suite: a real Broker on the offline gateway.
+
+The gateway, broker and event loop are shared by every benchmark in a module,
+so warm caches and subscriptions behave as in a long-running server.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any, TypeVar
+from unittest.mock import MagicMock
+
+import pytest
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.config import ServerConfig
+from ibkr_mcp.server import AppContext
+from tests.fake_gateway import FakeGateway
+
+T = TypeVar("T")
+
+# One-way delay the gateway adds to every response, in seconds.
+GATEWAY_LATENCY = 0.002
+
+
+@pytest.fixture(scope="module")
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    logging.disable(logging.INFO)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope="module")
+def gateway(loop: asyncio.AbstractEventLoop) -> Iterator[FakeGateway]:
+    gateway = FakeGateway(latency=GATEWAY_LATENCY)
+    loop.run_until_complete(gateway.start())
+    yield gateway
+    loop.run_until_complete(gateway.close())
+
+
+@pytest.fixture(scope="module")
+def ctx(
+    loop: asyncio.AbstractEventLoop,
+    gateway: FakeGateway,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[MagicMock]:
+    config = ServerConfig(
+        ib_gateway_port=gateway.port,
+        ib_account=gateway.account,
+        safety_paper_only=False,
+        # Without the bar store, repeating an identical historical request
+        # waits out IB's 15 second pacing rule.
+        bar_store_path=str(tmp_path_factory.mktemp("bars")),
+    )
+    broker = Broker(config)
+    loop.run_until_complete(broker.connect())
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = AppContext(broker=broker, config=config)
+    yield ctx
+    loop.run_until_complete(broker.disconnect())
+
+
+@pytest.fixture
+def run(loop: asyncio.AbstractEventLoop) -> Callable[[Callable[[], Awaitable[T]]], T]:
+    """Run a coroutine factory to completion on the shared loop."""
+
+    def run(factory: Callable[[], Awaitable[Any]]) -> Any:
+        return loop.run_until_complete(factory())
+
+    return run
@@ -0,0 +1,104 @@
+"""Per-tool latency and throughput against the offline gateway.
+
+Each benchmark calls a tool function the way FastMCP does, with a real Broker
+talking to `tests.fake_gateway.FakeGateway` over TCP. Results are comparable
+across runs only on the same machine; save them to track changes over time.
+
+Run with: uv run pytest benchmarks --benchmark-autosave
+Compare:  uv run pytest-benchmark compare
+"""
+from __future__ import annotations
+
+import asyncio
+
+from ibkr_mcp.tools.account import get_account_summary, get_nav, get_open_orders, get_positions
+from ibkr_mcp.tools.analysis import concentration_check, portfolio_snapshot
+from ibkr_mcp.tools.market import get_historical_bars, get_quote, get_quotes, search_contracts
+from ibkr_mcp.tools.trading import cancel_order, place_order
+
+# Concurrent calls per round in the throughput benchmarks.
+CONCURRENCY = 50
+
+
+def test_get_positions(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_positions(ctx=ctx))
+    assert len(result) == 3
+
+
+def test_get_account_summary(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_account_summary(ctx=ctx))
+    assert result["nav"] == 147527.0
+
+
+def test_get_account_summary_refresh(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_account_summary(refresh=True, ctx=ctx))
+    assert result["nav"] == 147527.0
+
+
+def test_get_nav(benchmark, run, ctx):
+    benchmark(run, lambda: get_nav(ctx=ctx))
+
+
+def test_get_open_orders(benchmark, run, ctx):
+    benchmark(run, lambda: get_open_orders(ctx=ctx))
+
+
+def test_portfolio_snapshot(benchmark, run, ctx):
+    result = benchmark(run, lambda: portfolio_snapshot(ctx=ctx))
+    assert result["total_positions"] == 3
+
+
+def test_concentration_check(benchmark, run, ctx):
+    benchmark(run, lambda: concentration_check(ctx=ctx))
+
+
+def test_get_quote(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_quote("MSFT", ctx=ctx))
+    assert result["last"] == 426.80
+
+
+def test_get_quotes(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_quotes(["MSFT", "NVDA", "ARCC"], ctx=ctx))
+    assert len(result) == 3
+
+
+def test_get_historical_bars(benchmark, run, ctx):
+    result = benchmark(run, lambda: get_historical_bars("MSFT", "1 M", "1 day", ctx=ctx))
+    assert result
+
+
+def test_search_contracts(benchmark, run, ctx):
+    benchmark(run, lambda: search_contracts("MS", ctx=ctx))
+
+
+def test_place_and_cancel_order(benchmark, run, ctx):
+    async def place_and_cancel():
+        placed = await place_order("MSFT", "BUY", 1, 400.0, ctx=ctx)
+        return await cancel_order(placed["order_id"], ctx=ctx)
+
+    result = benchmark(run, place_and_cancel)
+    assert result["status"] == "cancel_requested"
+
+
+def test_quote_throughput(benchmark, run, ctx):
+    async def burst():
+        return await asyncio.gather(*(get_quote("MSFT", ctx=ctx) for _ in range(CONCURRENCY)))
+
+    results = benchmark(run, burst)
+    assert len(results) == CONCURRENCY
+    _record_throughput(benchmark)
+
+
+def test_snapshot_throughput(benchmark, run, ctx):
+    async def burst():
+        return await asyncio.gather(*(portfolio_snapshot(ctx=ctx) for _ in range(CONCURRENCY)))
+
+    results = benchmark(run, burst)
+    assert len(results) == CONCURRENCY
+    _record_throughput(benchmark)
+
+
+def _record_throughput(benchmark) -> None:
+    # No timings are collected under --benchmark-disable (a plain smoke run).
+    if benchmark.enabled:
+        benchmark.extra_info["calls_per_sec"] = round(CONCURRENCY / benchmark.stats.stats.mean)
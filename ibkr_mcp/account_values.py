@@ -0,0 +1,60 @@
+"""Always-current account values fed by IB's account update stream."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from ib_async import AccountValue
+
+SUMMARY_TAGS = frozenset(
+    {
+        "NetLiquidation",
+        "AvailableFunds",
+        "BuyingPower",
+        "UnrealizedPnL",
+        "RealizedPnL",
+        "TotalCashValue",
+    }
+)
+
+
+class AccountValueStore:
+    """Latest value per (account, tag), maintained incrementally from pushed updates.
+
+    IB reports some tags once per currency plus a "BASE" total; the BASE row
+    wins when present. The base currency is stored as "Currency", taken from
+    the NetLiquidation row, which IB only reports in base currency. IB's own
+    "Currency" rows are ignored: the one for the BASE total reads "BASE".
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._values: dict[str, dict[str, str]] = {}
+        self._from_base: set[tuple[str, str]] = set()
+        self._updated_at: dict[str, float] = {}
+
+    def update(self, value: AccountValue) -> None:
+        if value.tag not in SUMMARY_TAGS or value.modelCode:
+            return
+        account = value.account
+        values = self._values.setdefault(account, {})
+        if value.currency == "BASE":
+            self._from_base.add((account, value.tag))
+            values[value.tag] = value.value
+        elif (account, value.tag) not in self._from_base:
+            values[value.tag] = value.value
+        if value.tag == "NetLiquidation" and value.currency not in ("", "BASE"):
+            values["Currency"] = value.currency
+        self._updated_at[account] = self._clock()
+
+    def get(self, account: str) -> tuple[dict[str, str], float] | None:
+        """Return (tag -> value, last update time) for an account, if any values arrived."""
+        values = self._values.get(account)
+        if not values or "NetLiquidation" not in values:
+            return None
+        return values, self._updated_at[account]
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._from_base.clear()
+        self._updated_at.clear()
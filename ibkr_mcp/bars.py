@@ -0,0 +1,195 @@
+"""On-disk historical bar store with incremental gap fill.
+
+Each series is identified by (conId, bar size, whatToShow, useRTH) and kept as
+one columnar JSON file. Requests are answered from the stored columns; only the
+missing head (older history than ever requested) and the stale tail are
+fetched from the gateway and merged in.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import datetime
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+BarKey = tuple[int, str, str, bool]
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+_DURATION_UNITS = {"S": 1, "D": 86400, "W": 7 * 86400, "M": 31 * 86400, "Y": 366 * 86400}
+_BAR_UNITS = {
+    "sec": 1,
+    "min": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 31 * 86400,
+}
+
+
+def duration_seconds(duration: str) -> int:
+    """Convert an IB duration string ("5 D", "1 Y") to an upper-bound number of seconds."""
+    match = re.fullmatch(r"\s*(\d+)\s*([SDWMY])\s*", duration.upper())
+    if not match:
+        raise ValueError(f"Invalid duration '{duration}'")
+    return int(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def bar_seconds(bar_size: str) -> int:
+    """Convert an IB bar size ("5 mins", "1 day") to seconds."""
+    match = re.fullmatch(r"\s*(\d+)\s*(sec|min|hour|day|week|month)s?\s*", bar_size.lower())
+    if not match:
+        raise ValueError(f"Invalid bar size '{bar_size}'")
+    return int(match.group(1)) * _BAR_UNITS[match.group(2)]
+
+
+def ib_duration(seconds: float) -> str:
+    """Smallest IB duration string covering `seconds`."""
+    if seconds < 86400:
+        return f"{max(30, math.ceil(seconds))} S"
+    days = math.ceil(seconds / 86400)
+    if days <= 365:
+        return f"{days} D"
+    return f"{math.ceil(days / 365)} Y"
+
+
+def bar_timestamp(value: datetime.date | datetime.datetime) -> float:
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.UTC)
+        return value.timestamp()
+    return datetime.datetime(value.year, value.month, value.day, tzinfo=datetime.UTC).timestamp()
+
+
+class BarSeries:
+    """Columnar bars for one key, sorted by timestamp, plus coverage metadata.
+
+    `covered_from` is the earliest start ever fetched and `fetched_at` the time
+    of the last tail fetch, so non-trading days never look like gaps.
+    """
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        self.ts: list[float] = data.get("ts", [])
+        self.columns: dict[str, list[Any]] = {c: data.get(c, []) for c in COLUMNS}
+        self.covered_from: float | None = data.get("covered_from")
+        self.fetched_at: float | None = data.get("fetched_at")
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "ts": self.ts,
+            **self.columns,
+            "covered_from": self.covered_from,
+            "fetched_at": self.fetched_at,
+        }
+
+    def missing(
+        self, duration: str, now: float, bar_size: str, max_age: float
+    ) -> list[tuple[datetime.datetime | str, str]]:
+        """Return the (endDateTime, durationStr) requests needed to cover `duration` to `now`."""
+        if not self.ts or self.covered_from is None:
+            return [("", duration)]
+
+        start = now - duration_seconds(duration)
+
+        requests: list[tuple[datetime.datetime | str, str]] = []
+        if start < self.covered_from:
+            end = datetime.datetime.fromtimestamp(self.covered_from, datetime.UTC)
+            requests.append((end, ib_duration(self.covered_from - start)))
+        step = bar_seconds(bar_size)
+        if self.fetched_at is None or now - self.fetched_at > min(step, max_age):
+            # Re-fetch the last stored bar too: it may have been incomplete.
+            requests.append(("", ib_duration(now - self.ts[-1] + step)))
+        return requests
+
+    def merge(self, rows: list[dict[str, Any]]) -> None:
+        by_ts: dict[float, tuple[Any, ...]] = {
+            ts: tuple(self.columns[c][i] for c in COLUMNS) for i, ts in enumerate(self.ts)
+        }
+        for row in rows:
+            by_ts[row["ts"]] = tuple(row[c] for c in COLUMNS)
+        self.ts = sorted(by_ts)
+        for j, c in enumerate(COLUMNS):
+            self.columns[c] = [by_ts[ts][j] for ts in self.ts]
+
+    def rows_since(self, start: float) -> list[dict[str, Any]]:
+        lo = bisect.bisect_left(self.ts, start)
+        cols = [self.columns[c][lo:] for c in COLUMNS]
+        return [dict(zip(COLUMNS, values)) for values in zip(*cols)]
+
+
+class BarStore:
+    """Bar series by key, loaded from disk on first use.
+
+    At most `max_series` series stay in memory, least recently used first out;
+    an evicted series is read back from its file when next requested. File
+    reads and writes run in a worker thread so they do not stall the event loop.
+    """
+
+    def __init__(
+        self, root: Path, max_series: int = 256, clock: Callable[[], float] = time.time
+    ) -> None:
+        self._root = root
+        self._max_series = max_series
+        self._clock = clock
+        self._series: OrderedDict[BarKey, BarSeries] = OrderedDict()
+        self._write_lock = asyncio.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def now(self) -> float:
+        return self._clock()
+
+    def _path(self, key: BarKey) -> Path:
+        con_id, bar_size, what_to_show, use_rth = key
+        name = f"{con_id}_{bar_size}_{what_to_show}_{'rth' if use_rth else 'all'}"
+        return self._root / (re.sub(r"[^A-Za-z0-9_]+", "-", name) + ".json")
+
+    async def get(self, key: BarKey) -> BarSeries:
+        series = self._series.get(key)
+        if series is None:
+            loaded = await asyncio.to_thread(self._read, self._path(key))
+            # Another caller may have loaded the same key meanwhile: share theirs.
+            series = self._series.setdefault(key, loaded)
+            while len(self._series) > self._max_series:
+                self._series.popitem(last=False)
+                self.evictions += 1
+        self._series.move_to_end(key)
+        return series
+
+    async def save(self, key: BarKey, series: BarSeries) -> None:
+        # Serialised, so an older snapshot never replaces a newer one.
+        async with self._write_lock:
+            await asyncio.to_thread(self._write, self._path(key), series.to_json())
+
+    @staticmethod
+    def _read(path: Path) -> BarSeries:
+        try:
+            return BarSeries(json.loads(path.read_text()))
+        except FileNotFoundError:
+            return BarSeries()
+        except (OSError, ValueError) as e:
+            log.warning("Discarding unreadable bar file %s: %s", path, e)
+            return BarSeries()
+
+    @staticmethod
+    def _write(path: Path, data: dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
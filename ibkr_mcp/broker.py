@@ -1,18 +1,64 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import datetime
+import functools
+import json
 import logging
+import math
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass, field
-from typing import Any
-
-from ib_async import IB, Contract, LimitOrder, Order, PortfolioItem, Stock, Trade, util
-
+from json.encoder import encode_basestring_ascii
+from pathlib import Path
+from typing import Any, TypeVar
+
+from ib_async import (
+    IB,
+    AccountValue,
+    Contract,
+    Forex,
+    LimitOrder,
+    Order,
+    OrderStatus,
+    PortfolioItem,
+    Position as Holding,
+    Stock,
+    Ticker,
+    Trade,
+    util,
+)
+
+from ibkr_mcp.account_values import AccountValueStore
+from ibkr_mcp.bars import BarStore, bar_timestamp, duration_seconds
+from ibkr_mcp.clients import ClientPool
 from ibkr_mcp.config import ServerConfig
+from ibkr_mcp.contracts import ContractCache, contract_key
+from ibkr_mcp.fx import FxRateCache, fx_pair, is_currency, quote_rate
+from ibkr_mcp.metrics import REGISTRY, instrument_methods
+from ibkr_mcp.orders import (
+    ACKNOWLEDGED_STATES,
+    OpenOrder,
+    OrderBook,
+    OrderRequest,
+    order_state,
+)
+from ibkr_mcp.pacing import HistoricalPacer, MessageThrottle, PacingKey
+from ibkr_mcp.singleflight import SingleFlight
+from ibkr_mcp.subscriptions import SubscriptionManager
+from ibkr_mcp.supervisor import ConnectionSupervisor
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Attempts for an idempotent read that fails because the connection dropped.
+_READ_ATTEMPTS = 3
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Position:
     symbol: str
     sec_type: str
@@ -49,6 +95,30 @@ class Position:
             con_id=item.contract.conId,
         )
 
+    @classmethod
+    def from_holding(cls, item: Holding, price: float | None) -> Position:
+        """From IB's position stream, which carries no prices.
+
+        Valued at `price`, or at cost when there is no quote.
+        """
+        c = item.contract
+        multiplier = float(c.multiplier or 1)
+        cost_basis = item.avgCost * item.position
+        market_value = item.position * price * multiplier if price else cost_basis
+        return cls(
+            symbol=c.symbol,
+            sec_type=c.secType,
+            exchange=c.exchange or c.primaryExchange or "",
+            currency=c.currency,
+            shares=item.position,
+            avg_cost=item.avgCost,
+            market_price=price or item.avgCost / multiplier,
+            market_value=market_value,
+            unrealized_pnl=market_value - cost_basis,
+            realized_pnl=0.0,
+            con_id=c.conId,
+        )
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "symbol": self.symbol,
@@ -66,14 +136,46 @@ class Position:
         }
 
 
-@dataclass
+def _json_number(x: float) -> str:
+    return repr(x) if math.isfinite(x) else json.dumps(x)
+
+
+def positions_json(items: Iterable[PortfolioItem]) -> str:
+    """Encode portfolio items as a JSON array of `Position.to_dict` objects.
+
+    Bulk path for large books: goes straight from ib_async objects to the
+    encoded payload without building `Position`s or intermediate dicts.
+    """
+    enc, num = encode_basestring_ascii, _json_number
+    parts = []
+    for item in items:
+        c = item.contract
+        cost_basis = item.averageCost * item.position
+        pnl_pct = item.unrealizedPNL / cost_basis if cost_basis != 0 else 0.0
+        parts.append(
+            f'{{"symbol":{enc(c.symbol)},"sec_type":{enc(c.secType)},'
+            f'"exchange":{enc(c.exchange or c.primaryExchange or "")},'
+            f'"currency":{enc(c.currency)},"shares":{num(item.position)},'
+            f'"avg_cost":{num(round(item.averageCost, 4))},'
+            f'"market_price":{num(round(item.marketPrice, 4))},'
+            f'"market_value":{num(round(item.marketValue, 2))},'
+            f'"unrealized_pnl":{num(round(item.unrealizedPNL, 2))},'
+            f'"realized_pnl":{num(round(item.realizedPNL, 2))},'
+            f'"pnl_pct":{num(round(pnl_pct * 100, 2))},"con_id":{c.conId}}}'
+        )
+    return "[" + ",".join(parts) + "]"
+
+
+@dataclass(frozen=True, slots=True)
 class AccountSummary:
     nav: float
     available_funds: float
     buying_power: float
     unrealized_pnl: float
     realized_pnl: float
+    cash: float = 0.0
     currency: str = "USD"
+    as_of: float | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -82,11 +184,17 @@ class AccountSummary:
             "buying_power": round(self.buying_power, 2),
             "unrealized_pnl": round(self.unrealized_pnl, 2),
             "realized_pnl": round(self.realized_pnl, 2),
+            "cash": round(self.cash, 2),
             "currency": self.currency,
+            "as_of": (
+                datetime.datetime.fromtimestamp(self.as_of, datetime.UTC).isoformat()
+                if self.as_of is not None
+                else None
+            ),
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ContractMatch:
     con_id: int
     symbol: str
@@ -106,92 +214,464 @@ class ContractMatch:
         }
 
 
-@dataclass
-class OpenOrder:
-    order_id: int
-    symbol: str
-    action: str
-    quantity: float
-    order_type: str
-    limit_price: float | None
-    status: str
+def quote_price(quote: dict[str, Any]) -> float | None:
+    """Price to value a position at: last trade, else previous close, else mid."""
+    for key in ("last", "close"):
+        if quote.get(key):
+            return quote[key]
+    if quote.get("bid") and quote.get("ask"):
+        return (quote["bid"] + quote["ask"]) / 2
+    return None
 
-    def to_dict(self) -> dict[str, Any]:
-        return {
-            "order_id": self.order_id,
-            "symbol": self.symbol,
-            "action": self.action,
-            "quantity": self.quantity,
-            "order_type": self.order_type,
-            "limit_price": self.limit_price,
-            "status": self.status,
-        }
 
+def _has_price(ticker: Ticker) -> bool:
+    return not (util.isNan(ticker.last) and util.isNan(ticker.close))
+
+
+async def _wait_for_price(ticker: Ticker, timeout: float) -> bool:
+    """Wait until the ticker carries a last or close price, or the deadline passes.
+
+    Completion is driven by the ticker's update event, so this returns as soon
+    as the gateway delivers a price. Returns False if the deadline passed first;
+    the ticker then holds whatever partial data (e.g. bid/ask only) arrived.
+    """
+    if _has_price(ticker):
+        return True
+
+    done = asyncio.get_running_loop().create_future()
+
+    def on_update(t: Ticker) -> None:
+        if _has_price(t) and not done.done():
+            done.set_result(None)
+
+    ticker.updateEvent += on_update
+    try:
+        await asyncio.wait_for(done, timeout)
+        return True
+    except TimeoutError:
+        return False
+    finally:
+        ticker.updateEvent -= on_update
 
+
+def _account_summary(values: dict[str, str], as_of: float | None) -> AccountSummary:
+    return AccountSummary(
+        nav=float(values.get("NetLiquidation", "0")),
+        available_funds=float(values.get("AvailableFunds", "0")),
+        buying_power=float(values.get("BuyingPower", "0")),
+        unrealized_pnl=float(values.get("UnrealizedPnL", "0")),
+        realized_pnl=float(values.get("RealizedPnL", "0")),
+        cash=float(values.get("TotalCashValue", "0")),
+        currency=values.get("Currency", "USD"),
+        as_of=as_of,
+    )
+
+
+@instrument_methods("broker")
 class Broker:
-    def __init__(self, config: ServerConfig) -> None:
+    def __init__(
+        self, config: ServerConfig, ib: IB | None = None, pool: ClientPool | None = None
+    ) -> None:
         self._config = config
-        self._ib = IB()
+        self._pool = pool or ClientPool.create(config.ib_pool_size, config.ib_client_id, ib)
+        # The master client: orders, account and portfolio streams, contract lookups.
+        self._ib = self._pool.master
+        self._subscriptions = SubscriptionManager(
+            self._pool.route("market_data"),
+            max_lines=config.market_data_lines,
+            idle_ttl=config.stream_idle_ttl,
+        )
+        self._contracts = ContractCache(
+            max_size=config.contract_cache_size,
+            ttl=config.contract_cache_ttl,
+        )
+        self._contract_cache_path = (
+            Path(config.contract_cache_path) if config.contract_cache_path else None
+        )
+        self._fx = FxRateCache(ttl=config.fx_rate_ttl)
+        self._pacer = HistoricalPacer()
+        self._flights = SingleFlight()
+        self._account_values = AccountValueStore()
+        self._account_slots = asyncio.Semaphore(config.account_concurrency)
+        self._versions: Counter[str] = Counter()
+        self._change_listeners: list[Callable[[str], None]] = []
+        self._ib.accountValueEvent += self._on_account_value
+        self._ib.updatePortfolioEvent += lambda _: self._bump("positions")
+        self._orders = OrderBook(config.ib_client_id, retention=config.order_retention)
+        self._order_throttle = MessageThrottle(config.order_rate)
+        self._ib.orderStatusEvent += self._on_order
+        self._ib.openOrderEvent += self._on_order
+        self._ib.cancelOrderEvent += self._on_order
+        self._ib.execDetailsEvent += lambda trade, _: self._on_order(trade)
+        self._bars = (
+            BarStore(Path(config.bar_store_path), max_series=config.bar_store_series)
+            if config.bar_store_path
+            else None
+        )
+        self._supervisor = ConnectionSupervisor(
+            self._open,
+            on_connect=self._on_connect,
+            initial_delay=config.reconnect_initial_delay,
+            max_delay=config.reconnect_max_delay,
+        )
+        self._ib.disconnectedEvent += self._supervisor.connection_lost
+        self._client_tasks: set[asyncio.Task[None]] = set()
+        for client in self._pool.clients[1:]:
+            client.disconnectedEvent += functools.partial(self._client_lost, client)
 
     async def connect(self) -> None:
+        """Connect to the gateway, raising if it cannot be reached."""
+        self._load_contract_cache()
+        await self._supervisor.start()
+
+    def start(self) -> None:
+        """Connect in the background, retrying until the gateway is reachable.
+
+        Requests made meanwhile wait for the connection (see `wait_ready`).
+        """
+        self._load_contract_cache()
+        self._supervisor.start_background()
+
+    async def wait_ready(self) -> None:
+        """Wait for the gateway connection, up to `reconnect_timeout` seconds."""
+        await self._supervisor.wait_ready(self._config.reconnect_timeout)
+
+    def _load_contract_cache(self) -> None:
+        if self._contract_cache_path:
+            loaded = self._contracts.load(self._contract_cache_path)
+            log.info("Loaded %d cached contracts from %s", loaded, self._contract_cache_path)
+
+    async def _open(self) -> None:
+        self._cancel_client_tasks()
         log.info(
             "Connecting to IB Gateway at %s:%s",
             self._config.ib_gateway_host,
             self._config.ib_gateway_port,
         )
-        await self._ib.connectAsync(
+        await self._pool.connect(
             host=self._config.ib_gateway_host,
             port=self._config.ib_gateway_port,
-            clientId=1,
             readonly=self._config.safety_paper_only,
+            account=self._config.ib_account,
         )
         log.info("Connected — managed accounts: %s", self._ib.managedAccounts())
 
+    def _on_connect(self) -> None:
+        # Caches (contracts, account values, bars) survive a reconnect, so
+        # only the market data streams need to be requested again.
+        self._subscriptions.use(self._pool.route("market_data"))
+        self._subscriptions.resubscribe()
+        self._orders.reset(self._ib.trades())
+
+    def _client_lost(self, client: IB) -> None:
+        """Reconnect a dropped data client alone; the master and its streams stay up."""
+        if not self._ib.isConnected() or not self._supervisor.is_ready:
+            # Shutting down, or a full reconnect is under way and covers this client.
+            return
+        log.warning("Lost a data client connection; reconnecting it")
+        self._pool.release(client)
+        self._subscriptions.move_to(self._pool.route("market_data"))
+        task = asyncio.ensure_future(self._reconnect_client(client))
+        self._client_tasks.add(task)
+        task.add_done_callback(self._client_tasks.discard)
+
+    async def _reconnect_client(self, client: IB) -> None:
+        if await self._pool.reconnect(client):
+            self._subscriptions.move_to(self._pool.route("market_data"))
+
+    def _cancel_client_tasks(self) -> None:
+        for task in self._client_tasks:
+            task.cancel()
+        self._client_tasks.clear()
+
+    async def _read(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Run an idempotent read, retrying it if the connection drops meanwhile.
+
+        While a reconnect is in progress the read waits for it, up to
+        `reconnect_timeout` seconds, instead of failing straight away.
+        """
+        attempt = 1
+        while True:
+            await self.wait_ready()
+            try:
+                return await request()
+            except ConnectionError:
+                if attempt >= _READ_ATTEMPTS:
+                    raise
+                attempt += 1
+                log.info("Connection lost during request; retrying after reconnect")
+
     async def disconnect(self) -> None:
+        self._supervisor.close()
+        self._cancel_client_tasks()
+        if self._contract_cache_path:
+            self._contracts.save(self._contract_cache_path)
+        self._subscriptions.clear()
         if self._ib.isConnected():
-            self._ib.disconnect()
+            self._pool.disconnect()
             log.info("Disconnected from IB Gateway")
 
+    @property
+    def _account(self) -> str:
+        """The configured account, or the first managed account when unset.
+
+        Managed accounts are only known once connected: await `wait_ready` first.
+        """
+        if self._config.ib_account:
+            return self._config.ib_account
+        accounts = self._ib.managedAccounts()
+        return accounts[0] if accounts else ""
+
     @property
     def is_connected(self) -> bool:
         return self._ib.isConnected()
 
-    # --- Account ---
+    def data_version(self, kind: str) -> int:
+        """Counter that changes whenever IB pushes an update for `kind`.
 
-    async def get_positions(self) -> list[Position]:
-        portfolio = self._ib.portfolio(self._config.ib_account or None)
-        return [Position.from_portfolio_item(item) for item in portfolio]
+        Kinds are "positions", "account" and "orders".
+        """
+        return self._versions[kind]
 
-    async def get_account_summary(self) -> AccountSummary:
-        account = self._config.ib_account or ""
-        tags = "NetLiquidation,AvailableFunds,BuyingPower,UnrealizedPnL,RealizedPnL,Currency"
-        values = await self._ib.accountSummaryAsync(account=account)
+    def on_change(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(kind)` whenever `data_version(kind)` changes."""
+        self._change_listeners.append(listener)
 
-        result: dict[str, str] = {}
-        for v in values:
-            if v.tag in tags.split(","):
-                result[v.tag] = v.value
-
-        return AccountSummary(
-            nav=float(result.get("NetLiquidation", "0")),
-            available_funds=float(result.get("AvailableFunds", "0")),
-            buying_power=float(result.get("BuyingPower", "0")),
-            unrealized_pnl=float(result.get("UnrealizedPnL", "0")),
-            realized_pnl=float(result.get("RealizedPnL", "0")),
-            currency=result.get("Currency", "USD"),
+    def _on_order(self, trade: Trade) -> None:
+        self._orders.update(trade)
+        self._bump("orders")
+
+    def _bump(self, kind: str) -> None:
+        self._versions[kind] += 1
+        for listener in self._change_listeners:
+            listener(kind)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "contracts": self._contracts.stats(),
+            "fx_rates": self._fx.stats(),
+            "historical_pacing": self._pacer.stats(),
+            "market_data": self._subscriptions.stats(),
+            "coalescing": self._flights.stats(),
+            "clients": self._pool.stats(),
+            "connection": self._supervisor.stats(),
+            "orders": self._orders.stats(),
+            "order_throttle": self._order_throttle.stats(),
+        }
+
+    # --- Contracts ---
+
+    async def _qualify(self, *contracts: Contract) -> None:
+        """Qualify contracts in place, answering from the cache where possible.
+
+        Cache misses are qualified together in a single gateway call. Contracts
+        that cannot be qualified are left with conId 0.
+        """
+        misses = []
+        for contract in contracts:
+            cached = self._contracts.get(contract_key(contract))
+            if cached is not None:
+                util.dataclassUpdate(contract, cached)
+            else:
+                misses.append(contract)
+        if not misses:
+            return
+
+        keys = [contract_key(c) for c in misses]
+        await self._read(
+            lambda: REGISTRY.timed(
+                "gateway", "qualifyContracts", self._ib.qualifyContractsAsync(*misses)
+            )
+        )
+        for key, contract in zip(keys, misses):
+            if contract.conId:
+                self._contracts.put(key, copy.copy(contract))
+
+    # --- Account ---
+
+    async def resolve_accounts(self, accounts: str | Iterable[str]) -> list[str]:
+        """Account ids from a list of accounts, or every managed account for "ALL".
+
+        Raises ValueError for accounts this login does not manage.
+        """
+        await self.wait_ready()
+        managed = self._ib.managedAccounts()
+        if isinstance(accounts, str):
+            accounts = managed if accounts.upper() == "ALL" else [accounts]
+        wanted = list(dict.fromkeys(accounts))
+        if not wanted:
+            raise ValueError("No accounts given.")
+        unknown = [a for a in wanted if a not in managed]
+        if unknown:
+            raise ValueError(f"Unknown accounts: {', '.join(unknown)}")
+        return wanted
+
+    async def get_positions(self, account: str | None = None) -> list[Position]:
+        """Positions of the configured account, or of `account`.
+
+        The account with the portfolio subscription answers from memory.
+        Other managed accounts (an advisor's sub-accounts) get positions from
+        the position stream, priced with one batched quote request.
+        """
+        await self.wait_ready()
+        if account is None:
+            portfolio = self._ib.portfolio(self._config.ib_account or None)
+            return [Position.from_portfolio_item(item) for item in portfolio]
+        portfolio = self._ib.portfolio(account)
+        if portfolio:
+            return [Position.from_portfolio_item(item) for item in portfolio]
+        holdings = self._ib.positions(account)
+        if not holdings:
+            return []
+        contracts = [copy.copy(h.contract) for h in holdings]
+        for contract in contracts:
+            contract.exchange = contract.exchange or "SMART"
+        quotes = await self.get_market_prices(contracts)
+        return [Position.from_holding(h, quote_price(q)) for h, q in zip(holdings, quotes)]
+
+    async def get_positions_by_account(self, accounts: list[str]) -> dict[str, list[Position]]:
+        """Positions per account, fetched concurrently (`account_concurrency` at a time).
+
+        Quotes for symbols held in several accounts share one subscription.
+        """
+
+        async def fetch(account: str) -> list[Position]:
+            async with self._account_slots:
+                return await self.get_positions(account)
+
+        results = await asyncio.gather(*(fetch(a) for a in accounts))
+        return dict(zip(accounts, results))
+
+    async def get_positions_json(self) -> str:
+        """Positions encoded directly as a compact JSON array."""
+        await self.wait_ready()
+        return positions_json(self._ib.portfolio(self._config.ib_account or None))
+
+    async def get_account_summary(
+        self, refresh: bool = False, account: str | None = None
+    ) -> AccountSummary:
+        """Account summary from the pushed account-value stream.
+
+        Falls back to an account summary request when nothing has been pushed
+        for the account yet, or when `refresh` is set.
+        """
+        await self.wait_ready()
+        summaries = await self.get_account_summaries([account or self._account], refresh)
+        return next(iter(summaries.values()))
+
+    async def get_account_summaries(
+        self, accounts: list[str], refresh: bool = False
+    ) -> dict[str, AccountSummary]:
+        """Summaries per account, from the stream where every account has values.
+
+        Otherwise one account summary request, which IB answers for all
+        accounts at once, fills in the rest.
+        """
+        await self.wait_ready()
+        cached = {a: self._account_values.get(a) for a in accounts}
+        fetched: dict[str, AccountSummary] = {}
+        if refresh or None in cached.values():
+            fetched = await self._flights.do("account_summary", self._fetch_account_summaries)
+        out = {}
+        for account in accounts:
+            if account in fetched:
+                out[account] = fetched[account]
+            elif cached[account] is not None:
+                out[account] = _account_summary(*cached[account])
+            else:
+                out[account] = _account_summary({}, None)
+        return out
+
+    async def _fetch_account_summaries(self) -> dict[str, AccountSummary]:
+        values = await self._read(
+            lambda: REGISTRY.timed("gateway", "accountSummary", self._ib.accountSummaryAsync())
         )
+        # Read back through the store so BASE totals and the base currency
+        # are resolved the same way as for streamed values.
+        for v in values:
+            self._account_values.update(v)
+        now = time.time()
+        out = {}
+        for account in dict.fromkeys(v.account for v in values):
+            stored = self._account_values.get(account)
+            if stored is not None:
+                out[account] = _account_summary(stored[0], now)
+        return out
+
+    def _on_account_value(self, value: AccountValue) -> None:
+        self._account_values.update(value)
+        self._bump("account")
 
     # --- Market Data ---
 
     async def get_market_price(self, contract: Contract) -> dict[str, Any]:
-        self._ib.qualifyContracts(contract)
-        ticker = self._ib.reqMktData(contract, snapshot=True)
-        for _ in range(50):
-            await asyncio.sleep(0.1)
-            if util.isNan(ticker.last) and util.isNan(ticker.close):
-                continue
-            break
-        self._ib.cancelMktData(contract)
+        await self.wait_ready()
+        return await self._flights.do(
+            ("quote", contract_key(contract)), lambda: self._fetch_market_price(contract)
+        )
+
+    async def _fetch_market_price(self, contract: Contract) -> dict[str, Any]:
+        await self._qualify(contract)
+        return await self._quote(contract)
+
+    async def get_market_prices(self, contracts: list[Contract]) -> list[dict[str, Any]]:
+        """Quote many contracts at once.
+
+        All contracts are qualified in a single call, then quotes are taken
+        concurrently, bounded by the market data line limit. Results are
+        returned in input order.
+        """
+        await self.wait_ready()
+        if not contracts:
+            return []
+        await self._qualify(*contracts)
+
+        async def quote(contract: Contract) -> dict[str, Any]:
+            if not contract.conId:
+                return {"symbol": contract.symbol, "error": "Unknown contract"}
+            return await self._quote(contract)
+
+        return list(await asyncio.gather(*(quote(c) for c in contracts)))
+
+    async def get_fx_rates(self, currencies: Iterable[str], base: str) -> dict[str, float]:
+        """Rates converting each currency into `base` (base units per unit).
+
+        Rates quoted within the last `fx_rate_ttl` seconds come from the
+        cache; the rest are quoted in one `get_market_prices` batch.
+        Currencies without a usable quote, or that are not currency codes at
+        all, are left out of the result.
+        """
+        await self.wait_ready()
+        if not is_currency(base):
+            return {}
+        rates = {}
+        stale = []
+        for currency in sorted({c for c in currencies if c != base and is_currency(c)}):
+            rate = self._fx.get(currency, base)
+            if rate is None:
+                stale.append(currency)
+            else:
+                rates[currency] = rate
+        if not stale:
+            return rates
+        pairs = [fx_pair(c, base) for c in stale]
+        quotes = await self.get_market_prices([Forex(pair) for pair, _ in pairs])
+        for currency, (_, invert), quote in zip(stale, pairs, quotes):
+            rate = quote_rate(quote)
+            if rate is not None:
+                rates[currency] = 1 / rate if invert else rate
+                self._fx.put(currency, base, rates[currency])
+        return rates
+
+    async def _quote(self, contract: Contract) -> dict[str, Any]:
+        """Quote from the contract's shared streaming ticker.
+
+        Symbols that are already subscribed answer immediately from memory.
+        """
+        async with self._subscriptions.ticker(contract) as ticker:
+            complete = await REGISTRY.timed(
+                "gateway", "marketData", _wait_for_price(ticker, self._config.quote_timeout)
+            )
 
         last = None if util.isNan(ticker.last) else ticker.last
         close = None if util.isNan(ticker.close) else ticker.close
@@ -204,6 +684,7 @@ class Broker:
             "close": close,
             "bid": bid,
             "ask": ask,
+            "partial": not complete,
         }
 
     async def get_historical_bars(
@@ -213,17 +694,91 @@ class Broker:
         bar_size: str = "1 day",
         what_to_show: str = "TRADES",
     ) -> list[dict[str, Any]]:
-        self._ib.qualifyContracts(contract)
-        bars = await self._ib.reqHistoricalDataAsync(
-            contract,
-            endDateTime="",
-            durationStr=duration,
-            barSizeSetting=bar_size,
-            whatToShow=what_to_show,
-            useRTH=True,
+        await self.wait_ready()
+        key = ("bars", contract_key(contract), duration, bar_size, what_to_show)
+        return await self._flights.do(
+            key,
+            lambda: self._fetch_historical_bars(contract, duration, bar_size, what_to_show),
+        )
+
+    async def _fetch_historical_bars(
+        self,
+        contract: Contract,
+        duration: str,
+        bar_size: str,
+        what_to_show: str,
+    ) -> list[dict[str, Any]]:
+        await self._qualify(contract)
+        if self._bars is None:
+            bars = await self._req_historical_data(contract, "", duration, bar_size, what_to_show)
+            return [{k: v for k, v in row.items() if k != "ts"} for row in bars]
+
+        key = (contract.conId, bar_size, what_to_show, True)
+        series = await self._bars.get(key)
+        now = self._bars.now()
+        start = now - duration_seconds(duration)
+        missing = series.missing(duration, now, bar_size, self._config.bar_store_refresh)
+        changed = False
+        for end, span in missing:
+            # Backfilling older history can wait behind requests for fresh data.
+            priority = 1 if end else 0
+            rows = await self._req_historical_data(
+                contract, end, span, bar_size, what_to_show, priority
+            )
+            if not rows:
+                # Pacing errors, timeouts and outages also come back empty: leave
+                # the span uncovered so the next request asks for it again.
+                continue
+            series.merge(rows)
+            if end or series.covered_from is None:
+                series.covered_from = min(start, series.covered_from or start)
+            if not end:
+                series.fetched_at = now
+            changed = True
+        if changed:
+            await self._bars.save(key, series)
+        return series.rows_since(start)
+
+    async def _req_historical_data(
+        self,
+        contract: Contract,
+        end: datetime.datetime | str,
+        duration: str,
+        bar_size: str,
+        what_to_show: str,
+        priority: int = 0,
+    ) -> list[dict[str, Any]]:
+        key = PacingKey(
+            con_id=contract.conId,
+            exchange=contract.exchange,
+            end=str(end),
+            duration=duration,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            use_rth=True,
+        )
+        bars = await self._read(
+            lambda: self._pacer.run(
+                key,
+                lambda: REGISTRY.timed(
+                    "gateway",
+                    "historicalData",
+                    self._pool.route("historical").reqHistoricalDataAsync(
+                        contract,
+                        endDateTime=end,
+                        durationStr=duration,
+                        barSizeSetting=bar_size,
+                        whatToShow=what_to_show,
+                        useRTH=True,
+                        formatDate=2,
+                    ),
+                ),
+                priority,
+            )
         )
         return [
             {
+                "ts": bar_timestamp(bar.date),
                 "date": str(bar.date),
                 "open": bar.open,
                 "high": bar.high,
@@ -235,7 +790,17 @@ class Broker:
         ]
 
     async def search_contracts(self, pattern: str) -> list[ContractMatch]:
-        results = await self._ib.reqMatchingSymbolsAsync(pattern)
+        await self.wait_ready()
+        return await self._flights.do(
+            ("search", pattern), lambda: self._fetch_search_contracts(pattern)
+        )
+
+    async def _fetch_search_contracts(self, pattern: str) -> list[ContractMatch]:
+        results = await self._read(
+            lambda: REGISTRY.timed(
+                "gateway", "matchingSymbols", self._ib.reqMatchingSymbolsAsync(pattern)
+            )
+        )
         if not results:
             return []
         matches = []
@@ -256,19 +821,8 @@ class Broker:
     # --- Orders ---
 
     async def get_open_orders(self) -> list[OpenOrder]:
-        trades = self._ib.openTrades()
-        return [
-            OpenOrder(
-                order_id=t.order.orderId,
-                symbol=t.contract.symbol,
-                action=t.order.action,
-                quantity=t.order.totalQuantity,
-                order_type=t.order.orderType,
-                limit_price=t.order.lmtPrice if t.order.orderType == "LMT" else None,
-                status=t.orderStatus.status,
-            )
-            for t in trades
-        ]
+        await self.wait_ready()
+        return self._orders.open_orders()
 
     async def place_limit_order(
         self,
@@ -279,22 +833,122 @@ class Broker:
         currency: str = "USD",
         exchange: str = "SMART",
     ) -> dict[str, Any]:
+        """Place a limit order and wait briefly for the gateway to acknowledge it.
+
+        The returned status is the first one past PendingSubmit, or still
+        PendingSubmit if no acknowledgement arrived within `order_ack_timeout`.
+        """
+        await self.wait_ready()
+        request = OrderRequest(symbol, action, quantity, limit_price, currency, exchange)
         contract = Stock(symbol, exchange, currency)
-        self._ib.qualifyContracts(contract)
-        order = LimitOrder(action=action, totalQuantity=quantity, lmtPrice=limit_price)
+        await self._qualify(contract)
+        return await self._submit(contract, request)
+
+    async def place_limit_orders(self, requests: list[OrderRequest]) -> dict[str, Any]:
+        """Validate and place a batch of limit orders, all or nothing.
+
+        Every order is checked and every contract qualified (in one gateway
+        call) before anything is sent; if any fails, nothing is placed and the
+        problems are returned under "errors" by batch index. Otherwise the
+        orders go out concurrently, paced by `order_rate`, and "orders" holds
+        each one's acknowledgement in input order.
+        """
+        await self.wait_ready()
+        errors = [
+            {"index": i, "symbol": r.symbol, "error": error}
+            for i, r in enumerate(requests)
+            if (error := r.error()) is not None
+        ]
+        contracts = [Stock(r.symbol, r.exchange, r.currency) for r in requests]
+        if not errors:
+            await self._qualify(*contracts)
+            errors = [
+                {"index": i, "symbol": r.symbol, "error": "Unknown contract"}
+                for i, (r, c) in enumerate(zip(requests, contracts))
+                if not c.conId
+            ]
+        if errors:
+            return {"placed": 0, "orders": [], "errors": errors}
+        acks = await asyncio.gather(
+            *(self._submit(c, r) for c, r in zip(contracts, requests))
+        )
+        return {"placed": len(acks), "orders": list(acks), "errors": []}
+
+    async def _submit(self, contract: Contract, request: OrderRequest) -> dict[str, Any]:
+        await self._order_throttle.acquire()
+        order = LimitOrder(
+            action=request.action, totalQuantity=request.quantity, lmtPrice=request.limit_price
+        )
         trade = self._ib.placeOrder(contract, order)
+        self._orders.update(trade)
+        await self._orders.wait_for(
+            trade.order.orderId,
+            ACKNOWLEDGED_STATES,
+            self._config.order_ack_timeout,
+            client_id=trade.order.clientId,
+        )
         return {
             "order_id": trade.order.orderId,
-            "symbol": symbol,
-            "action": action,
-            "quantity": quantity,
-            "limit_price": limit_price,
+            "symbol": request.symbol,
+            "action": request.action,
+            "quantity": request.quantity,
+            "limit_price": request.limit_price,
             "status": trade.orderStatus.status,
         }
 
+    async def wait_for_order_state(
+        self, order_id: int, states: Iterable[str], timeout: float
+    ) -> dict[str, Any]:
+        """Wait until an order reaches one of `states`, for at most `timeout` seconds.
+
+        Returns the order's state with `reached` telling whether a wanted state
+        was reached; it is False on timeout or if the order finished otherwise
+        (e.g. cancelled while waiting for a fill).
+        """
+        await self.wait_ready()
+        if self._orders.get(order_id) is None:
+            return {"order_id": order_id, "status": "not_found", "reached": False}
+        reached = await self._orders.wait_for(order_id, states, timeout)
+        return {**order_state(self._orders.get(order_id)), "reached": reached}
+
     async def cancel_order(self, order_id: int) -> dict[str, Any]:
-        for trade in self._ib.openTrades():
-            if trade.order.orderId == order_id:
-                self._ib.cancelOrder(trade.order)
-                return {"order_id": order_id, "status": "cancel_requested"}
-        return {"order_id": order_id, "status": "not_found"}
+        await self.wait_ready()
+        trade = self._orders.get(order_id)
+        if trade is None or trade.isDone():
+            return {"order_id": order_id, "status": "not_found"}
+        self._ib.cancelOrder(trade.order)
+        return {"order_id": order_id, "status": "cancel_requested"}
+
+    async def cancel_orders(
+        self,
+        order_ids: list[int] | None = None,
+        symbol: str | None = None,
+        action: str | None = None,
+    ) -> dict[str, Any]:
+        """Cancel the given open orders, or every open order matching the filters.
+
+        Without `order_ids`, all open orders not already being cancelled are
+        cancelled, unless narrowed by `symbol` and/or `action`. Cancels are
+        paced by `order_rate`.
+        """
+        await self.wait_ready()
+        if order_ids is None:
+            targets = [
+                (o.order_id, o.client_id)
+                for o in self._orders.open_orders()
+                if o.status != OrderStatus.PendingCancel
+                and (symbol is None or o.symbol == symbol)
+                and (action is None or o.action == action)
+            ]
+        else:
+            targets = [(order_id, None) for order_id in order_ids]
+        requested, not_found = [], []
+        for order_id, client_id in targets:
+            trade = self._orders.get(order_id, client_id)
+            if trade is None or trade.isDone():
+                not_found.append(order_id)
+                continue
+            await self._order_throttle.acquire()
+            self._ib.cancelOrder(trade.order)
+            requested.append(order_id)
+        return {"cancel_requested": requested, "not_found": not_found}
@@ -0,0 +1,142 @@
+"""Pool of IB API client connections with workload routing.
+
+Each client has its own socket and its own gateway-side pacing, so heavy
+historical backfills on one client do not delay quotes or order handling on
+another. The master client (the configured client ID) handles orders and the
+account/portfolio streams. With two clients, historical data moves to the
+second; with three, market data moves to the second and historical data to
+the third. A secondary client that drops is reconnected on its own, its work
+falling back to the master meanwhile; only losing the master reconnects the
+whole pool.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Literal
+
+from ib_async import IB, StartupFetch
+
+log = logging.getLogger(__name__)
+
+Workload = Literal["orders", "market_data", "historical"]
+
+MAX_CLIENTS = 3
+
+_ROUTES: dict[int, dict[Workload, int]] = {
+    1: {"orders": 0, "market_data": 0, "historical": 0},
+    2: {"orders": 0, "market_data": 0, "historical": 1},
+    3: {"orders": 0, "market_data": 1, "historical": 2},
+}
+
+
+class ClientPool:
+    def __init__(self, clients: list[IB], client_id: int = 1) -> None:
+        if not 1 <= len(clients) <= MAX_CLIENTS:
+            raise ValueError(f"Client pool size must be between 1 and {MAX_CLIENTS}")
+        self._clients = clients
+        self._client_id = client_id
+        self._routes = dict(_ROUTES[len(clients)])
+        self._address: tuple[str, int, str] | None = None
+
+    @classmethod
+    def create(cls, size: int, client_id: int = 1, master: IB | None = None) -> ClientPool:
+        size = max(1, min(size, MAX_CLIENTS))
+        return cls([master or IB()] + [IB() for _ in range(size - 1)], client_id)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def master(self) -> IB:
+        return self._clients[0]
+
+    @property
+    def clients(self) -> list[IB]:
+        return list(self._clients)
+
+    def route(self, workload: Workload) -> IB:
+        return self._clients[self._routes[workload]]
+
+    async def connect(self, host: str, port: int, readonly: bool, account: str) -> None:
+        """Connect the master, then the other clients concurrently.
+
+        Clients still connected from before are disconnected first, so this
+        also serves to reconnect the whole pool. A secondary client that fails
+        to connect is not fatal: its workload falls back to the master client.
+        """
+        self.disconnect()
+        self._routes = dict(_ROUTES[len(self._clients)])
+        self._address = (host, port, account)
+        await self.master.connectAsync(
+            host=host, port=port, clientId=self._client_id, readonly=readonly, account=account
+        )
+        others = self._clients[1:]
+        if not others:
+            return
+        results = await asyncio.gather(
+            *(self._connect_secondary(i) for i in range(1, len(self._clients))),
+            return_exceptions=True,
+        )
+        for i, result in enumerate(results, start=1):
+            if isinstance(result, BaseException):
+                log.warning(
+                    "Client %d failed to connect (%s); routing its work to the master client",
+                    self._client_id + i,
+                    result,
+                )
+                self._route_to_master(i)
+
+    def release(self, ib: IB) -> None:
+        """Route a dropped secondary client's work to the master until it reconnects."""
+        self._route_to_master(self._clients.index(ib))
+
+    async def reconnect(self, ib: IB) -> bool:
+        """Reconnect one secondary client on its own, leaving the others untouched.
+
+        Its workload returns to it once connected; on failure it stays with the
+        master client until the next full `connect`.
+        """
+        i = self._clients.index(ib)
+        self._route_to_master(i)
+        try:
+            await self._connect_secondary(i)
+        except Exception as e:
+            log.warning(
+                "Client %d failed to reconnect (%s); its work stays on the master client",
+                self._client_id + i,
+                e,
+            )
+            return False
+        for workload, index in _ROUTES[len(self._clients)].items():
+            if index == i:
+                self._routes[workload] = i
+        log.info("Client %d reconnected", self._client_id + i)
+        return True
+
+    async def _connect_secondary(self, i: int) -> None:
+        if self._address is None:
+            raise ConnectionError("Client pool was never connected")
+        host, port, account = self._address
+        # Account and order state come from the master; secondaries only serve data.
+        await self._clients[i].connectAsync(
+            host=host,
+            port=port,
+            clientId=self._client_id + i,
+            readonly=True,
+            account=account,
+            fetchFields=StartupFetch(0),
+        )
+
+    def _route_to_master(self, i: int) -> None:
+        for workload, index in self._routes.items():
+            if index == i:
+                self._routes[workload] = 0
+
+    def disconnect(self) -> None:
+        for ib in self._clients:
+            if ib.isConnected():
+                ib.disconnect()
+
+    def stats(self) -> dict[str, int]:
+        return {workload: self._client_id + index for workload, index in self._routes.items()}
@@ -9,4 +9,26 @@ class ServerConfig(BaseSettings):
     ib_gateway_host: str = "127.0.0.1"
     ib_gateway_port: int = 4003
     ib_account: str = ""
+    ib_client_id: int = 1
+    ib_pool_size: int = 1
+    account_concurrency: int = 8
     safety_paper_only: bool = True
+    json_pretty: bool = False
+    quote_timeout: float = 5.0
+    order_ack_timeout: float = 2.0
+    order_rate: float = 40.0
+    order_retention: float = 3600.0
+    market_data_lines: int = 50
+    stream_idle_ttl: float = 300.0
+    fx_rate_ttl: float = 60.0
+    contract_cache_size: int = 5000
+    contract_cache_ttl: float = 86400.0
+    contract_cache_path: str = ""
+    bar_store_path: str = ""
+    bar_store_refresh: float = 300.0
+    bar_store_series: int = 256
+    notify_debounce: float = 0.5
+    reconnect_initial_delay: float = 1.0
+    reconnect_max_delay: float = 60.0
+    reconnect_timeout: float = 30.0
+    metrics_port: int = 0
@@ -0,0 +1,146 @@
+"""Qualified-contract cache so repeat lookups skip the gateway round trip."""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ib_async import Contract, util
+
+log = logging.getLogger(__name__)
+
+ContractKey = tuple[str, str, str, str]
+
+
+def contract_key(contract: Contract) -> ContractKey:
+    return (contract.symbol, contract.secType, contract.exchange, contract.currency)
+
+
+@dataclass
+class _Entry:
+    contract: Contract
+    stored_at: float
+
+
+class ContractCache:
+    """LRU cache of qualified contracts with a TTL, indexed by request key and conId.
+
+    Keys are (symbol, secType, exchange, currency) as given in the request, so a
+    `Stock("VWCE", "SMART", "EUR")` hits the entry created by the first lookup.
+    Timestamps are wall-clock so persisted entries expire correctly across restarts.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        ttl: float = 86400.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[ContractKey, _Entry] = OrderedDict()
+        self._by_con_id: dict[int, ContractKey] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: ContractKey) -> Contract | None:
+        entry = self._entries.get(key)
+        if entry is not None and self._clock() - entry.stored_at > self._ttl:
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.contract
+
+    def get_by_con_id(self, con_id: int) -> Contract | None:
+        key = self._by_con_id.get(con_id)
+        return self.get(key) if key is not None else None
+
+    def put(self, key: ContractKey, contract: Contract, stored_at: float | None = None) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(contract, self._clock() if stored_at is None else stored_at)
+        self._by_con_id[contract.conId] = key
+        while len(self._entries) > self._max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: ContractKey) -> None:
+        entry = self._entries.pop(key)
+        if self._by_con_id.get(entry.contract.conId) == key:
+            del self._by_con_id[entry.contract.conId]
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # --- Persistence ---
+
+    def save(self, path: Path) -> None:
+        rows = [
+            {
+                "key": list(key),
+                "stored_at": e.stored_at,
+                "contract": util.dataclassNonDefaults(e.contract),
+            }
+            for key, e in self._entries.items()
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(rows))
+        tmp.replace(path)
+
+    def load(self, path: Path) -> int:
+        """Load entries saved by `save`, skipping expired ones. Returns the count loaded.
+
+        The cache is only an optimisation: an unreadable file or malformed rows
+        are logged and skipped rather than stopping startup.
+        """
+        try:
+            rows = json.loads(path.read_text())
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable contract cache %s: %s", path, e)
+            return 0
+        if not isinstance(rows, list):
+            log.warning("Ignoring contract cache %s: expected a list of entries", path)
+            return 0
+
+        now = self._clock()
+        loaded = 0
+        skipped = 0
+        for row in rows:
+            try:
+                stored_at = float(row["stored_at"])
+                if now - stored_at > self._ttl:
+                    continue
+                key = tuple(str(part) for part in row["key"])
+                if len(key) != 4:
+                    raise ValueError(f"bad key {row['key']!r}")
+                contract = Contract.create(**row["contract"])
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                skipped += 1
+                log.debug("Skipping contract cache row %r: %s", row, e)
+                continue
+            self.put(key, contract, stored_at)
+            loaded += 1
+        if skipped:
+            log.warning("Skipped %d malformed entries in contract cache %s", skipped, path)
+        return loaded
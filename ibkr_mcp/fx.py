@@ -0,0 +1,89 @@
+"""Currency conversion through IB's IDEALPRO currency pairs.
+
+IB lists each pair once, in market convention (EUR.USD, GBP.USD, USD.JPY):
+converting the other way round means inverting the quote. `FxRateCache`
+keeps recent rates so analysis calls convert whole portfolios without
+quoting a pair per call.
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Market convention: the earlier currency is the base of the pair. Currencies
+# not listed here quote against all of these (USD.SEK, EUR.SEK, ...).
+PAIR_PRIORITY = ("EUR", "GBP", "AUD", "NZD", "USD", "CAD", "CHF", "JPY")
+
+
+def _rank(currency: str) -> tuple[int, str]:
+    try:
+        return PAIR_PRIORITY.index(currency), ""
+    except ValueError:
+        return len(PAIR_PRIORITY), currency
+
+
+def is_currency(code: str) -> bool:
+    """Whether `code` is shaped like an ISO 4217 code, as IB currency pairs require.
+
+    Rules out placeholders such as IB's "BASE" total before a pair is built.
+    """
+    return len(code) == 3 and code.isascii() and code.isalpha() and code.isupper()
+
+
+def fx_pair(currency: str, base: str) -> tuple[str, bool]:
+    """IB pair symbol for converting `currency` into `base`, and whether to invert.
+
+    The rate is base units per unit of `currency`: the pair's quote if
+    `currency` is the pair's base, else its reciprocal.
+    """
+    if _rank(currency) <= _rank(base):
+        return currency + base, False
+    return base + currency, True
+
+
+def quote_rate(quote: dict[str, Any]) -> float | None:
+    """Mid price of an FX quote, falling back to last or close."""
+    bid, ask = quote.get("bid"), quote.get("ask")
+    if bid and ask and bid > 0 and ask > 0:
+        return (bid + ask) / 2
+    for key in ("last", "close"):
+        value = quote.get(key)
+        if value and math.isfinite(value) and value > 0:
+            return value
+    return None
+
+
+class FxRateCache:
+    """Conversion rates by (currency, base), each fresh for `ttl` seconds.
+
+    Storing a rate also stores its reciprocal, so an account in EUR and one in
+    USD share the EUR.USD quote.
+    """
+
+    def __init__(self, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._rates: dict[tuple[str, str], tuple[float, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def get(self, currency: str, base: str) -> float | None:
+        entry = self._rates.get((currency, base))
+        if entry is None or self._clock() - entry[1] > self._ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, currency: str, base: str, rate: float) -> None:
+        now = self._clock()
+        self._rates[(currency, base)] = (rate, now)
+        self._rates[(base, currency)] = (1 / rate, now)
+
+    def stats(self) -> dict[str, Any]:
+        return {"rates": len(self._rates), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,258 @@
+"""Latency and throughput metrics for tools, resources, broker and gateway calls.
+
+Every measured call lands in a latency histogram keyed by (kind, name), e.g.
+("tool", "portfolio_snapshot") or ("gateway", "qualifyContracts"), together
+with call and error counters and an in-flight gauge. Kinds in use:
+
+- tool / resource: MCP requests, end to end including JSON encoding
+- broker: public `Broker` methods
+- gateway: round trips to IB Gateway (including waits for streamed quotes)
+- encode: building resource payloads on a payload cache miss
+
+`snapshot()` backs the `server_metrics` tool and `prometheus_text()` the
+optional Prometheus endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import functools
+import inspect
+import logging
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bounds in seconds, as in a Prometheus histogram; the last bucket is +Inf.
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th quantile (0-1) by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._latency: dict[tuple[str, str], Histogram] = {}
+        self._errors: Counter[tuple[str, str]] = Counter()
+        self._in_flight: Counter[tuple[str, str]] = Counter()
+        self._started = clock()
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        key = (kind, name)
+        self._in_flight[key] += 1
+        start = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                self._errors[key] += 1
+            raise
+        finally:
+            self._in_flight[key] -= 1
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram()
+            histogram.observe(self._clock() - start)
+
+    async def timed(self, kind: str, name: str, awaitable: Awaitable[T]) -> T:
+        with self.measure(kind, name):
+            return await awaitable
+
+    def error(self, kind: str, name: str) -> None:
+        """Count a failure that was reported as a result rather than raised."""
+        self._errors[(kind, name)] += 1
+
+    def instrument(
+        self, kind: str, name: str | None = None
+    ) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """Decorator measuring each call of an async function."""
+
+        def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.measure(kind, label):
+                    return await fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        self._latency.clear()
+        self._errors.clear()
+        self._in_flight.clear()
+        self._started = self._clock()
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Per-kind, per-name call statistics with latency percentiles."""
+        elapsed = max(self._clock() - self._started, 1e-9)
+        out: dict[str, dict[str, dict[str, Any]]] = {}
+        for (kind, name), histogram in sorted(self._latency.items()):
+            key = (kind, name)
+            out.setdefault(kind, {})[name] = {
+                **histogram.summary(),
+                "errors": self._errors[key],
+                "in_flight": self._in_flight[key],
+                "per_sec": round(histogram.count / elapsed, 3),
+            }
+        return out
+
+    def prometheus_text(self, stats: dict[str, dict[str, Any]] | None = None) -> str:
+        """Render metrics in the Prometheus text exposition format.
+
+        `stats` adds numeric values from component `stats()` dicts (cache hit
+        ratios, queue depths) as `ibkr_mcp_stat{group=...,name=...}` gauges.
+        """
+        lines = [
+            "# HELP ibkr_mcp_call_seconds Call latency.",
+            "# TYPE ibkr_mcp_call_seconds histogram",
+        ]
+        for (kind, name), histogram in sorted(self._latency.items()):
+            labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, n in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                cumulative += n
+                lines.append(f'ibkr_mcp_call_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"ibkr_mcp_call_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"ibkr_mcp_call_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += ["# HELP ibkr_mcp_errors_total Failed calls.", "# TYPE ibkr_mcp_errors_total counter"]
+        for (kind, name), n in sorted(self._errors.items()):
+            lines.append(f'ibkr_mcp_errors_total{{kind="{_escape(kind)}",name="{_escape(name)}"}} {n}')
+
+        lines += ["# HELP ibkr_mcp_in_flight Calls in progress.", "# TYPE ibkr_mcp_in_flight gauge"]
+        for (kind, name), n in sorted(self._in_flight.items()):
+            lines.append(f'ibkr_mcp_in_flight{{kind="{_escape(kind)}",name="{_escape(name)}"}} {n}')
+
+        if stats:
+            lines += ["# HELP ibkr_mcp_stat Component statistics.", "# TYPE ibkr_mcp_stat gauge"]
+            for group, values in stats.items():
+                for name, value in values.items():
+                    if isinstance(value, int | float):
+                        lines.append(
+                            f'ibkr_mcp_stat{{group="{_escape(group)}",name="{_escape(name)}"}} '
+                            f"{float(value)}"
+                        )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Metrics()
+
+
+def instrument_methods(kind: str) -> Callable[[type[T]], type[T]]:
+    """Class decorator measuring every public async method under `kind`."""
+
+    def decorator(cls: type[T]) -> type[T]:
+        for attr, fn in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.iscoroutinefunction(fn):
+                setattr(cls, attr, REGISTRY.instrument(kind, attr)(fn))
+        return cls
+
+    return decorator
+
+
+def instrument_handlers(server: Any) -> None:
+    """Measure MCP tool calls and resource reads on a low-level `Server`."""
+    from mcp import types
+
+    call_tool = server.request_handlers.get(types.CallToolRequest)
+    read_resource = server.request_handlers.get(types.ReadResourceRequest)
+
+    if call_tool is not None:
+
+        async def timed_call_tool(req: types.CallToolRequest) -> Any:
+            name = req.params.name
+            with REGISTRY.measure("tool", name):
+                result = await call_tool(req)
+            if getattr(result.root, "isError", False):
+                REGISTRY.error("tool", name)
+            return result
+
+        server.request_handlers[types.CallToolRequest] = timed_call_tool
+
+    if read_resource is not None:
+
+        async def timed_read_resource(req: types.ReadResourceRequest) -> Any:
+            with REGISTRY.measure("resource", str(req.params.uri)):
+                return await read_resource(req)
+
+        server.request_handlers[types.ReadResourceRequest] = timed_read_resource
+
+
+async def serve_prometheus(
+    port: int, stats: Callable[[], dict[str, dict[str, Any]]], host: str = "127.0.0.1"
+) -> asyncio.Server:
+    """Serve `prometheus_text()` over plain HTTP on `host:port` (any path)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = REGISTRY.prometheus_text(stats()).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    log.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
+    return server
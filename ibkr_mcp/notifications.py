@@ -0,0 +1,94 @@
+"""Push `resources/updated` notifications to subscribed MCP sessions.
+
+The broker reports which kind of data changed ("positions", "account",
+"orders") as IB pushes portfolio, account-value and order-status events. Each
+kind maps to the resources built from it. Changes are collected for
+`debounce` seconds and then sent once per resource and session, so a burst
+of fills produces one notification per resource instead of hundreds.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+
+from pydantic import AnyUrl
+
+log = logging.getLogger(__name__)
+
+RESOURCES_BY_KIND: dict[str, tuple[str, ...]] = {
+    "positions": ("ibkr://positions", "ibkr://portfolio/snapshot"),
+    "account": ("ibkr://account/summary", "ibkr://portfolio/snapshot"),
+    "orders": ("ibkr://orders/open",),
+}
+
+
+class Session(Protocol):
+    async def send_resource_updated(self, uri: AnyUrl) -> None: ...
+
+
+class ResourceNotifier:
+    def __init__(
+        self,
+        debounce: float = 0.5,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._debounce = debounce
+        self._sleep = sleep
+        self._subscribers: dict[str, set[Session]] = {}
+        self._pending: set[str] = set()
+        self._timer: asyncio.Task[None] | None = None
+        self.events = 0
+        self.sent = 0
+
+    def subscribe(self, uri: str, session: Session) -> None:
+        self._subscribers.setdefault(uri, set()).add(session)
+
+    def unsubscribe(self, uri: str, session: Session) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+
+    def notify(self, kind: str) -> None:
+        """Record a change to `kind`; subscribed resources are notified after the debounce."""
+        self.events += 1
+        uris = [uri for uri in RESOURCES_BY_KIND.get(kind, ()) if uri in self._subscribers]
+        if not uris:
+            return
+        self._pending.update(uris)
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.ensure_future(self._flush_after())
+
+    async def _flush_after(self) -> None:
+        await self._sleep(self._debounce)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, set()
+        for uri in sorted(pending):
+            for session in list(self._subscribers.get(uri, ())):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    self.sent += 1
+                except Exception as e:
+                    # The client went away; stop notifying it.
+                    log.debug("Dropping subscriber to %s: %s", uri, e)
+                    self.unsubscribe(uri, session)
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending.clear()
+        self._subscribers.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+            "events": self.events,
+            "sent": self.sent,
+        }
@@ -0,0 +1,231 @@
+"""Order book indexed by (clientId, orderId) and permId, kept current from IB's order events."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from ib_async import OrderStatus, Trade
+
+# Every status past the ones an order has before the gateway acknowledges it.
+ACKNOWLEDGED_STATES = (
+    OrderStatus.ActiveStates | OrderStatus.DoneStates | {OrderStatus.PendingCancel}
+) - {OrderStatus.PendingSubmit, OrderStatus.ApiPending}
+
+
+@dataclass(frozen=True, slots=True)
+class OrderRequest:
+    symbol: str
+    action: str
+    quantity: float
+    limit_price: float
+    currency: str = "USD"
+    exchange: str = "SMART"
+
+    def error(self) -> str | None:
+        """Why the gateway would reject this order outright, if it would."""
+        if self.action not in ("BUY", "SELL"):
+            return f"Invalid action '{self.action}'. Must be 'BUY' or 'SELL'."
+        if self.quantity <= 0:
+            return "Quantity must be positive."
+        if self.limit_price <= 0:
+            return "Limit price must be positive."
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class OpenOrder:
+    order_id: int
+    client_id: int
+    symbol: str
+    action: str
+    quantity: float
+    order_type: str
+    limit_price: float | None
+    status: str
+
+    @classmethod
+    def from_trade(cls, trade: Trade) -> OpenOrder:
+        return cls(
+            order_id=trade.order.orderId,
+            client_id=trade.order.clientId,
+            symbol=trade.contract.symbol,
+            action=trade.order.action,
+            quantity=trade.order.totalQuantity,
+            order_type=trade.order.orderType,
+            limit_price=trade.order.lmtPrice if trade.order.orderType == "LMT" else None,
+            status=trade.orderStatus.status,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "order_id": self.order_id,
+            "symbol": self.symbol,
+            "action": self.action,
+            "quantity": self.quantity,
+            "order_type": self.order_type,
+            "limit_price": self.limit_price,
+            "status": self.status,
+        }
+
+
+def order_state(trade: Trade) -> dict[str, Any]:
+    status = trade.orderStatus
+    return {
+        "order_id": trade.order.orderId,
+        "perm_id": trade.order.permId or status.permId,
+        "symbol": trade.contract.symbol,
+        "status": status.status,
+        "filled": status.filled,
+        "remaining": status.remaining,
+        "avg_fill_price": status.avgFillPrice,
+    }
+
+
+OrderKey = tuple[int, int]
+
+
+def _key(trade: Trade) -> OrderKey | int:
+    # As ib_async keys trades: orders from other clients may have no orderId.
+    order = trade.order
+    return (order.clientId, order.orderId) if order.orderId > 0 else order.permId
+
+
+class OrderBook:
+    """Trades by (clientId, orderId) and permId, with the open orders kept ready to serve.
+
+    `update` is fed every order event (open order, status, execution), so
+    lookups are dict hits and `open_orders()` does not rebuild anything that
+    has not changed. `wait_for` completes when an update brings an order into
+    one of the wanted states. Order IDs are only unique per client, so lookups
+    by order ID alone mean this client's (`client_id`) orders. Finished orders
+    are forgotten `retention` seconds after they finished.
+    """
+
+    def __init__(
+        self,
+        client_id: int = 0,
+        retention: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client_id = client_id
+        self._retention = retention
+        self._clock = clock
+        self._by_id: dict[OrderKey, Trade] = {}
+        self._by_perm_id: dict[int, Trade] = {}
+        self._open: dict[OrderKey | int, OpenOrder] = {}
+        # Finished trades with the time they finished, oldest first.
+        self._finished: dict[OrderKey | int, tuple[float, Trade]] = {}
+        self._waiters: dict[OrderKey, list[tuple[frozenset[str], asyncio.Future[None]]]] = {}
+        self._updates = 0
+        self.evictions = 0
+
+    def update(self, trade: Trade) -> None:
+        order = trade.order
+        perm_id = order.permId or trade.orderStatus.permId
+        if order.orderId > 0:
+            self._by_id[(order.clientId, order.orderId)] = trade
+        if perm_id:
+            self._by_perm_id[perm_id] = trade
+        key = _key(trade)
+        now = self._clock()
+        if trade.isDone():
+            self._open.pop(key, None)
+            finished_at = self._finished[key][0] if key in self._finished else now
+            self._finished[key] = (finished_at, trade)
+        else:
+            self._open[key] = OpenOrder.from_trade(trade)
+            self._finished.pop(key, None)
+        self._updates += 1
+        self._notify(trade)
+        self._evict(now)
+
+    def reset(self, trades: Iterable[Trade]) -> None:
+        """Rebuild from the client's trades, e.g. after a reconnect.
+
+        Orders that filled or were cancelled while disconnected arrive as
+        completed trades, so pending waiters still see their final state.
+        """
+        self._open.clear()
+        for trade in trades:
+            self.update(trade)
+
+    def get(self, order_id: int, client_id: int | None = None) -> Trade | None:
+        return self._by_id.get(self._order_key(order_id, client_id))
+
+    def get_by_perm_id(self, perm_id: int) -> Trade | None:
+        return self._by_perm_id.get(perm_id)
+
+    def open_orders(self) -> list[OpenOrder]:
+        return list(self._open.values())
+
+    async def wait_for(
+        self, order_id: int, states: Iterable[str], timeout: float, client_id: int | None = None
+    ) -> bool:
+        """Wait until a known order is in one of `states`, or can no longer change.
+
+        Returns True if a wanted state was reached, False if the deadline
+        passed or the order finished in another state (e.g. cancelled while
+        waiting for a fill).
+        """
+        wanted = frozenset(states)
+        key = self._order_key(order_id, client_id)
+        trade = self._by_id[key]
+        if trade.orderStatus.status in wanted:
+            return True
+        if trade.isDone():
+            return False
+
+        done = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(key, [])
+        entry = (wanted, done)
+        waiters.append(entry)
+        try:
+            await asyncio.wait_for(done, timeout)
+        except TimeoutError:
+            return False
+        finally:
+            waiters.remove(entry)
+            if not waiters:
+                del self._waiters[key]
+        # After a reconnect the order is a new Trade object.
+        return self._by_id.get(key, trade).orderStatus.status in wanted
+
+    def _order_key(self, order_id: int, client_id: int | None) -> OrderKey:
+        return (self._client_id if client_id is None else client_id, order_id)
+
+    def _notify(self, trade: Trade) -> None:
+        waiters = self._waiters.get((trade.order.clientId, trade.order.orderId))
+        if not waiters:
+            return
+        status = trade.orderStatus.status
+        for wanted, done in waiters:
+            if (status in wanted or trade.isDone()) and not done.done():
+                done.set_result(None)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self._retention
+        while self._finished:
+            key, (finished_at, trade) = next(iter(self._finished.items()))
+            if finished_at > cutoff:
+                break
+            del self._finished[key]
+            order = trade.order
+            if order.orderId > 0:
+                self._by_id.pop((order.clientId, order.orderId), None)
+            perm_id = order.permId or trade.orderStatus.permId
+            if perm_id:
+                self._by_perm_id.pop(perm_id, None)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "orders": len(self._by_id),
+            "open": len(self._open),
+            "finished": len(self._finished),
+            "evictions": self.evictions,
+            "waiting": sum(len(w) for w in self._waiters.values()),
+            "updates": self._updates,
+        }
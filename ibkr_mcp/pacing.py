@@ -0,0 +1,236 @@
+"""Schedulers that keep requests inside IB's pacing rules.
+
+IB rejects historical requests (and may impose long back-offs) when a client
+makes identical requests within 15 seconds, six or more requests for the same
+contract/exchange/tick type within 2 seconds, or more than 60 requests in any
+10 minute window. BID_ASK requests count twice towards the window.
+
+Separately, a client that sends more than 50 messages per second is
+disconnected; `MessageThrottle` spaces out bursts such as batch orders.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from ibkr_mcp.singleflight import SingleFlight
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PacingKey:
+    con_id: int
+    exchange: str
+    end: str
+    duration: str
+    bar_size: str
+    what_to_show: str
+    use_rth: bool
+
+    @property
+    def contract_key(self) -> Hashable:
+        return (self.con_id, self.exchange, self.what_to_show)
+
+    @property
+    def weight(self) -> int:
+        return 2 if self.what_to_show == "BID_ASK" else 1
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    key: PacingKey = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class HistoricalPacer:
+    """Priority queue in front of historical data requests.
+
+    Identical requests already queued or in flight share one result. Lower
+    `priority` values are dispatched first; among requests that may go now,
+    the highest priority wins, so a blocked request does not hold up others.
+    `clock` and `sleep` are injectable so tests can run against a fake clock.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 60,
+        window: float = 600.0,
+        identical_interval: float = 15.0,
+        burst_limit: int = 5,
+        burst_window: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._max_requests = max_requests
+        self._window = window
+        self._identical_interval = identical_interval
+        self._burst_limit = burst_limit
+        self._burst_window = burst_window
+        self._clock = clock
+        self._sleep = sleep
+
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = SingleFlight()
+        self._sent: deque[float] = deque()
+        self._last_sent: dict[PacingKey, float] = {}
+        self._bursts: dict[Hashable, deque[float]] = {}
+        self._timer: asyncio.Task[None] | None = None
+        self._timer_due = 0.0
+
+        self.dispatched = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(
+        self,
+        key: PacingKey,
+        request: Callable[[], Awaitable[T]],
+        priority: int = 0,
+    ) -> T:
+        """Run `request` once pacing allows, sharing the result with identical callers."""
+        return await self._in_flight.do(key, lambda: self._run(key, request, priority))
+
+    async def _run(self, key: PacingKey, request: Callable[[], Awaitable[T]], priority: int) -> T:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), key, loop.create_future(), self._clock())
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        await waiter.future
+        result = await request()
+        # Only an answered request starts the identical-request interval: a
+        # replay of one lost to a disconnect can go out straight away.
+        self._last_sent[key] = self._clock()
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": len(self._queue),
+            "in_flight": len(self._in_flight),
+            "dispatched": self.dispatched,
+            "deduped": self._in_flight.shared,
+            "avg_wait_ms": round(self._total_wait / self.dispatched * 1000, 1)
+            if self.dispatched
+            else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 1),
+        }
+
+    # --- Scheduling ---
+
+    def _delay(self, key: PacingKey, now: float) -> float:
+        while self._sent and self._sent[0] <= now - self._window:
+            self._sent.popleft()
+        delay = 0.0
+
+        overflow = len(self._sent) + key.weight - self._max_requests
+        if overflow > 0:
+            delay = max(delay, self._sent[overflow - 1] + self._window - now)
+
+        last = self._last_sent.get(key)
+        if last is not None:
+            delay = max(delay, last + self._identical_interval - now)
+
+        burst = self._bursts.get(key.contract_key)
+        if burst:
+            while burst and burst[0] <= now - self._burst_window:
+                burst.popleft()
+            if len(burst) >= self._burst_limit:
+                delay = max(delay, burst[-self._burst_limit] + self._burst_window - now)
+        return delay
+
+    def _record(self, key: PacingKey, now: float) -> None:
+        self._sent.extend([now] * key.weight)
+        self._bursts.setdefault(key.contract_key, deque()).append(now)
+        for k in [k for k, t in self._last_sent.items() if t <= now - self._identical_interval]:
+            del self._last_sent[k]
+
+    def _dispatch(self) -> None:
+        now = self._clock()
+        while self._queue:
+            soonest = None
+            for waiter in sorted(self._queue):
+                if waiter.future.cancelled():
+                    continue
+                delay = self._delay(waiter.key, now)
+                if delay <= 0:
+                    break
+                soonest = delay if soonest is None else min(soonest, delay)
+            else:
+                self._queue = [w for w in self._queue if not w.future.cancelled()]
+                heapq.heapify(self._queue)
+                if soonest is not None:
+                    self._schedule(now, soonest)
+                return
+
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            self._record(waiter.key, now)
+            wait = now - waiter.queued_at
+            self.dispatched += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if wait > 0:
+                log.debug("Historical request %s paced for %.1fs", waiter.key, wait)
+            waiter.future.set_result(None)
+
+    def _schedule(self, now: float, delay: float) -> None:
+        due = now + delay
+        if self._timer is not None and not self._timer.done():
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._timer_due = due
+        self._timer = asyncio.ensure_future(self._wake_after(delay))
+
+    async def _wake_after(self, delay: float) -> None:
+        await self._sleep(delay)
+        self._timer = None
+        self._dispatch()
+
+
+class MessageThrottle:
+    """Let callers through at most `rate` times per second, in arrival order.
+
+    Each caller reserves the next free slot, so a burst of N callers is spread
+    evenly over N / `rate` seconds instead of being sent at once. ib_async's
+    own client-side queue (45 messages/s) stays as the backstop for all other
+    traffic sharing the connection.
+    """
+
+    def __init__(
+        self,
+        rate: float = 40.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._interval = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self.sent = 0
+        self.throttled = 0
+
+    async def acquire(self) -> None:
+        now = self._clock()
+        slot = max(now, self._next)
+        self._next = slot + self._interval
+        if slot > now:
+            self.throttled += 1
+            await self._sleep(slot - now)
+        self.sent += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {"sent": self.sent, "throttled": self.throttled}
@@ -0,0 +1,260 @@
+"""Shared portfolio data loading and vectorized analytics.
+
+The analysis tools and resources load positions and the account summary once
+through `load_snapshot`, then compute weights, exposures and rankings on a
+columnar `PortfolioFrame` rather than looping over `Position` objects.
+
+IB reports each position's market value in the position's own currency.
+The snapshot carries rates into the account's base currency (cached by the
+broker), and the frame converts every value with one vectorized multiply, so
+weights and exposures are comparable across a multi-currency book.
+
+Given several accounts, `load_snapshot` fetches them concurrently and
+consolidates them: holdings of the same contract are merged and account
+totals are summed in the first account's base currency.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Any
+
+import numpy as np
+
+from ibkr_mcp.broker import AccountSummary, Broker, Position
+
+
+class PortfolioFrame:
+    """Column arrays built once from a list of positions.
+
+    `fx_rates` maps currency to base units per unit; currencies without a
+    rate (and all of them when it is omitted) are taken as base currency.
+    """
+
+    def __init__(
+        self, positions: list[Position], fx_rates: dict[str, float] | None = None
+    ) -> None:
+        self.symbol = np.array([p.symbol for p in positions], dtype=object)
+        self.sec_type = np.array([p.sec_type for p in positions], dtype=object)
+        self.exchange = np.array([p.exchange for p in positions], dtype=object)
+        self.currency = np.array([p.currency for p in positions], dtype=object)
+        self.con_id = np.array([p.con_id for p in positions], dtype=np.int64)
+        self.shares = np.array([p.shares for p in positions], dtype=np.float64)
+        self.avg_cost = np.array([p.avg_cost for p in positions], dtype=np.float64)
+        self.market_price = np.array([p.market_price for p in positions], dtype=np.float64)
+        self.market_value = np.array([p.market_value for p in positions], dtype=np.float64)
+        self.unrealized_pnl = np.array([p.unrealized_pnl for p in positions], dtype=np.float64)
+        self.realized_pnl = np.array([p.realized_pnl for p in positions], dtype=np.float64)
+        self.fx = _rate_column(self.currency, fx_rates or {})
+        self.market_value_base = self.market_value * self.fx
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    @cached_property
+    def pnl_pct(self) -> np.ndarray:
+        cost_basis = self.avg_cost * self.shares
+        out = np.zeros_like(cost_basis)
+        np.divide(self.unrealized_pnl, cost_basis, out=out, where=cost_basis != 0)
+        return out
+
+    def weights(self, nav: float) -> np.ndarray:
+        """Base-currency market value as a fraction of NAV (also in base currency)."""
+        return self.market_value_base / nav
+
+    def top_k(self, values: np.ndarray, k: int | None = None) -> np.ndarray:
+        """Indices of the k largest values, largest first (all of them when k is None)."""
+        n = len(values)
+        if k is None or k >= n:
+            return np.argsort(-values, kind="stable")
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        part = np.argpartition(-values, k - 1)[:k]
+        return part[np.argsort(-values[part], kind="stable")]
+
+    def group_sum(self, keys: np.ndarray, values: np.ndarray) -> dict[str, float]:
+        """Sum `values` per distinct key, e.g. market value by currency."""
+        if not len(keys):
+            return {}
+        labels, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(labels))
+        return dict(zip(labels.tolist(), sums.tolist()))
+
+    def exposures(self, nav: float) -> dict[str, dict[str, float]]:
+        """Percentage of NAV by currency and by security type."""
+        pct = self.weights(nav) * 100
+        return {
+            "by_currency": _round_values(self.group_sum(self.currency, pct), 2),
+            "by_sec_type": _round_values(self.group_sum(self.sec_type, pct), 2),
+        }
+
+    def records(
+        self, index: np.ndarray | None = None, **extra: np.ndarray
+    ) -> list[dict[str, Any]]:
+        """Position dicts (same shape as `Position.to_dict`) for the given rows.
+
+        Rounding is done per column; `extra` adds further columns by name.
+        """
+        idx = slice(None) if index is None else index
+        columns = {
+            "symbol": self.symbol[idx].tolist(),
+            "sec_type": self.sec_type[idx].tolist(),
+            "exchange": self.exchange[idx].tolist(),
+            "currency": self.currency[idx].tolist(),
+            "shares": self.shares[idx].tolist(),
+            "avg_cost": np.round(self.avg_cost[idx], 4).tolist(),
+            "market_price": np.round(self.market_price[idx], 4).tolist(),
+            "market_value": np.round(self.market_value[idx], 2).tolist(),
+            "unrealized_pnl": np.round(self.unrealized_pnl[idx], 2).tolist(),
+            "realized_pnl": np.round(self.realized_pnl[idx], 2).tolist(),
+            "pnl_pct": np.round(self.pnl_pct[idx] * 100, 2).tolist(),
+            "con_id": self.con_id[idx].tolist(),
+        }
+        for name, values in extra.items():
+            columns[name] = values[idx].tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _rate_column(currency: np.ndarray, rates: dict[str, float]) -> np.ndarray:
+    """Rate per row, looked up once per distinct currency."""
+    if not len(currency):
+        return np.ones(0)
+    labels, inverse = np.unique(currency, return_inverse=True)
+    return np.array([rates.get(c, 1.0) for c in labels.tolist()])[inverse]
+
+
+def _round_values(values: dict[str, float], digits: int) -> dict[str, float]:
+    return {k: round(v, digits) for k, v in values.items()}
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    positions: list[Position]
+    summary: AccountSummary
+    fx_rates: dict[str, float] = field(default_factory=dict)  # into the base currency
+    accounts: dict[str, AccountSummary] = field(default_factory=dict)  # when consolidated
+
+    @property
+    def nav(self) -> float:
+        return self.summary.nav or 1.0
+
+    @property
+    def base_currency(self) -> str:
+        return self.summary.currency
+
+    @property
+    def fx_missing(self) -> list[str]:
+        """Currencies with no rate; their values are left unconverted."""
+        base = self.base_currency
+        currencies = {p.currency for p in self.positions} | {
+            s.currency for s in self.accounts.values()
+        }
+        return sorted(currencies - {base} - self.fx_rates.keys())
+
+    @cached_property
+    def frame(self) -> PortfolioFrame:
+        return PortfolioFrame(self.positions, {**self.fx_rates, self.base_currency: 1.0})
+
+    @cached_property
+    def weights(self) -> np.ndarray:
+        return self.frame.weights(self.nav)
+
+    def weighted_positions(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Position dicts with weight_pct of NAV, heaviest first."""
+        weight_pct = np.round(self.weights * 100, 2)
+        order = self.frame.top_k(weight_pct, limit)
+        market_value_base = np.round(self.frame.market_value_base, 2)
+        return self.frame.records(
+            order, market_value_base=market_value_base, weight_pct=weight_pct
+        )
+
+
+def merge_positions(positions: Iterable[Position]) -> list[Position]:
+    """One position per contract, summing holdings spread over accounts."""
+    merged: dict[tuple[Any, str], Position] = {}
+    for p in positions:
+        key = (p.con_id or p.symbol, p.currency)
+        held = merged.get(key)
+        if held is None:
+            merged[key] = p
+            continue
+        shares = held.shares + p.shares
+        cost = held.avg_cost * held.shares + p.avg_cost * p.shares
+        merged[key] = replace(
+            held,
+            shares=shares,
+            avg_cost=cost / shares if shares else 0.0,
+            market_value=held.market_value + p.market_value,
+            unrealized_pnl=held.unrealized_pnl + p.unrealized_pnl,
+            realized_pnl=held.realized_pnl + p.realized_pnl,
+        )
+    return list(merged.values())
+
+
+def combine_summaries(
+    summaries: Iterable[AccountSummary], base: str, fx_rates: dict[str, float]
+) -> AccountSummary:
+    """Sum account summaries in `base`; currencies without a rate are added as is."""
+    summaries = list(summaries)
+    rates = [1.0 if s.currency == base else fx_rates.get(s.currency, 1.0) for s in summaries]
+    as_of = [s.as_of for s in summaries]
+
+    def total(name: str) -> float:
+        return sum(getattr(s, name) * rate for s, rate in zip(summaries, rates))
+
+    return AccountSummary(
+        nav=total("nav"),
+        available_funds=total("available_funds"),
+        buying_power=total("buying_power"),
+        unrealized_pnl=total("unrealized_pnl"),
+        realized_pnl=total("realized_pnl"),
+        cash=total("cash"),
+        currency=base,
+        as_of=None if None in as_of else min(as_of),
+    )
+
+
+async def load_account_summaries(
+    broker: Broker, accounts: list[str], refresh: bool = False
+) -> tuple[dict[str, AccountSummary], AccountSummary, dict[str, float]]:
+    """Per-account summaries, their total in the first account's base currency, and the rates used."""
+    summaries = await broker.get_account_summaries(accounts, refresh)
+    base = summaries[accounts[0]].currency
+    foreign = {s.currency for s in summaries.values()} - {base}
+    fx_rates = await broker.get_fx_rates(foreign, base) if foreign else {}
+    return summaries, combine_summaries(summaries.values(), base, fx_rates), fx_rates
+
+
+async def load_snapshot(broker: Broker, accounts: list[str] | None = None) -> PortfolioSnapshot:
+    """Fetch positions and account summary concurrently, then the FX rates they need.
+
+    Rates come from the broker's FX cache, so a single-currency book or a
+    recently converted one costs no extra gateway round trip. With `accounts`,
+    every account is fetched concurrently and the snapshot is consolidated.
+    """
+    if accounts is None:
+        positions, summary = await asyncio.gather(
+            broker.get_positions(), broker.get_account_summary()
+        )
+        foreign = {p.currency for p in positions} - {summary.currency}
+        fx_rates = await broker.get_fx_rates(foreign, summary.currency) if foreign else {}
+        return PortfolioSnapshot(positions=positions, summary=summary, fx_rates=fx_rates)
+
+    by_account, summaries = await asyncio.gather(
+        broker.get_positions_by_account(accounts), broker.get_account_summaries(accounts)
+    )
+    positions = merge_positions(p for held in by_account.values() for p in held)
+    base = summaries[accounts[0]].currency
+    foreign = (
+        {p.currency for p in positions} | {s.currency for s in summaries.values()}
+    ) - {base}
+    fx_rates = await broker.get_fx_rates(foreign, base) if foreign else {}
+    return PortfolioSnapshot(
+        positions=positions,
+        summary=combine_summaries(summaries.values(), base, fx_rates),
+        fx_rates=fx_rates,
+        accounts=summaries,
+    )
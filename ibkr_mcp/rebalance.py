@@ -0,0 +1,210 @@
+"""Share-level rebalancing from current holdings to target weights.
+
+`plan_rebalance` works on column arrays covering every held and targeted
+symbol, with prices in each symbol's own currency and FX rates into the
+account's base currency. It finds whole-share target holdings that trade as
+little as possible:
+
+- positions within `tolerance_pct` points of their target weight are left alone;
+- every trade is a whole number of shares, rounded so buys never overspend
+  and sells raise at least the cash the plan needs; a fractional holding
+  keeps its fraction, as only whole shares are sold;
+- if the rounded plan still leaves less than the cash reserve, buys are
+  trimmed one share at a time, most overweight first; leftover cash then buys
+  single shares of the most underweight targets that fit;
+- trades worth less than `min_trade_value` are dropped.
+
+`phases` splits the trades into steps that each move the same share of the
+way towards the targets, with sells ahead of buys within every step.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Universe:
+    """One row per symbol: held positions and new targets alike."""
+
+    symbol: np.ndarray
+    currency: np.ndarray
+    price: np.ndarray  # local currency
+    fx: np.ndarray  # base currency per unit of local currency
+    shares: np.ndarray
+    avg_cost: np.ndarray  # local currency, per share
+    target: np.ndarray  # weight of the invested amount, 0 to sell out
+
+    @cached_property
+    def unit_value(self) -> np.ndarray:
+        """Value of one share in base currency."""
+        return self.price * self.fx
+
+    @cached_property
+    def value(self) -> np.ndarray:
+        return self.shares * self.unit_value
+
+
+@dataclass(frozen=True)
+class RebalancePlan:
+    universe: Universe
+    final_shares: np.ndarray
+    phase_shares: list[np.ndarray]  # holdings after each phase; the last is final_shares
+    cash: float
+    reserve: float
+
+    @property
+    def total(self) -> float:
+        return float(self.universe.value.sum()) + self.cash
+
+    def cash_after(self, shares: np.ndarray) -> float:
+        u = self.universe
+        return self.cash - float(((shares - u.shares) * u.unit_value).sum())
+
+    def orders(self, before: np.ndarray, after: np.ndarray) -> list[dict[str, Any]]:
+        """Orders turning holdings `before` into `after`, sells first."""
+        u = self.universe
+        delta = after - before
+        sells = np.flatnonzero(delta < 0)
+        buys = np.flatnonzero(delta > 0)
+        out = []
+        for idx, action in ((sells, "SELL"), (buys, "BUY")):
+            quantity = np.abs(delta[idx])
+            value = quantity * u.unit_value[idx]
+            gain = quantity * (u.price[idx] - u.avg_cost[idx]) * u.fx[idx]
+            for row in zip(
+                u.symbol[idx].tolist(),
+                quantity.astype(np.int64).tolist(),
+                np.round(u.price[idx], 2).tolist(),
+                u.currency[idx].tolist(),
+                np.round(value, 2).tolist(),
+                np.round(gain, 2).tolist(),
+            ):
+                symbol, qty, price, currency, est_value, est_gain = row
+                order = {
+                    "action": action,
+                    "symbol": symbol,
+                    "quantity": qty,
+                    "limit_price": price,
+                    "currency": currency,
+                    "estimated_value": est_value,
+                }
+                if action == "SELL":
+                    order["capital_gain"] = est_gain
+                out.append(order)
+        return out
+
+    def phases(self) -> list[dict[str, Any]]:
+        out = []
+        before = self.universe.shares
+        for number, after in enumerate(self.phase_shares, start=1):
+            out.append({
+                "phase": number,
+                "orders": self.orders(before, after),
+                "cash_after": round(self.cash_after(after), 2),
+            })
+            before = after
+        return out
+
+    def positions(self) -> list[dict[str, Any]]:
+        u = self.universe
+        total = self.total or 1.0
+        columns = {
+            "symbol": u.symbol.tolist(),
+            "currency": u.currency.tolist(),
+            "price": np.round(u.price, 4).tolist(),
+            "current_shares": u.shares.tolist(),
+            "target_shares": self.final_shares.tolist(),
+            "current_weight_pct": np.round(u.value / total * 100, 2).tolist(),
+            "target_weight_pct": np.round(
+                u.target * (total - self.reserve) / total * 100, 2
+            ).tolist(),
+            "planned_weight_pct": np.round(
+                self.final_shares * u.unit_value / total * 100, 2
+            ).tolist(),
+        }
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def plan_rebalance(
+    universe: Universe,
+    cash: float,
+    reserve_pct: float = 0.0,
+    tolerance_pct: float = 0.0,
+    min_trade_value: float = 0.0,
+    phases: int = 1,
+) -> RebalancePlan:
+    u = universe
+    unit = u.unit_value
+    total = float(u.value.sum()) + cash
+    reserve = total * reserve_pct / 100
+    investable = total - reserve
+
+    # Leave positions alone that are already close enough to their target.
+    current_weight = u.value / investable if investable > 0 else np.zeros_like(unit)
+    keep = (u.target > 0) & (np.abs(current_weight - u.target) * 100 <= tolerance_pct)
+    final = np.where(keep, u.shares, _whole_trades(u.shares, u.target * investable / unit))
+    final = np.where(_small(u, final, min_trade_value), u.shares, final)
+    trading = ~keep & (u.target > 0)
+
+    def deficit() -> np.ndarray:
+        return u.target * investable - final * unit
+
+    # Trim buys until the plan fits the cash left after the reserve.
+    spare = cash - float(((final - u.shares) * unit).sum()) - reserve
+    while spare < -1e-9:
+        buying = np.flatnonzero(final > u.shares)
+        if not len(buying):
+            break
+        i = buying[np.argmin(deficit()[buying])]
+        final[i] -= 1
+        spare += unit[i]
+
+    # Spend what is left on single shares of the most underweight targets.
+    while True:
+        candidates = np.flatnonzero(
+            trading
+            & (unit <= spare + 1e-9)
+            & (deficit() > 0)
+            & ~_small(u, final + 1, min_trade_value)
+        )
+        if not len(candidates):
+            break
+        i = candidates[np.argmax(deficit()[candidates])]
+        final[i] += 1
+        spare -= unit[i]
+
+    # Trimming can leave buys below the minimum; dropping them only frees cash.
+    final = np.where(_small(u, final, min_trade_value) & (final > u.shares), u.shares, final)
+    return RebalancePlan(
+        universe=u,
+        final_shares=final,
+        phase_shares=_phase_steps(u.shares, final, phases),
+        cash=cash,
+        reserve=reserve,
+    )
+
+
+def _whole_trades(shares: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """Holdings reached from `shares` by whole-share trades towards `wanted`.
+
+    Each trade is rounded down (buy less, sell more), but no more whole
+    shares are sold than are held, so a fractional remainder stays.
+    """
+    return np.maximum(shares + np.floor(wanted - shares), shares - np.floor(shares))
+
+
+def _small(u: Universe, final: np.ndarray, min_trade_value: float) -> np.ndarray:
+    """Rows whose trade is non-zero but worth less than `min_trade_value`."""
+    trade = np.abs(final - u.shares) * u.unit_value
+    return (trade > 0) & (trade < min_trade_value)
+
+
+def _phase_steps(start: np.ndarray, final: np.ndarray, phases: int) -> list[np.ndarray]:
+    """Holdings after each phase, in whole shares, each phase doing 1/phases of every trade."""
+    delta = final - start
+    return [start + np.trunc(delta * k / phases) for k in range(1, phases)] + [final]
@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-import json
-from typing import Any
-
 from mcp.server.fastmcp import Context
 
+from ibkr_mcp.serialization import dumps
 from ibkr_mcp.server import AppContext, mcp
 
 
@@ -12,47 +10,58 @@ from ibkr_mcp.server import AppContext, mcp
 async def positions_resource(ctx: Context) -> str:
     """Current portfolio positions with P&L and market values."""
     app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    return json.dumps([p.to_dict() for p in positions], indent=2)
+    broker, pretty = app.broker, app.config.json_pretty
+
+    async def encode() -> str:
+        if not pretty:
+            return await broker.get_positions_json()
+        positions = await broker.get_positions()
+        return dumps([p.to_dict() for p in positions], pretty=True)
+
+    return await app.payloads.get("positions", broker.data_version("positions"), encode)
 
 
 @mcp.resource("ibkr://account/summary")
 async def account_summary_resource(ctx: Context) -> str:
     """Account summary: NAV, buying power, available funds, and P&L."""
     app: AppContext = ctx.request_context.lifespan_context
-    summary = await app.broker.get_account_summary()
-    return json.dumps(summary.to_dict(), indent=2)
+
+    async def encode() -> str:
+        summary = await app.broker.get_account_summary()
+        return dumps(summary.to_dict(), pretty=app.config.json_pretty)
+
+    return await app.payloads.get("account", app.broker.data_version("account"), encode)
 
 
 @mcp.resource("ibkr://orders/open")
 async def open_orders_resource(ctx: Context) -> str:
     """Currently open/pending orders."""
     app: AppContext = ctx.request_context.lifespan_context
-    orders = await app.broker.get_open_orders()
-    return json.dumps([o.to_dict() for o in orders], indent=2)
+
+    async def encode() -> str:
+        orders = await app.broker.get_open_orders()
+        return dumps([o.to_dict() for o in orders], pretty=app.config.json_pretty)
+
+    return await app.payloads.get("orders", app.broker.data_version("orders"), encode)
 
 
 @mcp.resource("ibkr://portfolio/snapshot")
 async def portfolio_snapshot_resource(ctx: Context) -> str:
     """Full portfolio analysis with positions, weights, and concentration warnings."""
+    from ibkr_mcp.portfolio import load_snapshot
+
     app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    summary = await app.broker.get_account_summary()
-    nav = summary.nav or 1.0
-
-    analyzed = []
-    for pos in positions:
-        weight = pos.market_value / nav
-        analyzed.append({
-            **pos.to_dict(),
-            "weight_pct": round(weight * 100, 2),
-        })
-
-    analyzed.sort(key=lambda p: p["weight_pct"], reverse=True)
-
-    snapshot = {
-        "positions": analyzed,
-        "summary": summary.to_dict(),
-        "total_positions": len(analyzed),
-    }
-    return json.dumps(snapshot, indent=2)
+
+    async def encode() -> str:
+        snapshot = await load_snapshot(app.broker)
+        analyzed = snapshot.weighted_positions()
+        return dumps({
+            "positions": analyzed,
+            "summary": snapshot.summary.to_dict(),
+            "total_positions": len(analyzed),
+            "base_currency": snapshot.base_currency,
+            "fx_rates": snapshot.fx_rates,
+        }, pretty=app.config.json_pretty)
+
+    version = (app.broker.data_version("positions"), app.broker.data_version("account"))
+    return await app.payloads.get("portfolio_snapshot", version, encode)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import AnyUrl
+
+from ibkr_mcp.server import AppContext, mcp
+
+_server = mcp._mcp_server
+_get_capabilities = _server.get_capabilities
+
+
+def _get_capabilities_with_subscribe(*args: Any, **kwargs: Any) -> Any:
+    # FastMCP always advertises subscribe=False; we handle subscriptions below.
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+_server.get_capabilities = _get_capabilities_with_subscribe
+
+
+@_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Send `resources/updated` to this session when the resource's data changes."""
+    ctx = mcp.get_context()
+    app: AppContext = ctx.request_context.lifespan_context
+    app.notifier.subscribe(str(uri), ctx.session)
+
+
+@_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    ctx = mcp.get_context()
+    app: AppContext = ctx.request_context.lifespan_context
+    app.notifier.unsubscribe(str(uri), ctx.session)
@@ -0,0 +1,64 @@
+"""JSON encoding for resources, with an encoded-payload cache.
+
+Uses orjson when it is installed (`pip install ibkr-mcp-server[fast]`) and the
+standard library otherwise. Output is compact unless pretty mode is on.
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is not installed
+    orjson = None
+
+from ibkr_mcp.metrics import REGISTRY
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, option=option).decode()
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class PayloadCache:
+    """Encoded payloads keyed by name, valid while the source data version is unchanged.
+
+    `max_age` bounds how long a payload is reused even if no change was
+    signalled, for data whose updates are not pushed.
+    """
+
+    def __init__(self, max_age: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_age = max_age
+        self._clock = clock
+        self._entries: dict[str, tuple[Hashable, float, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self, name: str, version: Hashable, encode: Callable[[], Awaitable[str]]
+    ) -> str:
+        entry = self._entries.get(name)
+        now = self._clock()
+        if entry is not None and entry[0] == version and now - entry[1] <= self._max_age:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        payload = await REGISTRY.timed("encode", name, encode())
+        self._entries[name] = (version, now, payload)
+        return payload
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
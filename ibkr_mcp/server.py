@@ -3,12 +3,18 @@ from __future__ import annotations
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from mcp.server.fastmcp import FastMCP
 
-from ibkr_mcp.broker import Broker
-from ibkr_mcp.config import ServerConfig
+from ibkr_mcp.metrics import instrument_handlers, serve_prometheus
+from ibkr_mcp.notifications import ResourceNotifier
+from ibkr_mcp.serialization import PayloadCache
+
+if TYPE_CHECKING:
+    from ibkr_mcp.broker import Broker
+    from ibkr_mcp.config import ServerConfig
 
 log = logging.getLogger(__name__)
 
@@ -17,16 +23,43 @@ log = logging.getLogger(__name__)
 class AppContext:
     broker: Broker
     config: ServerConfig
+    payloads: PayloadCache = field(default_factory=PayloadCache)
+    notifier: ResourceNotifier = field(default_factory=ResourceNotifier)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Cache, queue and connection statistics of every component."""
+        return {
+            **self.broker.stats(),
+            "payloads": self.payloads.stats(),
+            "notifications": self.notifier.stats(),
+        }
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    # Imported here rather than at module level: ib_async (and numpy through
+    # it) is only needed once a session starts. pydantic-settings is not
+    # deferred; FastMCP loads it at import anyway.
+    from ibkr_mcp.broker import Broker
+    from ibkr_mcp.config import ServerConfig
+
     config = ServerConfig()
     broker = Broker(config)
-    await broker.connect()
+    notifier = ResourceNotifier(debounce=config.notify_debounce)
+    broker.on_change(notifier.notify)
+    # Connect in the background so the MCP handshake and tool listing don't
+    # wait for the gateway; broker calls wait for the connection instead.
+    broker.start()
+    app = AppContext(broker=broker, config=config, notifier=notifier)
+    exporter = (
+        await serve_prometheus(config.metrics_port, app.stats) if config.metrics_port else None
+    )
     try:
-        yield AppContext(broker=broker, config=config)
+        yield app
     finally:
+        if exporter is not None:
+            exporter.close()
+        notifier.close()
         await broker.disconnect()
 
 
@@ -42,9 +75,13 @@ import ibkr_mcp.tools.account  # noqa: E402, F401
 import ibkr_mcp.tools.market  # noqa: E402, F401
 import ibkr_mcp.tools.trading  # noqa: E402, F401
 import ibkr_mcp.tools.analysis  # noqa: E402, F401
+import ibkr_mcp.tools.diagnostics  # noqa: E402, F401
 import ibkr_mcp.resources.account  # noqa: E402, F401
+import ibkr_mcp.resources.subscriptions  # noqa: E402, F401
 import ibkr_mcp.prompts.templates  # noqa: E402, F401
 
+instrument_handlers(mcp._mcp_server)
+
 
 def main() -> None:
     mcp.run()
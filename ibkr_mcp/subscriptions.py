@@ -0,0 +1,154 @@
+"""Shared streaming market data subscriptions.
+
+Instead of a snapshot per quote, each contract gets one streaming ticker that
+stays subscribed after use, so repeat quotes are read straight from memory.
+Tickers are reference-counted while callers use them; idle ones are evicted
+least-recently-used first when the account's market data line limit is
+reached, or once they have been idle for `idle_ttl` seconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from ib_async import IB, Contract, Ticker
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Subscription:
+    contract: Contract
+    ticker: Ticker
+    refs: int = 0
+    last_used: float = 0.0
+
+
+class SubscriptionManager:
+    def __init__(
+        self,
+        ib: IB,
+        max_lines: int,
+        idle_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ib = ib
+        self._max_lines = max_lines
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._subs: OrderedDict[int, _Subscription] = OrderedDict()
+        self._cond = asyncio.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    @asynccontextmanager
+    async def ticker(self, contract: Contract) -> AsyncIterator[Ticker]:
+        """Yield a streaming ticker for a qualified contract, subscribing if needed.
+
+        Waits for a free line if every line is held by an in-use subscription.
+        """
+        sub = await self._acquire(contract)
+        try:
+            yield sub.ticker
+        finally:
+            await self._release(sub)
+
+    async def _acquire(self, contract: Contract) -> _Subscription:
+        async with self._cond:
+            while True:
+                self._evict_idle()
+                sub = self._subs.get(contract.conId)
+                if sub is not None:
+                    self.hits += 1
+                    break
+                if len(self._subs) < self._max_lines or self._evict_lru():
+                    self.misses += 1
+                    sub = _Subscription(contract, self._ib.reqMktData(contract))
+                    self._subs[contract.conId] = sub
+                    break
+                await self._cond.wait()
+            sub.refs += 1
+            self._subs.move_to_end(contract.conId)
+            return sub
+
+    async def _release(self, sub: _Subscription) -> None:
+        async with self._cond:
+            sub.refs -= 1
+            sub.last_used = self._clock()
+            self._cond.notify_all()
+
+    def _evict_idle(self) -> None:
+        cutoff = self._clock() - self._idle_ttl
+        for con_id, sub in list(self._subs.items()):
+            if sub.refs == 0 and sub.last_used <= cutoff:
+                self._cancel(con_id)
+
+    def _evict_lru(self) -> bool:
+        for con_id, sub in self._subs.items():
+            if sub.refs == 0:
+                self._cancel(con_id)
+                return True
+        return False
+
+    def _cancel(self, con_id: int) -> None:
+        sub = self._subs.pop(con_id)
+        self._ib.cancelMktData(sub.contract)
+        self.evictions += 1
+        log.debug("Unsubscribed market data for %s", sub.contract.symbol)
+
+    def clear(self) -> None:
+        """Forget all subscriptions, e.g. after the connection was lost."""
+        self._subs.clear()
+
+    def resubscribe(self) -> None:
+        """Request market data again for every subscription, e.g. after a reconnect.
+
+        Each subscription gets the fresh ticker; callers still holding the old
+        one see no further updates and return partial data at their deadline.
+        """
+        for sub in self._subs.values():
+            sub.ticker = self._ib.reqMktData(sub.contract)
+        if self._subs:
+            log.info("Resubscribed market data for %d contracts", len(self._subs))
+
+    def use(self, ib: IB) -> None:
+        """Subscribe through another client from now on, forgetting current subscriptions."""
+        if ib is not self._ib:
+            self._ib = ib
+            self.clear()
+
+    def move_to(self, ib: IB) -> None:
+        """Carry every subscription over to another client, e.g. when one drops.
+
+        Lines are cancelled on the current client if it is still connected,
+        since market data lines count against one limit across all clients.
+        """
+        if ib is self._ib:
+            return
+        if self._ib.isConnected():
+            for sub in self._subs.values():
+                self._ib.cancelMktData(sub.contract)
+        self._ib = ib
+        self.resubscribe()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "subscriptions": len(self._subs),
+            "in_use": sum(1 for s in self._subs.values() if s.refs),
+            "max_lines": self._max_lines,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
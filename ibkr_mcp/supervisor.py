@@ -0,0 +1,132 @@
+"""Keep the gateway connection up across drops and gateway restarts.
+
+IB Gateway disconnects all clients during its daily restart, and again when
+a session needs 2FA re-approval. When that happens the supervisor reconnects
+with exponential backoff; callers that need the connection wait on
+`wait_ready` instead of failing while the gateway is away. The first connect
+can run the same way in the background, so the server does not have to wait
+for the gateway before serving.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+class ConnectionSupervisor:
+    """Run `connect` until it succeeds whenever the connection is reported lost.
+
+    `on_connect` runs after every successful connect, to restore state such as
+    market data subscriptions. The connection counts as ready until a loss is
+    reported, so callers only wait while a reconnect is in progress.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[None]],
+        on_connect: Callable[[], None] | None = None,
+        initial_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._connect = connect
+        self._on_connect = on_connect
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._sleep = sleep
+        self._ready = asyncio.Event()
+        self._ready.set()
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+        self._connected_once = False
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_error: str | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def reconnecting(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Connect for the first time; errors propagate to the caller."""
+        self._closed = False
+        await self._connect()
+        self._connected()
+
+    def start_background(self) -> None:
+        """Connect for the first time without waiting, retrying until it succeeds.
+
+        The connection is not ready until then, so `wait_ready` callers wait.
+        """
+        self._closed = False
+        if not self.reconnecting:
+            self._spawn()
+
+    def connection_lost(self) -> None:
+        if self._closed or self.reconnecting:
+            return
+        log.warning("Lost connection to IB Gateway; reconnecting")
+        self._spawn()
+
+    def _spawn(self) -> None:
+        self._ready.clear()
+        self._task = asyncio.ensure_future(self._connect_until_up())
+
+    async def _connect_until_up(self) -> None:
+        delay = self._initial_delay
+        while not self._closed:
+            try:
+                await self._connect()
+            except Exception as e:
+                self.failed_attempts += 1
+                self.last_error = str(e) or type(e).__name__
+                log.warning("Connect failed (%s); retrying in %.1fs", self.last_error, delay)
+                await self._sleep(delay)
+                delay = min(delay * 2, self._max_delay)
+                continue
+            if self._connected_once:
+                self.reconnects += 1
+                log.info("Reconnected to IB Gateway")
+            self._connected()
+            return
+
+    def _connected(self) -> None:
+        self._connected_once = True
+        if self._on_connect is not None:
+            self._on_connect()
+        self._ready.set()
+
+    async def wait_ready(self, timeout: float) -> None:
+        """Return once connected, raising ConnectionError after `timeout` seconds."""
+        if self._ready.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except TimeoutError:
+            raise ConnectionError(
+                f"IB Gateway not connected after waiting {timeout:g}s"
+            ) from None
+
+    def close(self) -> None:
+        """Stop reconnecting, e.g. before an intentional disconnect."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.is_ready,
+            "reconnecting": self.reconnecting,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "last_error": self.last_error,
+        }
@@ -11,38 +11,106 @@ READ_ONLY = ToolAnnotations(readOnlyHint=True, destructiveHint=False)
 
 
 @mcp.tool(annotations=READ_ONLY)
-async def get_positions(ctx: Context) -> list[dict[str, Any]]:
+async def get_positions(
+    accounts: list[str] | str | None = None, ctx: Context = None
+) -> list[dict[str, Any]] | dict[str, Any]:
     """Get all current portfolio positions with P&L, weights, and market values.
 
+    Args:
+        accounts: Account IDs to include, or "ALL" for every managed account
+                  (default: the configured account)
+
     Returns a list of positions including symbol, shares, average cost,
     market price, market value, unrealized/realized P&L, and P&L percentage.
+    With accounts, each position also names its account.
     """
     app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    return [p.to_dict() for p in positions]
+    if accounts is None:
+        positions = await app.broker.get_positions()
+        return [p.to_dict() for p in positions]
+    try:
+        ids = await app.broker.resolve_accounts(accounts)
+    except ValueError as e:
+        return {"error": str(e)}
+    by_account = await app.broker.get_positions_by_account(ids)
+    return [
+        {"account": account, **p.to_dict()}
+        for account, positions in by_account.items()
+        for p in positions
+    ]
 
 
 @mcp.tool(annotations=READ_ONLY)
-async def get_account_summary(ctx: Context) -> dict[str, Any]:
+async def get_account_summary(
+    refresh: bool = False,
+    accounts: list[str] | str | None = None,
+    ctx: Context = None,
+) -> dict[str, Any]:
     """Get account summary including NAV, buying power, available funds, and P&L.
 
+    Values come from IB's live account update stream. Set refresh=true to
+    request a fresh summary from the gateway instead.
+
+    Args:
+        refresh: Bypass the streamed values and query the gateway (default: false)
+        accounts: Account IDs to include, or "ALL" for every managed account
+                  (default: the configured account)
+
     Returns net asset value (NAV), available funds, buying power,
-    unrealized/realized P&L, and base currency.
+    unrealized/realized P&L, cash, base currency, and as_of (time of the last
+    update). With accounts, returns the summary of each account and their
+    total in the first account's base currency.
     """
     app: AppContext = ctx.request_context.lifespan_context
-    summary = await app.broker.get_account_summary()
-    return summary.to_dict()
+    if accounts is None:
+        summary = await app.broker.get_account_summary(refresh=refresh)
+        return summary.to_dict()
+
+    from ibkr_mcp.portfolio import load_account_summaries
+
+    try:
+        ids = await app.broker.resolve_accounts(accounts)
+    except ValueError as e:
+        return {"error": str(e)}
+    summaries, total, fx_rates = await load_account_summaries(app.broker, ids, refresh)
+    return {
+        "accounts": {account: s.to_dict() for account, s in summaries.items()},
+        "total": total.to_dict(),
+        "fx_rates": {c: round(r, 6) for c, r in fx_rates.items()},
+    }
 
 
 @mcp.tool(annotations=READ_ONLY)
-async def get_nav(ctx: Context) -> dict[str, float]:
+async def get_nav(accounts: list[str] | str | None = None, ctx: Context = None) -> dict[str, Any]:
     """Get the current net asset value (NAV) — quick portfolio value check.
 
-    Returns just the NAV number for fast lookups without full account details.
+    Args:
+        accounts: Account IDs to include, or "ALL" for every managed account
+                  (default: the configured account)
+
+    Returns just the NAV number for fast lookups without full account details;
+    with accounts, the combined NAV plus each account's NAV in its own currency.
     """
     app: AppContext = ctx.request_context.lifespan_context
-    summary = await app.broker.get_account_summary()
-    return {"nav": round(summary.nav, 2), "currency": summary.currency}
+    if accounts is None:
+        summary = await app.broker.get_account_summary()
+        return {"nav": round(summary.nav, 2), "currency": summary.currency}
+
+    from ibkr_mcp.portfolio import load_account_summaries
+
+    try:
+        ids = await app.broker.resolve_accounts(accounts)
+    except ValueError as e:
+        return {"error": str(e)}
+    summaries, total, _ = await load_account_summaries(app.broker, ids)
+    return {
+        "nav": round(total.nav, 2),
+        "currency": total.currency,
+        "accounts": {
+            account: {"nav": round(s.nav, 2), "currency": s.currency}
+            for account, s in summaries.items()
+        },
+    }
 
 
 @mcp.tool(annotations=READ_ONLY)
@@ -55,3 +123,28 @@ async def get_open_orders(ctx: Context) -> list[dict[str, Any]]:
     app: AppContext = ctx.request_context.lifespan_context
     orders = await app.broker.get_open_orders()
     return [o.to_dict() for o in orders]
+
+
+@mcp.tool(annotations=READ_ONLY)
+async def wait_for_order(
+    order_id: int,
+    statuses: list[str] | None = None,
+    timeout: float = 30.0,
+    ctx: Context = None,
+) -> dict[str, Any]:
+    """Wait for an order to reach a status instead of polling get_open_orders.
+
+    Args:
+        order_id: The order ID (from place_order or get_open_orders)
+        statuses: IB order statuses to wait for (default: ["Filled"]), e.g.
+                  "Submitted", "PreSubmitted", "Filled", "Cancelled"
+        timeout: Maximum seconds to wait (default: 30, at most 300)
+
+    Returns the order's status, filled/remaining quantity and average fill
+    price, with reached=false if the deadline passed or the order ended in
+    another status (e.g. cancelled while waiting for a fill).
+    """
+    app: AppContext = ctx.request_context.lifespan_context
+    return await app.broker.wait_for_order_state(
+        order_id, statuses or ["Filled"], min(max(timeout, 0.0), 300.0)
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 from mcp.server.fastmcp import Context
@@ -11,136 +12,270 @@ READ_ONLY = ToolAnnotations(readOnlyHint=True, destructiveHint=False)
 
 
 @mcp.tool(annotations=READ_ONLY)
-async def portfolio_snapshot(ctx: Context) -> dict[str, Any]:
+async def portfolio_snapshot(
+    limit: int | None = None,
+    accounts: list[str] | str | None = None,
+    ctx: Context = None,
+) -> dict[str, Any]:
     """Get a full portfolio analysis: positions with weights, NAV, P&L, and concentration data.
 
+    Args:
+        limit: Only return the N largest positions (default: all)
+        accounts: Account IDs to consolidate, or "ALL" for every managed
+                  account (default: the configured account)
+
     Returns positions sorted by weight with percentage of NAV, account summary,
-    and flags any positions exceeding 25% concentration.
+    exposure by currency and security type, and flags any positions exceeding
+    25% concentration. Weights use market values converted into the account's
+    base currency at the FX rates listed in the result. With several accounts,
+    holdings of the same contract are merged, the summary is their total in
+    the first account's base currency, and each account's summary is listed.
     """
+    import numpy as np
+
+    from ibkr_mcp.portfolio import load_snapshot
+
     app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    summary = await app.broker.get_account_summary()
-    nav = summary.nav or 1.0
-
-    analyzed = []
-    warnings = []
-    for pos in positions:
-        weight = pos.market_value / nav
-        entry = {
-            **pos.to_dict(),
-            "weight_pct": round(weight * 100, 2),
-        }
-        analyzed.append(entry)
-        if weight > 0.25:
-            warnings.append(
-                f"{pos.symbol}: {round(weight * 100, 1)}% of NAV (exceeds 25% limit)"
-            )
+    try:
+        ids = None if accounts is None else await app.broker.resolve_accounts(accounts)
+    except ValueError as e:
+        return {"error": str(e)}
+    snapshot = await load_snapshot(app.broker, ids)
+    frame = snapshot.frame
+    weights = snapshot.weights
 
-    analyzed.sort(key=lambda p: p["weight_pct"], reverse=True)
+    over = np.flatnonzero(weights > 0.25)
+    warnings = [
+        f"{symbol}: {pct}% of NAV (exceeds 25% limit)"
+        for symbol, pct in zip(
+            frame.symbol[over].tolist(), np.round(weights[over] * 100, 1).tolist()
+        )
+    ]
 
-    return {
-        "positions": analyzed,
-        "summary": summary.to_dict(),
-        "total_positions": len(analyzed),
+    result = {
+        "positions": snapshot.weighted_positions(limit),
+        "summary": snapshot.summary.to_dict(),
+        "total_positions": len(frame),
+        "base_currency": snapshot.base_currency,
+        "fx_rates": _round_rates(snapshot.fx_rates),
+        "exposure": frame.exposures(snapshot.nav),
         "concentration_warnings": warnings,
     }
+    if snapshot.accounts:
+        result["accounts"] = {a: s.to_dict() for a, s in snapshot.accounts.items()}
+    if snapshot.fx_missing:
+        result["fx_missing"] = snapshot.fx_missing
+    return result
 
 
 @mcp.tool(annotations=READ_ONLY)
 async def concentration_check(
     threshold_pct: float = 25.0,
+    accounts: list[str] | str | None = None,
     ctx: Context = None,
 ) -> dict[str, Any]:
     """Check portfolio for concentration risk — positions exceeding a weight threshold.
 
     Args:
         threshold_pct: Maximum allowed weight percentage (default: 25%)
+        accounts: Account IDs to check as one portfolio, or "ALL" for every
+                  managed account (default: the configured account)
 
-    Returns positions that exceed the threshold with their current weights.
+    Returns positions that exceed the threshold with their current weights,
+    computed in the account's base currency.
     """
+    import numpy as np
+
+    from ibkr_mcp.portfolio import load_snapshot
+
     app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    summary = await app.broker.get_account_summary()
-    nav = summary.nav or 1.0
+    try:
+        ids = None if accounts is None else await app.broker.resolve_accounts(accounts)
+    except ValueError as e:
+        return {"error": str(e)}
+    snapshot = await load_snapshot(app.broker, ids)
+    nav = snapshot.nav
+    frame = snapshot.frame
     threshold = threshold_pct / 100.0
 
-    flagged = []
-    for pos in positions:
-        weight = pos.market_value / nav
-        if weight > threshold:
-            flagged.append({
-                "symbol": pos.symbol,
-                "weight_pct": round(weight * 100, 2),
-                "market_value": round(pos.market_value, 2),
-                "threshold_pct": threshold_pct,
-                "excess_pct": round((weight - threshold) * 100, 2),
-            })
+    over = np.flatnonzero(snapshot.weights > threshold)
+    weights = snapshot.weights[over]
+    flagged = [
+        {
+            "symbol": symbol,
+            "weight_pct": weight_pct,
+            "market_value": market_value,
+            "currency": currency,
+            "market_value_base": market_value_base,
+            "threshold_pct": threshold_pct,
+            "excess_pct": excess_pct,
+        }
+        for symbol, weight_pct, market_value, currency, market_value_base, excess_pct in zip(
+            frame.symbol[over].tolist(),
+            np.round(weights * 100, 2).tolist(),
+            np.round(frame.market_value[over], 2).tolist(),
+            frame.currency[over].tolist(),
+            np.round(frame.market_value_base[over], 2).tolist(),
+            np.round((weights - threshold) * 100, 2).tolist(),
+        )
+    ]
 
     return {
         "nav": round(nav, 2),
+        "base_currency": snapshot.base_currency,
         "threshold_pct": threshold_pct,
         "flagged_positions": flagged,
         "is_concentrated": len(flagged) > 0,
+        **({"accounts": list(snapshot.accounts)} if snapshot.accounts else {}),
     }
 
 
 @mcp.tool(annotations=READ_ONLY)
 async def transition_plan(
     targets: dict[str, float],
+    currencies: dict[str, str] | None = None,
+    cash_reserve_pct: float = 0.0,
+    tolerance_pct: float = 0.0,
+    min_trade_value: float = 0.0,
+    phases: int = 1,
     ctx: Context = None,
 ) -> dict[str, Any]:
-    """Calculate a sell/buy transition plan from current holdings to target allocation.
+    """Calculate an executable plan from current holdings to a target allocation.
 
-    Does NOT execute any trades — just calculates what would need to happen.
+    Does NOT execute any trades. Prices for new target symbols and the FX
+    rates needed are fetched in one batch; the plan is in whole shares, uses
+    available cash, and trades only what is needed to reach the targets.
 
     Args:
         targets: Target allocation as {symbol: weight} where weights sum to 1.0
                  Example: {"VWCE": 0.7, "AGGG": 0.2, "IBC1": 0.1}
+        currencies: Trading currency of targets not currently held, as
+                    {symbol: currency} (default: USD)
+        cash_reserve_pct: Percentage of the portfolio to keep in cash (default: 0)
+        tolerance_pct: Leave positions alone whose weight is within this many
+                       percentage points of their target (default: 0)
+        min_trade_value: Skip trades worth less than this, in base currency
+                         (default: 0)
+        phases: Split the trades into this many equal steps (default: 1)
 
-    Returns sell orders for current positions and buy orders for target ETFs,
-    with estimated values and capital gains impact.
+    Returns sells and buys as orders that can be passed to place_orders
+    (integer quantity, limit_price at the current price, estimated base
+    currency value and, for sells, capital gain), per-symbol current, target
+    and planned weights, cash before and after, the FX rates used and, when
+    phases > 1, the orders for each phase. Only stock holdings are planned:
+    options, futures and other non-stock positions are neither traded nor
+    counted, and are listed under excluded.
     """
-    app: AppContext = ctx.request_context.lifespan_context
-    positions = await app.broker.get_positions()
-    summary = await app.broker.get_account_summary()
+    import numpy as np
+    from ib_async import Stock
+
+    from ibkr_mcp.broker import quote_price
+    from ibkr_mcp.portfolio import load_snapshot
+    from ibkr_mcp.rebalance import Universe, plan_rebalance
 
     total_weight = sum(targets.values())
     if abs(total_weight - 1.0) > 0.01:
         return {"error": f"Target weights must sum to 1.0, got {total_weight}"}
+    if any(w < 0 for w in targets.values()):
+        return {"error": "Target weights must not be negative."}
+    if not 1 <= phases <= 20:
+        return {"error": "phases must be between 1 and 20."}
+    if not 0 <= cash_reserve_pct < 100:
+        return {"error": "cash_reserve_pct must be at least 0 and below 100."}
 
-    sells = []
-    total_proceeds = 0.0
-    total_capital_gains = 0.0
-
-    for pos in positions:
-        if pos.shares <= 0:
-            continue
-        sells.append({
-            "action": "SELL",
-            "symbol": pos.symbol,
-            "shares": pos.shares,
-            "estimated_price": round(pos.market_price, 4),
-            "estimated_value": round(pos.market_value, 2),
-            "capital_gain": round(pos.unrealized_pnl, 2),
-        })
-        total_proceeds += pos.market_value
-        total_capital_gains += pos.unrealized_pnl
-
-    buys = []
-    for symbol, weight in targets.items():
-        target_value = total_proceeds * weight
-        buys.append({
-            "action": "BUY",
-            "symbol": symbol,
-            "target_weight": weight,
-            "estimated_value": round(target_value, 2),
-        })
+    app: AppContext = ctx.request_context.lifespan_context
+    snapshot = await load_snapshot(app.broker)
+    base = snapshot.summary.currency
+    currencies = currencies or {}
 
-    return {
+    # One row per stock contract; other security types cannot be planned as
+    # stock orders (an option on MSFT is not MSFT shares).
+    stocks: dict[Any, int] = {}
+    excluded = []
+    for i, p in enumerate(snapshot.positions):
+        if p.sec_type == "STK":
+            stocks.setdefault(p.con_id or (p.symbol, p.currency), i)
+        else:
+            excluded.append({"symbol": p.symbol, "sec_type": p.sec_type, "con_id": p.con_id})
+    rows = list(stocks.values())
+    held_symbols = [snapshot.positions[i].symbol for i in rows]
+    ambiguous = sorted({s for s in held_symbols if held_symbols.count(s) > 1 and s in targets})
+    if ambiguous:
+        return {"error": "Several stock holdings match target symbols", "symbols": ambiguous}
+    new_symbols = [s for s in targets if s not in held_symbols]
+    new_currencies = [currencies.get(s, "USD") for s in new_symbols]
+
+    # Held currencies were converted by load_snapshot; only new ones need rates.
+    quotes, new_rates = await asyncio.gather(
+        app.broker.get_market_prices(
+            [Stock(s, "SMART", c) for s, c in zip(new_symbols, new_currencies)]
+        ),
+        app.broker.get_fx_rates(
+            [c for c in new_currencies if c not in snapshot.fx_rates], base
+        ),
+    )
+    rates = {**snapshot.fx_rates, **new_rates}
+    prices = {q["symbol"]: quote_price(q) for q in quotes}
+    unpriced = [s for s in new_symbols if not prices.get(s)]
+    if unpriced:
+        return {"error": "No price for target symbols", "symbols": unpriced}
+
+    frame = snapshot.frame
+    symbols = [*held_symbols, *new_symbols]
+    currency = np.concatenate([frame.currency[rows], np.array(new_currencies, dtype=object)])
+    rates[base] = 1.0
+    missing_fx = sorted({c for c in currency.tolist() if c not in rates})
+    if missing_fx:
+        return {"error": "No FX rate into base currency", "currencies": missing_fx}
+
+    universe = Universe(
+        symbol=np.array(symbols, dtype=object),
+        currency=currency,
+        price=np.concatenate([frame.market_price[rows], [prices[s] for s in new_symbols]]),
+        fx=np.array([rates[c] for c in currency.tolist()]),
+        shares=np.concatenate([frame.shares[rows], np.zeros(len(new_symbols))]),
+        avg_cost=np.concatenate([frame.avg_cost[rows], np.zeros(len(new_symbols))]),
+        target=np.array([targets.get(s, 0.0) for s in symbols]),
+    )
+    unpriced = ~(universe.price > 0)
+    if unpriced.any():
+        return {"error": "No price for symbols", "symbols": universe.symbol[unpriced].tolist()}
+
+    plan = plan_rebalance(
+        universe,
+        cash=snapshot.summary.cash,
+        reserve_pct=cash_reserve_pct,
+        tolerance_pct=tolerance_pct,
+        min_trade_value=min_trade_value,
+        phases=phases,
+    )
+    orders = plan.orders(universe.shares, plan.final_shares)
+    sells = [o for o in orders if o["action"] == "SELL"]
+    buys = [o for o in orders if o["action"] == "BUY"]
+    result = {
         "sells": sells,
         "buys": buys,
-        "total_proceeds": round(total_proceeds, 2),
-        "total_capital_gains": round(total_capital_gains, 2),
-        "nav": round(summary.nav, 2),
+        "positions": plan.positions(),
+        "base_currency": base,
+        "fx_rates": _round_rates({c: r for c, r in rates.items() if c != base}),
+        "cash": {
+            "before": round(plan.cash, 2),
+            "reserve": round(plan.reserve, 2),
+            "after": round(plan.cash_after(plan.final_shares), 2),
+        },
+        "total_proceeds": round(sum(o["estimated_value"] for o in sells), 2),
+        "total_purchases": round(sum(o["estimated_value"] for o in buys), 2),
+        "total_capital_gains": round(sum(o["capital_gain"] for o in sells), 2),
+        "nav": round(snapshot.summary.nav, 2),
         "note": "This is a read-only plan. No orders have been placed.",
     }
+    if excluded:
+        result["excluded"] = excluded
+    if phases > 1:
+        result["phases"] = plan.phases()
+    return result
+
+
+def _round_rates(rates: dict[str, float]) -> dict[str, float]:
+    return {c: round(r, 6) for c, r in rates.items()}
+
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any
+
+from mcp.server.fastmcp import Context
+from mcp.types import ToolAnnotations
+
+from ibkr_mcp.metrics import REGISTRY
+from ibkr_mcp.server import AppContext, mcp
+
+READ_ONLY = ToolAnnotations(readOnlyHint=True, destructiveHint=False)
+
+
+@mcp.tool(annotations=READ_ONLY)
+async def server_metrics(ctx: Context) -> dict[str, Any]:
+    """Get the server's own performance metrics, for diagnosing slow calls.
+
+    Returns latency percentiles (p50/p95/p99), call and error counts, calls in
+    flight and throughput for every tool, resource, broker method and gateway
+    request, plus cache hit ratios, pacing queue and connection state.
+    """
+    app: AppContext = ctx.request_context.lifespan_context
+    return {"calls": REGISTRY.snapshot(), "components": app.stats()}
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from typing import Any
 
-from ib_async import Stock
 from mcp.server.fastmcp import Context
 from mcp.types import ToolAnnotations
 
@@ -25,13 +24,43 @@ async def get_quote(
         currency: Currency of the contract (default: USD)
         exchange: Exchange to route to (default: SMART)
 
-    Returns last price, close, bid, and ask.
+    Returns last price, close, bid, and ask. If no last/close price arrives
+    before the quote timeout, returns whatever was received with partial=true.
     """
+    from ib_async import Stock
+
     app: AppContext = ctx.request_context.lifespan_context
     contract = Stock(symbol, exchange, currency)
     return await app.broker.get_market_price(contract)
 
 
+@mcp.tool(annotations=READ_ONLY)
+async def get_quotes(
+    symbols: list[str],
+    currency: str = "USD",
+    exchange: str = "SMART",
+    ctx: Context = None,
+) -> list[dict[str, Any]]:
+    """Get real-time quotes for several stocks or ETFs in one call.
+
+    Much faster than calling get_quote per symbol: all symbols are requested
+    concurrently.
+
+    Args:
+        symbols: Ticker symbols (e.g. ["MSFT", "NVDA", "ARCC"])
+        currency: Currency of the contracts (default: USD)
+        exchange: Exchange to route to (default: SMART)
+
+    Returns one quote per symbol, in the same order, each with last, close,
+    bid, ask, and partial. Unknown symbols return an error entry instead.
+    """
+    from ib_async import Stock
+
+    app: AppContext = ctx.request_context.lifespan_context
+    contracts = [Stock(symbol, exchange, currency) for symbol in symbols]
+    return await app.broker.get_market_prices(contracts)
+
+
 @mcp.tool(annotations=READ_ONLY)
 async def get_historical_bars(
     symbol: str,
@@ -52,6 +81,8 @@ async def get_historical_bars(
 
     Returns a list of bars with date, open, high, low, close, volume.
     """
+    from ib_async import Stock
+
     app: AppContext = ctx.request_context.lifespan_context
     contract = Stock(symbol, exchange, currency)
     return await app.broker.get_historical_bars(contract, duration, bar_size)
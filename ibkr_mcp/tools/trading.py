@@ -4,11 +4,28 @@ from typing import Any
 
 from mcp.server.fastmcp import Context
 from mcp.types import ToolAnnotations
+from pydantic import BaseModel
 
 from ibkr_mcp.server import AppContext, mcp
 
 DESTRUCTIVE = ToolAnnotations(readOnlyHint=False, destructiveHint=True, openWorldHint=True)
 
+# Most orders accepted by one place_orders call.
+MAX_BATCH_ORDERS = 100
+
+TRADING_DISABLED = {
+    "error": "Trading is disabled. Set SAFETY_PAPER_ONLY=false to enable live trading."
+}
+
+
+class OrderSpec(BaseModel):
+    symbol: str
+    action: str
+    quantity: float
+    limit_price: float
+    currency: str = "USD"
+    exchange: str = "SMART"
+
 
 @mcp.tool(annotations=DESTRUCTIVE)
 async def place_order(
@@ -38,18 +55,13 @@ async def place_order(
     app: AppContext = ctx.request_context.lifespan_context
 
     if app.config.safety_paper_only:
-        return {
-            "error": "Trading is disabled. Set SAFETY_PAPER_ONLY=false to enable live trading."
-        }
-
-    if action not in ("BUY", "SELL"):
-        return {"error": f"Invalid action '{action}'. Must be 'BUY' or 'SELL'."}
+        return dict(TRADING_DISABLED)
 
-    if quantity <= 0:
-        return {"error": "Quantity must be positive."}
+    from ibkr_mcp.orders import OrderRequest
 
-    if limit_price <= 0:
-        return {"error": "Limit price must be positive."}
+    error = OrderRequest(symbol, action, quantity, limit_price, currency, exchange).error()
+    if error is not None:
+        return {"error": error}
 
     return await app.broker.place_limit_order(
         symbol=symbol,
@@ -73,8 +85,71 @@ async def cancel_order(order_id: int, ctx: Context = None) -> dict[str, Any]:
     app: AppContext = ctx.request_context.lifespan_context
 
     if app.config.safety_paper_only:
-        return {
-            "error": "Trading is disabled. Set SAFETY_PAPER_ONLY=false to enable live trading."
-        }
+        return dict(TRADING_DISABLED)
 
     return await app.broker.cancel_order(order_id)
+
+
+@mcp.tool(annotations=DESTRUCTIVE)
+async def place_orders(orders: list[OrderSpec], ctx: Context = None) -> dict[str, Any]:
+    """Place a batch of limit orders, e.g. the trades from transition_plan.
+
+    IMPORTANT: This places REAL orders. The batch is all or nothing: every
+    order is validated and every contract looked up first, and if any is
+    invalid nothing is placed. Orders are then submitted concurrently,
+    paced under IB's message rate limit.
+
+    Args:
+        orders: Up to 100 orders, each with symbol, action ("BUY"/"SELL"),
+                quantity, limit_price, and optionally currency (default: USD)
+                and exchange (default: SMART)
+
+    Returns placed (count), orders (order_id and status per order, in input
+    order) and errors (index, symbol and reason for each rejected order).
+    """
+    app: AppContext = ctx.request_context.lifespan_context
+
+    if app.config.safety_paper_only:
+        return dict(TRADING_DISABLED)
+
+    if not orders:
+        return {"error": "No orders given."}
+
+    if len(orders) > MAX_BATCH_ORDERS:
+        return {"error": f"At most {MAX_BATCH_ORDERS} orders per batch, got {len(orders)}."}
+
+    from ibkr_mcp.orders import OrderRequest
+
+    return await app.broker.place_limit_orders(
+        [OrderRequest(**o.model_dump()) for o in orders]
+    )
+
+
+@mcp.tool(annotations=DESTRUCTIVE)
+async def cancel_orders(
+    order_ids: list[int] | None = None,
+    symbol: str | None = None,
+    action: str | None = None,
+    ctx: Context = None,
+) -> dict[str, Any]:
+    """Cancel several open orders at once.
+
+    With order_ids, cancels exactly those orders. Otherwise cancels every open
+    order, narrowed by symbol and/or action if given.
+
+    Args:
+        order_ids: Order IDs to cancel (from place_orders or get_open_orders)
+        symbol: Only cancel open orders for this symbol
+        action: Only cancel open "BUY" or "SELL" orders
+
+    Returns the order IDs a cancel was sent for and those not found open.
+    """
+    app: AppContext = ctx.request_context.lifespan_context
+
+    if app.config.safety_paper_only:
+        return dict(TRADING_DISABLED)
+
+    if order_ids is not None and (symbol is not None or action is not None):
+        return {"error": "Give either order_ids or symbol/action filters, not both."}
+
+    return await app.broker.cancel_orders(order_ids, symbol=symbol, action=action)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import json
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
 import pytest
 
+from ib_async import AccountValue
+
 from ibkr_mcp.broker import AccountSummary, Broker, ContractMatch, OpenOrder, Position
 from ibkr_mcp.config import ServerConfig
 from ibkr_mcp.server import AppContext
+from tests.fake_ib import FakeIB
 
 
 MOCK_POSITIONS = [
@@ -76,6 +80,9 @@ def mock_config() -> ServerConfig:
 def mock_broker(mock_config: ServerConfig) -> Broker:
     broker = Broker(mock_config)
     broker.get_positions = AsyncMock(return_value=MOCK_POSITIONS)
+    broker.get_positions_json = AsyncMock(
+        return_value=json.dumps([p.to_dict() for p in MOCK_POSITIONS])
+    )
     broker.get_account_summary = AsyncMock(return_value=MOCK_SUMMARY)
     broker.get_open_orders = AsyncMock(return_value=[])
     broker.get_market_price = AsyncMock(return_value={
@@ -84,7 +91,12 @@ def mock_broker(mock_config: ServerConfig) -> Broker:
         "close": 425.00,
         "bid": 426.75,
         "ask": 426.85,
+        "partial": False,
     })
+    broker.get_market_prices = AsyncMock(return_value=[
+        {"symbol": "MSFT", "last": 426.80, "close": 425.00, "bid": 426.75, "ask": 426.85, "partial": False},
+        {"symbol": "NVDA", "last": 185.45, "close": 184.10, "bid": 185.40, "ask": 185.50, "partial": False},
+    ])
     broker.get_historical_bars = AsyncMock(return_value=[
         {"date": "2026-02-25", "open": 420.0, "high": 428.0, "low": 419.0, "close": 426.8, "volume": 1500000},
     ])
@@ -95,6 +107,19 @@ def mock_broker(mock_config: ServerConfig) -> Broker:
         "order_id": 42, "symbol": "VWCE", "action": "BUY", "quantity": 10, "limit_price": 95.0, "status": "Submitted",
     })
     broker.cancel_order = AsyncMock(return_value={"order_id": 42, "status": "cancel_requested"})
+    broker.place_limit_orders = AsyncMock(return_value={
+        "placed": 1,
+        "orders": [{
+            "order_id": 42, "symbol": "VWCE", "action": "BUY", "quantity": 10,
+            "limit_price": 95.0, "status": "Submitted",
+        }],
+        "errors": [],
+    })
+    broker.cancel_orders = AsyncMock(return_value={"cancel_requested": [42], "not_found": []})
+    broker.wait_for_order_state = AsyncMock(return_value={
+        "order_id": 42, "perm_id": 9001, "symbol": "VWCE", "status": "Filled",
+        "filled": 10, "remaining": 0, "avg_fill_price": 95.0, "reached": True,
+    })
     return broker
 
 
@@ -109,3 +134,35 @@ def mock_ctx(app_context: AppContext) -> MagicMock:
     ctx = MagicMock()
     ctx.request_context.lifespan_context = app_context
     return ctx
+
+
+@pytest.fixture
+def fake_ib() -> FakeIB:
+    return FakeIB(latency=0.05)
+
+
+@pytest.fixture
+def sub_accounts(fake_ib: FakeIB) -> list[str]:
+    """Advisor login: the configured account plus sub-accounts U2 and U3."""
+    fake_ib.add_position("MSFT", 100, 380.0)
+    fake_ib.add_holding("U2", "MSFT", 50, 400.0)
+    fake_ib.add_holding("U2", "NVDA", 10, 150.0)
+    fake_ib.add_holding("U3", "ARCC", 100, 20.0)
+    fake_ib.account_values += [
+        AccountValue("U2", "NetLiquidation", "30000", "USD", ""),
+        AccountValue("U3", "NetLiquidation", "2000", "USD", ""),
+    ]
+    return fake_ib.accounts
+
+
+@pytest.fixture
+def fake_broker(mock_config: ServerConfig, fake_ib: FakeIB) -> Broker:
+    """A real Broker wired to the in-process fake gateway."""
+    return Broker(mock_config, ib=fake_ib)
+
+
+@pytest.fixture
+def fake_ctx(fake_broker: Broker, mock_config: ServerConfig) -> MagicMock:
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = AppContext(broker=fake_broker, config=mock_config)
+    return ctx
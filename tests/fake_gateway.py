@@ -0,0 +1,331 @@
+"""Offline IB Gateway speaking the TWS API socket protocol.
+
+Unlike `FakeIB`, which replaces the `ib_async.IB` object, this is a TCP
+server that a real `IB` client (and so a real `Broker`) connects to. It
+implements the subset of the wire protocol the server uses: the handshake,
+positions and account updates, account summary, contract details, symbol
+search, streaming quotes, historical bars and order placement/cancellation.
+
+Every response is delayed by `latency` seconds. Historical requests beyond
+`history_limit` per `history_window` seconds get IB's pacing violation error,
+and `drop_connections()` closes every client socket as a gateway restart would.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from ibkr_mcp.bars import bar_seconds, duration_seconds
+from tests.fake_ib import CONTRACTS
+
+SERVER_VERSION = 157
+
+# Tick types used for quotes.
+BID, ASK, LAST, CLOSE = 1, 2, 4, 9
+
+
+@dataclass
+class GatewayPosition:
+    symbol: str
+    shares: float
+    avg_cost: float
+
+
+def _encode(*fields: Any) -> bytes:
+    body = "".join(f"{'' if f is None else f}\0" for f in fields).encode()
+    return struct.pack(">I", len(body)) + body
+
+
+class _Session:
+    def __init__(self, gateway: FakeGateway, writer: asyncio.StreamWriter) -> None:
+        self.gateway = gateway
+        self.writer = writer
+        self.client_id = 0
+
+    def send(self, *messages: tuple[Any, ...]) -> None:
+        """Send messages after the gateway's latency, keeping their order."""
+        payload = b"".join(_encode(*m) for m in messages)
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.gateway.latency, self._write, payload)
+
+    def _write(self, payload: bytes) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(payload)
+
+
+class FakeGateway:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        account: str = "U16261491",
+        history_limit: int | None = None,
+        history_window: float = 600.0,
+    ) -> None:
+        self.latency = latency
+        self.account = account
+        self.history_limit = history_limit
+        self.history_window = history_window
+        self.positions = [
+            GatewayPosition("MSFT", 100, 380.0),
+            GatewayPosition("NVDA", 200, 120.0),
+            GatewayPosition("VWCE", 300, 88.0),
+        ]
+        self.account_values = {
+            "NetLiquidation": "147527.00",
+            "AvailableFunds": "12500.00",
+            "BuyingPower": "25000.00",
+            "UnrealizedPnL": "13750.00",
+            "RealizedPnL": "0",
+        }
+        # (value, currency) of the "Currency" rows: one per currency plus the BASE total.
+        self.currency_rows = [("BASE", "BASE"), ("USD", "USD")]
+        self.requests: dict[int, int] = {}
+        self.pacing_errors = 0
+        self._history_times: list[float] = []
+        self._order_ids = itertools.count(1)
+        self._perm_ids = itertools.count(9000)
+        self._orders: dict[int, tuple[float, int]] = {}
+        self._sessions: set[_Session] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._server: asyncio.Server | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening and return the bound port."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self.port
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "gateway not started"
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        self.drop_connections()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def drop_connections(self) -> None:
+        for session in list(self._sessions):
+            session.writer.close()
+        self._sessions.clear()
+
+    # --- Protocol ---
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = _Session(self, writer)
+        self._sessions.add(session)
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            await reader.readexactly(4)  # b"API\0"
+            await self._read_message(reader)  # supported client versions
+            writer.write(_encode(SERVER_VERSION, time.strftime("%Y%m%d %H:%M:%S UTC")))
+            while True:
+                fields = await self._read_message(reader)
+                msg_id = int(fields[0])
+                self.requests[msg_id] = self.requests.get(msg_id, 0) + 1
+                handler = self._handlers.get(msg_id)
+                if handler is not None:
+                    handler(self, session, fields)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._sessions.discard(session)
+            self._tasks.discard(task)
+            writer.close()
+
+    @staticmethod
+    async def _read_message(reader: asyncio.StreamReader) -> list[str]:
+        (size,) = struct.unpack(">I", await reader.readexactly(4))
+        return (await reader.readexactly(size)).decode().split("\0")[:-1]
+
+    def _contract_fields(self, symbol: str) -> tuple[Any, ...]:
+        con_id, exchange, _ = CONTRACTS[symbol]
+        currency = "EUR" if exchange == "IBIS2" else "USD"
+        return con_id, symbol, "STK", "", 0.0, "", "", exchange, currency, symbol, symbol
+
+    def _values(self) -> list[tuple[str, str, str]]:
+        """Account values as (tag, value, currency) rows."""
+        return [(tag, value, "USD") for tag, value in self.account_values.items()] + [
+            ("Currency", value, currency) for value, currency in self.currency_rows
+        ]
+
+    # --- Handlers, keyed by outgoing message id ---
+
+    def _start_api(self, session: _Session, fields: list[str]) -> None:
+        session.client_id = int(fields[2])
+        session.send((9, 1, next(self._order_ids)), (15, 1, self.account))
+
+    def _req_positions(self, session: _Session, fields: list[str]) -> None:
+        messages: list[tuple[Any, ...]] = []
+        for p in self.positions:
+            con_id, symbol, sec_type, _, strike, right, mult, exchange, currency, local, tc = (
+                self._contract_fields(p.symbol)
+            )
+            messages.append((
+                61, 3, self.account, con_id, symbol, sec_type, "", strike, right, mult,
+                exchange, currency, local, tc, p.shares, p.avg_cost,
+            ))
+        session.send(*messages, (62, 1))
+
+    def _req_open_orders(self, session: _Session, fields: list[str]) -> None:
+        session.send((53, 1))
+
+    def _req_completed_orders(self, session: _Session, fields: list[str]) -> None:
+        session.send((102,))
+
+    def _req_executions(self, session: _Session, fields: list[str]) -> None:
+        session.send((55, 1, fields[2]))
+
+    def _req_account_updates(self, session: _Session, fields: list[str]) -> None:
+        if fields[2] != "1":
+            return
+        messages: list[tuple[Any, ...]] = [
+            (6, 2, tag, value, currency, self.account) for tag, value, currency in self._values()
+        ]
+        for p in self.positions:
+            con_id, symbol, sec_type, _, strike, right, mult, exchange, currency, local, tc = (
+                self._contract_fields(p.symbol)
+            )
+            price = CONTRACTS[p.symbol][2]
+            value = p.shares * price
+            messages.append((
+                7, 8, con_id, symbol, sec_type, "", strike, right, mult, exchange, currency,
+                local, tc, p.shares, price, value, p.avg_cost, value - p.shares * p.avg_cost,
+                0.0, self.account,
+            ))
+        session.send(*messages, (8, 1, time.strftime("%H:%M")), (54, 1, self.account))
+
+    def _req_account_updates_multi(self, session: _Session, fields: list[str]) -> None:
+        req_id = fields[2]
+        session.send(
+            *[
+                (73, 1, req_id, self.account, "", tag, value, currency)
+                for tag, value, currency in self._values()
+            ],
+            (74, 1, req_id),
+        )
+
+    def _req_account_summary(self, session: _Session, fields: list[str]) -> None:
+        req_id = fields[2]
+        session.send(
+            *[
+                (63, 1, req_id, self.account, tag, value, currency)
+                for tag, value, currency in self._values()
+            ],
+            (64, 1, req_id),
+        )
+
+    def _req_contract_details(self, session: _Session, fields: list[str]) -> None:
+        req_id, symbol, exchange = fields[2], fields[4], fields[10]
+        if symbol not in CONTRACTS:
+            session.send(
+                (4, 2, req_id, 200, "No security definition has been found for the request")
+            )
+            return
+        con_id, primary, _ = CONTRACTS[symbol]
+        currency = "EUR" if primary == "IBIS2" else "USD"
+        session.send(
+            (
+                10, 8, req_id, symbol, "STK", "", 0.0, "", exchange or primary, currency, symbol,
+                symbol, symbol, con_id, 0.01, 1, "", "LMT,MKT", f"SMART,{primary}", 1, 0,
+                f"{symbol} INC", primary, "", "", "", "", "US/Eastern", "", "", "", "", 0,
+                "1", "", "", "26", "", "COMMON",
+            ),
+            (52, 1, req_id),
+        )
+
+    def _req_matching_symbols(self, session: _Session, fields: list[str]) -> None:
+        req_id, pattern = fields[1], fields[2].upper()
+        matches = [s for s in CONTRACTS if s.startswith(pattern)]
+        body: list[Any] = []
+        for symbol in matches:
+            con_id, primary, _ = CONTRACTS[symbol]
+            body += [con_id, symbol, "STK", primary, "EUR" if primary == "IBIS2" else "USD", 0]
+        session.send((79, req_id, len(matches), *body))
+
+    def _req_mkt_data(self, session: _Session, fields: list[str]) -> None:
+        req_id, symbol = fields[2], fields[4]
+        price = CONTRACTS.get(symbol, (0, "", 0.0))[2]
+        if not price:
+            return
+        session.send(
+            (1, 6, req_id, BID, round(price - 0.05, 2), 100, 0),
+            (1, 6, req_id, ASK, round(price + 0.05, 2), 100, 0),
+            (1, 6, req_id, LAST, price, 100, 0),
+            (1, 6, req_id, CLOSE, round(price - 1.8, 2), 0, 0),
+        )
+
+    def _req_historical_data(self, session: _Session, fields: list[str]) -> None:
+        req_id, symbol = fields[1], fields[3]
+        end_str, bar_size, duration = fields[15], fields[16], fields[17]
+        now = time.monotonic()
+        self._history_times = [t for t in self._history_times if t > now - self.history_window]
+        if self.history_limit is not None and len(self._history_times) >= self.history_limit:
+            self.pacing_errors += 1
+            session.send((
+                4, 2, req_id, 162,
+                "Historical Market Data Service error message:Historical data request pacing violation",
+            ))
+            return
+        self._history_times.append(now)
+
+        end = (
+            datetime.datetime.strptime(end_str[:17], "%Y%m%d %H:%M:%S").replace(tzinfo=datetime.UTC)
+            if end_str
+            else datetime.datetime.now(datetime.UTC)
+        )
+        price = CONTRACTS.get(symbol, (0, "", 100.0))[2]
+        step = bar_seconds(bar_size)
+        count = max(1, duration_seconds(duration) // step)
+        bars: list[Any] = []
+        n = 0
+        for i in reversed(range(count)):
+            t = end - datetime.timedelta(seconds=i * step)
+            if step >= 86400:
+                if t.weekday() >= 5:
+                    continue
+                date = t.strftime("%Y%m%d")
+            else:
+                date = int(t.timestamp())
+            bars += [date, price, price + 1, price - 1, price, 1_000_000, price, 1000]
+            n += 1
+        session.send((17, req_id, "", "", n, *bars))
+
+    def _place_order(self, session: _Session, fields: list[str]) -> None:
+        order_id, quantity = int(fields[1]), float(fields[17])
+        perm_id = next(self._perm_ids)
+        self._orders[order_id] = (quantity, perm_id)
+        session.send(self._order_status(session, order_id, "Submitted"))
+
+    def _cancel_order(self, session: _Session, fields: list[str]) -> None:
+        order_id = int(fields[2])
+        if order_id in self._orders:
+            session.send(self._order_status(session, order_id, "Cancelled"))
+
+    def _order_status(self, session: _Session, order_id: int, status: str) -> tuple[Any, ...]:
+        quantity, perm_id = self._orders[order_id]
+        return (3, order_id, status, 0, quantity, 0, perm_id, 0, 0, session.client_id, "", 0)
+
+    _handlers = {
+        71: _start_api,
+        61: _req_positions,
+        5: _req_open_orders,
+        99: _req_completed_orders,
+        7: _req_executions,
+        6: _req_account_updates,
+        76: _req_account_updates_multi,
+        62: _req_account_summary,
+        9: _req_contract_details,
+        81: _req_matching_symbols,
+        1: _req_mkt_data,
+        20: _req_historical_data,
+        3: _place_order,
+        4: _cancel_order,
+    }
@@ -0,0 +1,308 @@
+"""In-process stand-in for `ib_async.IB` with injectable gateway latency.
+
+Only the async request/response surface that `Broker` uses is implemented.
+Every request waits `latency` seconds on the event loop before answering,
+the way a real gateway round trip would, so tests can check that concurrent
+Broker calls overlap instead of queueing behind each other.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+from collections import Counter
+from typing import Any
+
+from eventkit import Event
+from ib_async import (
+    AccountValue,
+    BarData,
+    Contract,
+    ContractDescription,
+    Order,
+    OrderStatus,
+    PortfolioItem,
+    Position,
+    Stock,
+    Ticker,
+    Trade,
+)
+
+from ibkr_mcp.bars import duration_seconds
+
+CONTRACTS = {
+    "MSFT": (272093, "NASDAQ", 426.80),
+    "ARCC": (4812047, "NASDAQ", 19.27),
+    "NVDA": (4815747, "NASDAQ", 185.45),
+    "VWCE": (383958843, "IBIS2", 95.10),
+    # Currency pairs, keyed by the pair's base currency: EUR.USD and USD.JPY.
+    "EUR": (12087792, "IDEALPRO", 1.08),
+    "USD": (15016059, "IDEALPRO", 150.0),
+}
+
+
+class FakeIB:
+    def __init__(self, latency: float = 0.0, account: str = "U16261491") -> None:
+        self.latency = latency
+        self.account = account
+        # Managed accounts; only `account` has a portfolio subscription.
+        self.accounts = [account]
+        self.holdings: list[Position] = []
+        self.calls: Counter[str] = Counter()
+        # Most requests awaiting their response at the same time.
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._trades: list[Trade] = []
+        self.portfolio_items: list[PortfolioItem] = []
+        self.account_values: list[AccountValue] = [
+            AccountValue(account, "NetLiquidation", "147527.00", "USD", ""),
+            AccountValue(account, "AvailableFunds", "12500.00", "USD", ""),
+            AccountValue(account, "BuyingPower", "25000.00", "USD", ""),
+            AccountValue(account, "UnrealizedPnL", "13750.00", "USD", ""),
+            AccountValue(account, "RealizedPnL", "0", "USD", ""),
+            # As IB sends them: one row per currency plus one for the BASE total.
+            AccountValue(account, "Currency", "BASE", "BASE", ""),
+            AccountValue(account, "Currency", "USD", "USD", ""),
+        ]
+        self.history_requests: list[tuple[Any, str]] = []
+        # ib_async answers a failed historical request (pacing violation,
+        # timeout, HMDS outage) with an empty list rather than raising.
+        self.history_down = False
+        self.today = datetime.datetime.now(datetime.UTC).date()
+        self._next_order_id = 1
+        self._connected = False
+        self.refuse_connect = False
+        self.connect_delay = 0.0
+        self._generation = 0
+        self.disconnectedEvent = Event("disconnectedEvent")
+        self.client_id: int | None = None
+        self.accountValueEvent = Event("accountValueEvent")
+        self.updatePortfolioEvent = Event("updatePortfolioEvent")
+        self.orderStatusEvent = Event("orderStatusEvent")
+        self.openOrderEvent = Event("openOrderEvent")
+        self.execDetailsEvent = Event("execDetailsEvent")
+        self.cancelOrderEvent = Event("cancelOrderEvent")
+
+    async def _round_trip(self, name: str) -> None:
+        self.calls[name] += 1
+        generation = self._generation
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self._generation != generation:
+            raise ConnectionError("Socket disconnect")
+
+    # --- Connection ---
+
+    async def connectAsync(
+        self,
+        host: str,
+        port: int,
+        clientId: int,
+        readonly: bool = False,
+        account: str = "",
+        fetchFields: Any = None,
+    ):
+        await self._round_trip("connectAsync")
+        await asyncio.sleep(self.connect_delay)
+        if self.refuse_connect:
+            raise ConnectionRefusedError(f"Client {clientId} refused")
+        self.client_id = clientId
+        self._connected = True
+        return self
+
+    def disconnect(self) -> None:
+        """Close the connection; requests in flight fail with ConnectionError."""
+        self._generation += 1
+        if self._connected:
+            self._connected = False
+            self.disconnectedEvent.emit()
+
+    def isConnected(self) -> bool:
+        return self._connected
+
+    def managedAccounts(self) -> list[str]:
+        # Like ib_async, accounts are only known once connected.
+        return list(self.accounts) if self._connected else []
+
+    # --- Contracts ---
+
+    async def qualifyContractsAsync(self, *contracts: Contract) -> list[Contract | None]:
+        await self._round_trip("qualifyContractsAsync")
+        result: list[Contract | None] = []
+        for contract in contracts:
+            known = CONTRACTS.get(contract.symbol)
+            if known is None:
+                result.append(None)
+                continue
+            contract.conId, contract.primaryExchange, _ = known
+            result.append(contract)
+        return result
+
+    async def reqMatchingSymbolsAsync(self, pattern: str) -> list[ContractDescription]:
+        await self._round_trip("reqMatchingSymbolsAsync")
+        return [
+            ContractDescription(contract=Stock(symbol, exchange, "USD", conId=con_id))
+            for symbol, (con_id, exchange, _) in CONTRACTS.items()
+            if pattern.upper() in symbol
+        ]
+
+    # --- Account ---
+
+    def portfolio(self, account: str = "") -> list[PortfolioItem]:
+        return [i for i in self.portfolio_items if not account or i.account == account]
+
+    def positions(self, account: str = "") -> list[Position]:
+        subscribed = [
+            Position(i.account, i.contract, i.position, i.averageCost)
+            for i in self.portfolio_items
+        ]
+        return [p for p in subscribed + self.holdings if not account or p.account == account]
+
+    def push_account_values(self) -> None:
+        """Emit every account value as IB's account update stream would."""
+        for value in self.account_values:
+            self.accountValueEvent.emit(value)
+
+    def add_holding(self, account: str, symbol: str, shares: float, avg_cost: float) -> None:
+        """A position in a sub-account: on the position stream only, without prices."""
+        con_id, exchange, _ = CONTRACTS[symbol]
+        if account not in self.accounts:
+            self.accounts.append(account)
+        contract = Stock(symbol, "", "USD", conId=con_id, primaryExchange=exchange)
+        self.holdings.append(Position(account, contract, shares, avg_cost))
+
+    def add_position(self, symbol: str, shares: float, avg_cost: float) -> PortfolioItem:
+        con_id, exchange, price = CONTRACTS[symbol]
+        item = PortfolioItem(
+            contract=Stock(symbol, exchange, "USD", conId=con_id),
+            position=shares,
+            marketPrice=price,
+            marketValue=shares * price,
+            averageCost=avg_cost,
+            unrealizedPNL=shares * (price - avg_cost),
+            realizedPNL=0.0,
+            account=self.account,
+        )
+        self.portfolio_items.append(item)
+        return item
+
+    async def accountSummaryAsync(self, account: str = "") -> list[AccountValue]:
+        await self._round_trip("accountSummaryAsync")
+        return [v for v in self.account_values if not account or v.account == account]
+
+    # --- Market data ---
+
+    def reqMktData(
+        self,
+        contract: Contract,
+        genericTickList: str = "",
+        snapshot: bool = False,
+        *args: Any,
+    ) -> Ticker:
+        self.calls["reqMktData"] += 1
+        ticker = Ticker(contract=contract)
+        known = CONTRACTS.get(contract.symbol)
+        if known is not None:
+            price = known[2]
+            # The first tick is the gateway's answer: count the wait for it.
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+            def deliver() -> None:
+                self.in_flight -= 1
+                ticker.last = price
+                ticker.close = price
+                ticker.bid = round(price - 0.05, 2)
+                ticker.ask = round(price + 0.05, 2)
+                ticker.updateEvent.emit(ticker)
+
+            asyncio.get_running_loop().call_later(self.latency, deliver)
+        return ticker
+
+    def cancelMktData(self, contract: Contract) -> bool:
+        self.calls["cancelMktData"] += 1
+        return True
+
+    async def reqHistoricalDataAsync(
+        self,
+        contract: Contract,
+        endDateTime: Any,
+        durationStr: str,
+        barSizeSetting: str,
+        whatToShow: str,
+        useRTH: bool,
+        *args: Any,
+        **kwargs: Any,
+    ) -> list[BarData]:
+        """Daily weekday bars for the requested window, ending at endDateTime or today."""
+        await self._round_trip("reqHistoricalDataAsync")
+        self.history_requests.append((endDateTime, durationStr))
+        if self.history_down:
+            return []
+        price = CONTRACTS[contract.symbol][2]
+        end = endDateTime.date() if endDateTime else self.today
+        days = max(1, duration_seconds(durationStr) // 86400)
+        dates = [end - datetime.timedelta(days=i) for i in range(days)]
+        return [
+            BarData(
+                date=d,
+                open=price,
+                high=price + 1,
+                low=price - 1,
+                close=price,
+                volume=1_000_000,
+            )
+            for d in reversed(dates)
+            if d.weekday() < 5
+        ]
+
+    # --- Orders ---
+
+    def trades(self) -> list[Trade]:
+        return list(self._trades)
+
+    def openTrades(self) -> list[Trade]:
+        return [t for t in self._trades if not t.isDone()]
+
+    def placeOrder(self, contract: Contract, order: Order) -> Trade:
+        """Place an order; the gateway acknowledges it as Submitted after `latency`."""
+        self.calls["placeOrder"] += 1
+        order.orderId = self._next_order_id
+        order.clientId = self.client_id or 0
+        self._next_order_id += 1
+        trade = Trade(contract, order, OrderStatus(orderId=order.orderId, status="PendingSubmit"))
+        self._trades.append(trade)
+        self._push_status(trade, "Submitted")
+        return trade
+
+    def cancelOrder(self, order: Order) -> None:
+        self.calls["cancelOrder"] += 1
+        for trade in self._trades:
+            if trade.order.orderId == order.orderId:
+                trade.orderStatus.status = "PendingCancel"
+                self.cancelOrderEvent.emit(trade)
+                self._push_status(trade, "Cancelled")
+
+    def fill(self, order_id: int) -> None:
+        """Fill an order completely, as the gateway would report it."""
+        for trade in self._trades:
+            if trade.order.orderId == order_id:
+                trade.orderStatus.filled = trade.order.totalQuantity
+                trade.orderStatus.remaining = 0
+                trade.orderStatus.avgFillPrice = trade.order.lmtPrice
+                self.execDetailsEvent.emit(trade, None)
+                self._set_status(trade, "Filled")
+
+    def _push_status(self, trade: Trade, status: str) -> None:
+        asyncio.get_running_loop().call_later(self.latency, self._set_status, trade, status)
+
+    def _set_status(self, trade: Trade, status: str) -> None:
+        if trade.isDone():
+            return
+        trade.orderStatus.status = status
+        if status == "Submitted":
+            trade.orderStatus.remaining = trade.order.totalQuantity
+        self.orderStatusEvent.emit(trade)
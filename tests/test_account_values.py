@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from ib_async import AccountValue
+
+from ibkr_mcp.account_values import AccountValueStore
+
+
+def test_base_currency_row_wins():
+    store = AccountValueStore(clock=lambda: 123.0)
+    store.update(AccountValue("U1", "NetLiquidation", "1000", "EUR", ""))
+    store.update(AccountValue("U1", "UnrealizedPnL", "50", "USD", ""))
+    store.update(AccountValue("U1", "UnrealizedPnL", "45", "BASE", ""))
+    store.update(AccountValue("U1", "UnrealizedPnL", "60", "GBP", ""))
+
+    values, as_of = store.get("U1")
+    assert values["UnrealizedPnL"] == "45"
+    assert values["Currency"] == "EUR"
+    assert as_of == 123.0
+
+
+def test_ignores_other_tags_and_model_rows():
+    store = AccountValueStore()
+    store.update(AccountValue("U1", "AccountCode", "U1", "", ""))
+    store.update(AccountValue("U1", "NetLiquidation", "5", "USD", "MODEL1"))
+    assert store.get("U1") is None
+    assert store.get("U2") is None
+
+
+def test_base_currency_ignores_currency_rows():
+    store = AccountValueStore()
+    store.update(AccountValue("U1", "Currency", "BASE", "BASE", ""))
+    store.update(AccountValue("U1", "Currency", "EUR", "EUR", ""))
+    store.update(AccountValue("U1", "NetLiquidation", "100000", "EUR", ""))
+    store.update(AccountValue("U1", "Currency", "USD", "USD", ""))
+
+    values, _ = store.get("U1")
+    assert values["Currency"] == "EUR"
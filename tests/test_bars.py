@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from ib_async import Stock
+
+from ibkr_mcp.bars import BarSeries, BarStore, bar_seconds, duration_seconds, ib_duration
+from ibkr_mcp.pacing import HistoricalPacer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_duration_helpers():
+    assert duration_seconds("5 D") == 5 * 86400
+    assert duration_seconds("1 Y") == 366 * 86400
+    assert bar_seconds("5 mins") == 300
+    assert bar_seconds("1 day") == 86400
+    assert ib_duration(10) == "30 S"
+    assert ib_duration(3 * 86400 + 1) == "4 D"
+    with pytest.raises(ValueError):
+        duration_seconds("forever")
+
+
+def test_merge_overwrites_and_sorts():
+    series = BarSeries()
+    series.merge([{"ts": 2.0, "date": "b", "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1}])
+    series.merge([
+        {"ts": 1.0, "date": "a", "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1},
+        {"ts": 2.0, "date": "b", "open": 2, "high": 2, "low": 2, "close": 2, "volume": 2},
+    ])
+    assert series.ts == [1.0, 2.0]
+    assert series.rows_since(1.5) == [
+        {"date": "b", "open": 2, "high": 2, "low": 2, "close": 2, "volume": 2},
+    ]
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def stored_broker(fake_broker, tmp_path, clock):
+    fake_broker._bars = BarStore(tmp_path, clock=clock)
+    return fake_broker
+
+
+@pytest.mark.asyncio
+async def test_warm_request_served_locally(stored_broker, fake_ib):
+    cold = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    warm = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    assert warm == cold
+    assert len(fake_ib.history_requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_tail_fetches_only_new_bars(stored_broker, fake_ib, clock):
+    await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+    clock.now += 600
+    await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+    assert fake_ib.history_requests[0] == ("", "1 Y")
+    end, duration = fake_ib.history_requests[1]
+    assert end == "" and duration_seconds(duration) <= 5 * 86400
+
+
+@pytest.mark.asyncio
+async def test_longer_window_fetches_only_head(stored_broker, fake_ib):
+    await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    bars = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "3 M")
+    assert len(fake_ib.history_requests) == 2
+    end, duration = fake_ib.history_requests[1]
+    assert end != "" and duration == "62 D"
+    assert len(bars) > 60
+
+
+@pytest.mark.asyncio
+async def test_store_persists_across_instances(stored_broker, fake_ib, tmp_path, clock):
+    await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    stored_broker._bars = BarStore(tmp_path, clock=clock)
+    await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    assert len(fake_ib.history_requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_leaves_span_uncovered(stored_broker, fake_ib, tmp_path, clock):
+    month = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    fake_ib.history_down = True
+    during = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+    assert during == month
+
+    fake_ib.history_down = False
+    # Past the identical-request window, and reload from disk: the hole must not persist.
+    stored_broker._pacer = HistoricalPacer(clock=clock)
+    clock.now += 60
+    stored_broker._bars = BarStore(tmp_path, clock=clock)
+    sent = len(fake_ib.history_requests)
+    year = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 Y")
+    assert len(fake_ib.history_requests) > sent
+    assert len(year) > 200
+
+
+@pytest.mark.asyncio
+async def test_store_keeps_recent_series_in_memory(stored_broker, fake_ib, tmp_path, clock):
+    store = stored_broker._bars = BarStore(tmp_path, max_series=1, clock=clock)
+    msft = await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M")
+    await stored_broker.get_historical_bars(Stock("NVDA", "SMART", "USD"), "1 M")
+    assert len(store) == 1 and store.evictions == 1
+
+    # The evicted series is read back from disk, not re-fetched.
+    assert await stored_broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M") == msft
+    assert len(fake_ib.history_requests) == 2
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from ib_async import AccountValue, Stock
+
+from ibkr_mcp.tools.account import get_account_summary
+from ibkr_mcp.tools.market import get_historical_bars, get_quote, search_contracts
+
+
+@pytest.mark.asyncio
+async def test_get_market_price_completes_on_update(fake_broker, fake_ib, mock_config):
+    # A deadline far beyond the test: partial=False means the update ended the wait.
+    mock_config.quote_timeout = 30.0
+    fake_ib.latency = 0.01
+    result = await fake_broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+
+    assert result["last"] == 426.80
+    assert result["partial"] is False
+
+
+@pytest.mark.asyncio
+async def test_get_market_price_partial_on_deadline(fake_broker, fake_ib, mock_config):
+    mock_config.quote_timeout = 0.05
+    fake_ib.latency = 1.0
+    contract = Stock("MSFT", "SMART", "USD")
+    contract.conId = 272093
+
+    result = await fake_broker._quote(contract)
+
+    assert result["partial"] is True
+    assert result["last"] is None
+    # The stream is released but kept for the next caller, not cancelled.
+    assert fake_ib.calls["reqMktData"] == 1
+    assert fake_ib.calls["cancelMktData"] == 0
+    market_data = fake_broker.stats()["market_data"]
+    assert (market_data["subscriptions"], market_data["in_use"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_repeat_quote_served_from_stream(fake_broker, fake_ib):
+    await fake_broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+    result = await fake_broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+
+    # No gateway round trip, and no wait for another update: a wait would
+    # end at the quote timeout with partial=True.
+    assert result["last"] == 426.80
+    assert result["partial"] is False
+    assert fake_ib.calls["qualifyContractsAsync"] == 1
+    assert fake_ib.calls["reqMktData"] == 1
+    assert fake_ib.calls["cancelMktData"] == 0
+    assert fake_broker.stats()["market_data"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_market_prices_runs_concurrently(fake_broker, fake_ib):
+    contracts = [Stock(s, "SMART", "USD") for s in ("MSFT", "NVDA", "ARCC", "BOGUS")]
+
+    result = await fake_broker.get_market_prices(contracts)
+
+    assert fake_ib.calls["qualifyContractsAsync"] == 1
+    assert [q["symbol"] for q in result] == ["MSFT", "NVDA", "ARCC", "BOGUS"]
+    assert result[1]["last"] == 185.45
+    assert "error" in result[3]
+    # One qualify round trip, then the three quotes wait on the gateway together.
+    assert fake_ib.calls["reqMktData"] == 3
+    assert fake_ib.peak_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_qualification_is_cached(fake_broker, fake_ib):
+    await fake_broker._qualify(Stock("MSFT", "SMART", "USD"))
+    second = Stock("MSFT", "SMART", "USD")
+    await fake_broker._qualify(second)
+
+    assert fake_ib.calls["qualifyContractsAsync"] == 1
+    assert second.conId == 272093
+    assert fake_broker.stats()["contracts"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_calls_overlap(fake_ctx, fake_ib):
+    """N tool calls against a slow gateway share the gateway instead of queueing."""
+    fake_ib.latency = 0.1
+    calls = [
+        get_quote("MSFT", ctx=fake_ctx),
+        get_quote("NVDA", ctx=fake_ctx),
+        get_historical_bars("ARCC", ctx=fake_ctx),
+        get_account_summary(ctx=fake_ctx),
+        search_contracts("MS", ctx=fake_ctx),
+    ]
+
+    results = await asyncio.gather(*calls)
+
+    assert results[0]["last"] == 426.80
+    assert len(results[2]) > 0
+    assert results[3]["nav"] == 147527.00
+    # Every call's first request (three lookups, the summary, the search) is
+    # with the gateway at the same time.
+    assert fake_ib.peak_in_flight == len(calls)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced(fake_broker, fake_ib):
+    summaries = await asyncio.gather(*(fake_broker.get_account_summary() for _ in range(3)))
+    quotes = await asyncio.gather(
+        *(fake_broker.get_market_price(Stock("NVDA", "SMART", "USD")) for _ in range(3))
+    )
+    bars = await asyncio.gather(
+        *(fake_broker.get_historical_bars(Stock("ARCC", "SMART", "USD")) for _ in range(3))
+    )
+
+    assert fake_ib.calls["accountSummaryAsync"] == 1
+    assert fake_ib.calls["qualifyContractsAsync"] == 2
+    assert fake_ib.calls["reqHistoricalDataAsync"] == 1
+    assert all(s.nav == 147527.00 for s in summaries)
+    assert all(q["last"] == 185.45 for q in quotes)
+    assert bars[0] == bars[2]
+    assert fake_broker.stats()["coalescing"]["shared"] == 6
+
+
+@pytest.mark.asyncio
+async def test_account_summary_served_from_pushed_values(fake_broker, fake_ib):
+    fake_ib.push_account_values()
+    summary = await fake_broker.get_account_summary()
+
+    assert fake_ib.calls["accountSummaryAsync"] == 0
+    assert summary.nav == 147527.00
+    assert summary.currency == "USD"
+    assert summary.to_dict()["as_of"] is not None
+
+    fake_ib.accountValueEvent.emit(AccountValue("U16261491", "NetLiquidation", "150000", "USD", ""))
+    assert (await fake_broker.get_account_summary()).nav == 150000.00
+
+    refreshed = await fake_broker.get_account_summary(refresh=True)
+    assert fake_ib.calls["accountSummaryAsync"] == 1
+    assert refreshed.nav == 147527.00
+    assert refreshed.currency == "USD"
+
+
+@pytest.mark.asyncio
+async def test_positions_json_matches_position_dicts(fake_broker, fake_ib):
+    fake_ib.add_position("MSFT", 107, 380.50)
+    fake_ib.add_position("ARCC", 1643, 19.5)
+    fake_ib.add_position("NVDA", 0, 0.0)
+
+    encoded = json.loads(await fake_broker.get_positions_json())
+    expected = [p.to_dict() for p in await fake_broker.get_positions()]
+    assert encoded == expected
+    assert encoded[2]["pnl_pct"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_resolve_accounts(fake_broker, sub_accounts):
+    await fake_broker.connect()
+    assert await fake_broker.resolve_accounts("ALL") == ["U16261491", "U2", "U3"]
+    assert await fake_broker.resolve_accounts(["U3", "U2", "U3"]) == ["U3", "U2"]
+    with pytest.raises(ValueError, match="U9"):
+        await fake_broker.resolve_accounts(["U2", "U9"])
+
+
+@pytest.mark.asyncio
+async def test_accounts_fetched_concurrently(fake_broker, fake_ib, sub_accounts):
+    accounts = ["U16261491", "U2", "U3"]
+
+    positions, summaries = await asyncio.gather(
+        fake_broker.get_positions_by_account(accounts),
+        fake_broker.get_account_summaries(accounts),
+    )
+
+    # U2 and U3 are priced from quotes; their contract lookups overlap with
+    # each other and with the one summary request for all accounts.
+    assert fake_ib.calls["qualifyContractsAsync"] == 2
+    assert fake_ib.peak_in_flight == 3
+    assert [p.shares for p in positions["U16261491"]] == [100]
+    msft = positions["U2"][0]
+    assert msft.market_value == pytest.approx(50 * 426.80)
+    assert msft.unrealized_pnl == pytest.approx(50 * 26.80)
+    assert positions["U3"][0].market_price == 19.27
+    assert [s.nav for s in summaries.values()] == [147527.0, 30000.0, 2000.0]
+    assert fake_ib.calls["accountSummaryAsync"] == 1
+
+
+@pytest.mark.asyncio
+async def test_account_fetch_concurrency_is_bounded(mock_config, fake_ib, sub_accounts):
+    from ibkr_mcp.broker import Broker
+
+    broker = Broker(mock_config.model_copy(update={"account_concurrency": 1}), ib=fake_ib)
+
+    await broker.get_positions_by_account(["U2", "U3"])
+    assert fake_ib.calls["qualifyContractsAsync"] == 2
+    # U2's two quotes overlap each other, but never U3's requests.
+    assert fake_ib.peak_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_default_account_resolved_after_connect(mock_config, fake_ib):
+    from ibkr_mcp.broker import Broker
+
+    fake_ib.accounts.append("U2")  # advisor login, IB_ACCOUNT unset
+    fake_ib.connect_delay = 0.05
+    broker = Broker(mock_config.model_copy(update={"ib_account": ""}), ib=fake_ib)
+    broker.start()
+    try:
+        summary = await broker.get_account_summary()
+    finally:
+        await broker.disconnect()
+    assert summary.nav == 147527.00
+    assert summary.as_of is not None
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from ib_async import Stock
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.clients import ClientPool
+from tests.fake_ib import FakeIB
+
+
+def make_pool(size: int, latency: float = 0.0) -> tuple[ClientPool, list[FakeIB]]:
+    clients = [FakeIB(latency=latency) for _ in range(size)]
+    return ClientPool(clients, client_id=7), clients
+
+
+def test_routing_by_pool_size():
+    pool, (only,) = make_pool(1)
+    assert {pool.route(w) for w in ("orders", "market_data", "historical")} == {only}
+
+    pool, (master, history) = make_pool(2)
+    assert pool.route("orders") is master
+    assert pool.route("market_data") is master
+    assert pool.route("historical") is history
+
+    pool, (master, quotes, history) = make_pool(3)
+    assert pool.route("orders") is master
+    assert pool.route("market_data") is quotes
+    assert pool.route("historical") is history
+
+
+def test_pool_size_is_bounded():
+    with pytest.raises(ValueError):
+        ClientPool([])
+    assert len(ClientPool.create(10)) == 3
+
+
+@pytest.mark.asyncio
+async def test_connect_assigns_distinct_client_ids():
+    pool, clients = make_pool(3)
+    await pool.connect("127.0.0.1", 4003, readonly=True, account="")
+    assert [c.client_id for c in clients] == [7, 8, 9]
+    assert pool.stats() == {"orders": 7, "market_data": 8, "historical": 9}
+
+    pool.disconnect()
+    assert not any(c.isConnected() for c in clients)
+
+
+@pytest.mark.asyncio
+async def test_failed_secondary_falls_back_to_master():
+    pool, (master, quotes, history) = make_pool(3)
+    history.refuse_connect = True
+    await pool.connect("127.0.0.1", 4003, readonly=True, account="")
+    assert pool.route("market_data") is quotes
+    assert pool.route("historical") is master
+
+
+@pytest.mark.asyncio
+async def test_backfill_does_not_block_orders(mock_config):
+    pool, (master, history) = make_pool(2)
+    history.latency = 0.3
+    broker = Broker(mock_config, pool=pool)
+    await broker.connect()
+
+    contract = Stock("MSFT", "SMART", "USD")
+    await broker._qualify(contract)
+    backfill = asyncio.ensure_future(broker.get_historical_bars(contract, "1 Y"))
+    await asyncio.sleep(0)
+    result = await asyncio.wait_for(
+        broker.place_limit_order("MSFT", "BUY", 1, 400.0), timeout=0.1
+    )
+    assert result["order_id"]
+    assert not backfill.done()
+
+    await backfill
+    assert history.calls["reqHistoricalDataAsync"] == 1
+    assert master.calls["reqHistoricalDataAsync"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dropped_secondary_reconnects_alone(mock_config):
+    pool, (master, quotes, history) = make_pool(3)
+    broker = Broker(mock_config, pool=pool)
+    await broker.connect()
+
+    history.disconnect()
+    assert pool.route("historical") is master
+    await asyncio.gather(*broker._client_tasks)
+
+    assert master.isConnected() and quotes.isConnected() and history.isConnected()
+    assert master.calls["connectAsync"] == 1
+    assert quotes.calls["connectAsync"] == 1
+    assert history.calls["connectAsync"] == 2
+    assert history.client_id == 9
+    assert pool.route("historical") is history
+    assert broker._supervisor.reconnects == 0
+
+
+@pytest.mark.asyncio
+async def test_dropped_market_data_client_moves_streams(mock_config):
+    pool, (master, quotes, history) = make_pool(3)
+    broker = Broker(mock_config, pool=pool)
+    await broker.connect()
+    await broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+    assert quotes.calls["reqMktData"] == 1
+
+    quotes.refuse_connect = True
+    quotes.disconnect()
+    await asyncio.gather(*broker._client_tasks)
+    assert pool.route("market_data") is master
+    assert master.calls["reqMktData"] == 1
+
+    quotes.refuse_connect = False
+    await broker._reconnect_client(quotes)
+    assert pool.route("market_data") is quotes
+    assert master.calls["cancelMktData"] == 1
+    assert quotes.calls["reqMktData"] == 2
+
+
+@pytest.mark.asyncio
+async def test_backfill_replays_on_master_when_client_drops(mock_config):
+    pool, (master, history) = make_pool(2, latency=0.05)
+    broker = Broker(mock_config, pool=pool)
+    await broker.connect()
+
+    contract = Stock("MSFT", "SMART", "USD")
+    await broker._qualify(contract)
+    backfill = asyncio.ensure_future(broker.get_historical_bars(contract, "1 Y"))
+    while not history.in_flight:
+        await asyncio.sleep(0)
+    history.refuse_connect = True
+    history.disconnect()
+
+    assert await backfill
+    assert master.calls["reqHistoricalDataAsync"] == 1
+    # The replay was never answered before, so it skips the identical-request interval.
+    assert broker._pacer.stats()["max_wait_ms"] < 15000
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import time
+
+from ib_async import Stock
+
+from ibkr_mcp.contracts import ContractCache, contract_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _qualified(symbol: str, con_id: int) -> Stock:
+    contract = Stock(symbol, "SMART", "USD")
+    contract.conId = con_id
+    contract.primaryExchange = "NASDAQ"
+    return contract
+
+
+def test_hit_and_miss_counters():
+    cache = ContractCache()
+    key = contract_key(Stock("MSFT", "SMART", "USD"))
+    assert cache.get(key) is None
+    cache.put(key, _qualified("MSFT", 272093))
+    assert cache.get(key).conId == 272093
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ContractCache(ttl=60, clock=clock)
+    key = contract_key(Stock("MSFT", "SMART", "USD"))
+    cache.put(key, _qualified("MSFT", 272093))
+    clock.now += 61
+    assert cache.get(key) is None
+    assert cache.get_by_con_id(272093) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_and_con_id_index():
+    cache = ContractCache(max_size=2)
+    keys = [contract_key(Stock(s, "SMART", "USD")) for s in ("MSFT", "NVDA", "ARCC")]
+    cache.put(keys[0], _qualified("MSFT", 1))
+    cache.put(keys[1], _qualified("NVDA", 2))
+    cache.get(keys[0])  # MSFT is now most recently used
+    cache.put(keys[2], _qualified("ARCC", 3))
+    assert cache.get(keys[1]) is None
+    assert cache.get_by_con_id(1).symbol == "MSFT"
+    assert cache.get_by_con_id(2) is None
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = tmp_path / "contracts.json"
+    cache = ContractCache()
+    key = contract_key(Stock("MSFT", "SMART", "USD"))
+    cache.put(key, _qualified("MSFT", 272093))
+    cache.save(path)
+
+    restored = ContractCache()
+    assert restored.load(path) == 1
+    contract = restored.get(key)
+    assert contract.conId == 272093
+    assert contract.primaryExchange == "NASDAQ"
+    assert restored.load(tmp_path / "missing.json") == 0
+
+
+def test_load_skips_malformed_rows(tmp_path):
+    path = tmp_path / "contracts.json"
+    cache = ContractCache()
+    key = contract_key(Stock("MSFT", "SMART", "USD"))
+    cache.put(key, _qualified("MSFT", 272093))
+    cache.save(path)
+    rows = json.loads(path.read_text())
+    rows += [
+        {"key": ["NVDA", "STK", "SMART", "USD"], "stored_at": time.time()},
+        {"key": ["ARCC"], "stored_at": time.time(), "contract": {"symbol": "ARCC"}},
+        {"key": ["VWCE", "STK", "SMART", "EUR"], "stored_at": "soon", "contract": {}},
+        {"key": ["AGGG", "STK", "SMART", "EUR"], "stored_at": time.time(), "contract": {"x": 1}},
+        "not a row",
+    ]
+    path.write_text(json.dumps(rows))
+
+    restored = ContractCache()
+    assert restored.load(path) == 1
+    assert restored.get(key).conId == 272093
+
+    path.write_text('{"key": ')
+    assert ContractCache().load(path) == 0
+    path.write_text('{"rows": []}')
+    assert ContractCache().load(path) == 0
@@ -0,0 +1,95 @@
+"""The real Broker against the offline gateway, over the TWS socket protocol."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from ib_async import Stock
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.config import ServerConfig
+from tests.fake_gateway import FakeGateway
+
+
+@pytest.fixture
+async def gateway() -> AsyncIterator[FakeGateway]:
+    gateway = FakeGateway(latency=0.005)
+    await gateway.start()
+    yield gateway
+    await gateway.close()
+
+
+@pytest.fixture
+async def broker(gateway: FakeGateway) -> AsyncIterator[Broker]:
+    broker = Broker(
+        ServerConfig(
+            ib_gateway_port=gateway.port,
+            ib_account=gateway.account,
+            safety_paper_only=False,
+            reconnect_initial_delay=0.01,
+        )
+    )
+    await broker.connect()
+    yield broker
+    await broker.disconnect()
+
+
+async def test_portfolio_and_account(broker: Broker):
+    positions = await broker.get_positions()
+    assert [p.symbol for p in positions] == ["MSFT", "NVDA", "VWCE"]
+    assert positions[0].market_value == 42680.0
+
+    summary = await broker.get_account_summary(refresh=True)
+    assert summary.nav == 147527.0
+    assert summary.currency == "USD"
+    assert (await broker.get_account_summary()).currency == "USD"
+
+
+async def test_quotes_bars_and_search(broker: Broker):
+    quote = await broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+    assert quote["last"] == 426.80
+    assert quote["bid"] < quote["ask"]
+
+    quotes = await broker.get_market_prices(
+        [Stock("NVDA", "SMART", "USD"), Stock("NOPE", "SMART", "USD")]
+    )
+    assert quotes[0]["last"] == 185.45
+    assert "error" in quotes[1]
+
+    bars = await broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "1 M", "1 day")
+    assert 15 <= len(bars) <= 23
+    assert bars[-1]["close"] == 426.80
+
+    matches = await broker.search_contracts("MS")
+    assert [m.symbol for m in matches] == ["MSFT"]
+
+
+async def test_place_and_cancel_order(broker: Broker):
+    placed = await broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+    await asyncio.sleep(0.05)
+    assert [o.status for o in await broker.get_open_orders()] == ["Submitted"]
+
+    await broker.cancel_order(placed["order_id"])
+    await asyncio.sleep(0.05)
+    assert await broker.get_open_orders() == []
+
+
+async def test_pacing_violation(gateway: FakeGateway, broker: Broker):
+    gateway.history_limit = 0
+    bars = await broker.get_historical_bars(Stock("MSFT", "SMART", "USD"), "5 D", "1 hour")
+    assert bars == []
+    assert gateway.pacing_errors == 1
+
+
+async def test_reads_survive_gateway_restart(gateway: FakeGateway, broker: Broker):
+    gateway.latency = 0.05
+    fetch = asyncio.ensure_future(broker.get_account_summary(refresh=True))
+    await asyncio.sleep(0.02)
+    gateway.drop_connections()
+    gateway.latency = 0.005
+
+    summary = await fetch
+    assert summary.nav == 147527.0
+    assert gateway.requests[71] == 2  # startApi on both connections
+    assert broker.stats()["connection"]["reconnects"] == 1
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ibkr_mcp.fx import FxRateCache, fx_pair, is_currency, quote_rate
+
+
+def test_fx_pair_follows_market_convention():
+    assert fx_pair("EUR", "USD") == ("EURUSD", False)
+    assert fx_pair("USD", "EUR") == ("EURUSD", True)
+    assert fx_pair("JPY", "USD") == ("USDJPY", True)
+    assert fx_pair("SEK", "EUR") == ("EURSEK", True)
+    assert quote_rate({"bid": 1.079, "ask": 1.081}) == pytest.approx(1.08)
+    assert quote_rate({"bid": None, "ask": None, "last": None, "close": 1.07}) == 1.07
+    assert quote_rate({"symbol": "EUR", "error": "Unknown contract"}) is None
+
+
+@pytest.mark.asyncio
+async def test_broker_fx_rates(fake_broker, fake_ib):
+    await fake_broker.connect()
+    rates = await fake_broker.get_fx_rates(["EUR", "JPY", "USD", "GBP"], "USD")
+    assert rates == {"EUR": pytest.approx(1.08), "JPY": pytest.approx(1 / 150)}
+    assert fake_ib.calls["qualifyContractsAsync"] == 1
+
+
+def test_fx_rate_cache_expires_and_stores_inverse():
+    now = [0.0]
+    cache = FxRateCache(ttl=60.0, clock=lambda: now[0])
+    cache.put("EUR", "USD", 1.08)
+    assert cache.get("EUR", "USD") == 1.08
+    assert cache.get("USD", "EUR") == pytest.approx(1 / 1.08)
+    now[0] = 61.0
+    assert cache.get("EUR", "USD") is None
+    assert cache.stats() == {"rates": 2, "hits": 2, "misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_broker_fx_rates_cached(fake_broker, fake_ib):
+    await fake_broker.connect()
+    await fake_broker.get_fx_rates(["EUR"], "USD")
+    quotes = fake_ib.calls["reqMktData"]
+    assert await fake_broker.get_fx_rates(["EUR", "USD"], "USD") == {"EUR": pytest.approx(1.08)}
+    assert await fake_broker.get_fx_rates(["USD"], "EUR") == {"USD": pytest.approx(1 / 1.08)}
+    assert fake_ib.calls["reqMktData"] == quotes
+    assert fake_broker.stats()["fx_rates"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_broker_fx_rates_skip_invalid_codes(fake_broker, fake_ib):
+    await fake_broker.connect()
+    assert not is_currency("BASE") and not is_currency("usd") and is_currency("EUR")
+    rates = await fake_broker.get_fx_rates(["EUR", "BASE", "", "EURO"], "USD")
+    assert rates == {"EUR": pytest.approx(1.08)}
+    assert await fake_broker.get_fx_rates(["USD", "EUR"], "BASE") == {}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_with_unquotable_base_reports_missing_fx(fake_broker):
+    from ibkr_mcp.portfolio import load_snapshot
+    from tests.conftest import MOCK_POSITIONS, MOCK_SUMMARY
+
+    await fake_broker.connect()
+    fake_broker.get_positions = AsyncMock(return_value=MOCK_POSITIONS)
+    fake_broker.get_account_summary = AsyncMock(return_value=replace(MOCK_SUMMARY, currency="BASE"))
+    snapshot = await load_snapshot(fake_broker)
+    assert snapshot.fx_missing == ["USD"]
+    assert snapshot.weighted_positions()[0]["symbol"] == "MSFT"
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+# Only needed once a session starts or a tool runs.
+DEFERRED_MODULES = ("ib_async", "numpy", "ibkr_mcp.broker", "ibkr_mcp.portfolio")
+
+_PROBE = """
+import json, sys
+import ibkr_mcp.server
+print(json.dumps([m for m in %r if m in sys.modules]))
+""" % (DEFERRED_MODULES,)
+
+
+def test_server_import_defers_heavy_modules():
+    # A fresh interpreter: other tests have long since imported these.
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(out.splitlines()[-1]) == []
+
+
+def test_tools_registered_at_import():
+    from ibkr_mcp.server import mcp
+
+    names = {tool.name for tool in mcp._tool_manager.list_tools()}
+    assert {"get_positions", "get_quote", "portfolio_snapshot", "place_order"} <= names
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.metrics import REGISTRY, Histogram, Metrics, serve_prometheus
+from ibkr_mcp.server import mcp
+from tests.fake_ib import FakeIB
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    REGISTRY.reset()
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for _ in range(90):
+        histogram.observe(0.004)
+    for _ in range(10):
+        histogram.observe(0.8)
+
+    assert 0.0025 < histogram.percentile(0.5) <= 0.005
+    assert 0.5 < histogram.percentile(0.95) <= 0.8
+    assert histogram.percentile(1.0) == 0.8
+    assert histogram.summary()["count"] == 100
+
+
+def test_measure_counts_errors_and_in_flight():
+    now = [0.0]
+    metrics = Metrics(clock=lambda: now[0])
+
+    with metrics.measure("broker", "get_positions"):
+        assert metrics.snapshot() == {}
+        now[0] += 0.2
+    with pytest.raises(ValueError):
+        with metrics.measure("broker", "get_positions"):
+            raise ValueError
+
+    stats = metrics.snapshot()["broker"]["get_positions"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_ms"] == 200.0
+
+
+@pytest.mark.asyncio
+async def test_broker_and_gateway_calls_are_measured(fake_broker):
+    await fake_broker.get_account_summary(refresh=True)
+    calls = REGISTRY.snapshot()
+    assert calls["broker"]["get_account_summary"]["count"] == 1
+    assert calls["gateway"]["accountSummary"]["count"] == 1
+    assert calls["gateway"]["accountSummary"]["p50_ms"] > 0
+
+
+def test_prometheus_text():
+    with REGISTRY.measure("tool", "get_quote"):
+        pass
+    text = REGISTRY.prometheus_text({"contracts": {"hit_ratio": 0.75, "note": "x"}})
+    assert "# TYPE ibkr_mcp_call_seconds histogram" in text
+    assert 'ibkr_mcp_call_seconds_bucket{kind="tool",name="get_quote",le="+Inf"} 1' in text
+    assert 'ibkr_mcp_call_seconds_count{kind="tool",name="get_quote"} 1' in text
+    assert 'ibkr_mcp_stat{group="contracts",name="hit_ratio"} 0.75' in text
+    assert "note" not in text
+
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint():
+    with REGISTRY.measure("tool", "get_nav"):
+        pass
+    server = await serve_prometheus(0, lambda: {})
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert 'name="get_nav"' in response
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_measured_and_reported():
+    ib = FakeIB()
+    with patch("ibkr_mcp.broker.Broker", lambda config: Broker(config, ib=ib)):
+        async with create_connected_server_and_client_session(mcp) as session:
+            await session.call_tool("get_nav", {})
+            await session.call_tool("get_quote", {})
+            result = await session.call_tool("server_metrics", {})
+
+    data = json.loads(result.content[0].text)
+    assert data["calls"]["tool"]["get_nav"]["count"] == 1
+    assert data["calls"]["tool"]["get_quote"]["errors"] == 1
+    assert data["calls"]["broker"]["get_account_summary"]["count"] == 1
+    assert "hit_ratio" in data["components"]["contracts"]
+    assert "hit_ratio" in data["components"]["payloads"]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from mcp.server.lowlevel import NotificationOptions
+
+from ibkr_mcp.notifications import ResourceNotifier
+from ibkr_mcp.resources.subscriptions import subscribe_resource, unsubscribe_resource
+from ibkr_mcp.server import AppContext, mcp
+
+
+class FakeSession:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.updates: list[str] = []
+
+    async def send_resource_updated(self, uri) -> None:
+        if self.fail:
+            raise ConnectionError("closed")
+        self.updates.append(str(uri))
+
+
+@pytest.mark.asyncio
+async def test_burst_of_events_sends_one_notification_per_resource():
+    notifier = ResourceNotifier(debounce=0.01)
+    session = FakeSession()
+    notifier.subscribe("ibkr://positions", session)
+    notifier.subscribe("ibkr://portfolio/snapshot", session)
+
+    for _ in range(200):
+        notifier.notify("positions")
+    notifier.notify("account")
+    await asyncio.sleep(0.05)
+
+    assert sorted(session.updates) == ["ibkr://portfolio/snapshot", "ibkr://positions"]
+    assert notifier.stats() == {"subscriptions": 2, "events": 201, "sent": 2}
+
+
+@pytest.mark.asyncio
+async def test_only_subscribed_resources_are_notified():
+    notifier = ResourceNotifier(debounce=0.01)
+    session = FakeSession()
+    notifier.subscribe("ibkr://orders/open", session)
+    notifier.notify("positions")
+    await asyncio.sleep(0.03)
+    assert session.updates == []
+
+    notifier.notify("orders")
+    await asyncio.sleep(0.03)
+    assert session.updates == ["ibkr://orders/open"]
+
+    notifier.unsubscribe("ibkr://orders/open", session)
+    notifier.notify("orders")
+    await asyncio.sleep(0.03)
+    assert session.updates == ["ibkr://orders/open"]
+
+
+@pytest.mark.asyncio
+async def test_failing_session_is_dropped():
+    notifier = ResourceNotifier(debounce=0)
+    good, gone = FakeSession(), FakeSession(fail=True)
+    notifier.subscribe("ibkr://account/summary", good)
+    notifier.subscribe("ibkr://account/summary", gone)
+
+    notifier.notify("account")
+    await notifier.flush()
+
+    assert good.updates == ["ibkr://account/summary"]
+    assert notifier.stats()["subscriptions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_broker_events_reach_subscribers(fake_broker, fake_ib):
+    notifier = ResourceNotifier(debounce=0.01)
+    fake_broker.on_change(notifier.notify)
+    session = FakeSession()
+    notifier.subscribe("ibkr://positions", session)
+
+    for _ in range(10):
+        fake_ib.updatePortfolioEvent.emit(None)
+    await asyncio.sleep(0.05)
+
+    assert session.updates == ["ibkr://positions"]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_handlers_register_calling_session(mock_broker, mock_config):
+    app = AppContext(broker=mock_broker, config=mock_config, notifier=ResourceNotifier())
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = app
+    with patch.object(mcp, "get_context", return_value=ctx):
+        await subscribe_resource("ibkr://positions")
+        assert app.notifier.stats()["subscriptions"] == 1
+        await unsubscribe_resource("ibkr://positions")
+        assert app.notifier.stats()["subscriptions"] == 0
+
+
+def test_capabilities_advertise_subscribe():
+    capabilities = mcp._mcp_server.get_capabilities(NotificationOptions(), {})
+    assert capabilities.resources.subscribe is True
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from ib_async import LimitOrder, Order, OrderStatus, Stock, Trade
+
+from ibkr_mcp.orders import OrderBook, OrderRequest
+from ibkr_mcp.pacing import MessageThrottle
+
+
+@pytest.mark.asyncio
+async def test_place_order_waits_for_acknowledgement(fake_broker, fake_ib, mock_config):
+    mock_config.safety_paper_only = False
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+    assert placed["status"] == "Submitted"
+
+    orders = await fake_broker.get_open_orders()
+    assert [(o.order_id, o.status) for o in orders] == [(placed["order_id"], "Submitted")]
+
+
+@pytest.mark.asyncio
+async def test_place_order_ack_deadline(fake_broker, fake_ib, mock_config):
+    mock_config.order_ack_timeout = 0.01
+    await fake_broker.connect()
+    fake_ib.latency = 0.2
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+    assert placed["status"] == "PendingSubmit"
+
+
+@pytest.mark.asyncio
+async def test_cancel_uses_index(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+
+    assert (await fake_broker.cancel_order(placed["order_id"]))["status"] == "cancel_requested"
+    state = await fake_broker.wait_for_order_state(placed["order_id"], ["Cancelled"], 1.0)
+    assert state["reached"]
+    assert await fake_broker.get_open_orders() == []
+    assert (await fake_broker.cancel_order(placed["order_id"]))["status"] == "not_found"
+    assert (await fake_broker.cancel_order(999))["status"] == "not_found"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_fill(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+
+    waiting = asyncio.ensure_future(
+        fake_broker.wait_for_order_state(placed["order_id"], ["Filled"], 1.0)
+    )
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    fake_ib.fill(placed["order_id"])
+    state = await waiting
+
+    assert state["reached"]
+    assert state["status"] == "Filled"
+    assert state["filled"] == 10
+    assert state["avg_fill_price"] == 400.0
+
+
+@pytest.mark.asyncio
+async def test_wait_ends_when_order_cannot_reach_state(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+
+    waiting = asyncio.ensure_future(
+        fake_broker.wait_for_order_state(placed["order_id"], ["Filled"], 5.0)
+    )
+    await fake_broker.cancel_order(placed["order_id"])
+    state = await asyncio.wait_for(waiting, 1.0)
+    assert not state["reached"]
+    assert state["status"] == "Cancelled"
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+    state = await fake_broker.wait_for_order_state(placed["order_id"], ["Filled"], 0.01)
+    assert not state["reached"]
+    assert state["status"] == "Submitted"
+    assert fake_broker.stats()["orders"]["waiting"] == 0
+
+    missing = await fake_broker.wait_for_order_state(999, ["Filled"], 0.01)
+    assert missing["status"] == "not_found"
+
+
+@pytest.mark.asyncio
+async def test_book_rebuilt_after_reconnect(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_order("MSFT", "BUY", 10, 400.0)
+    fake_ib.disconnect()
+    await fake_broker._supervisor.wait_ready(1.0)
+
+    orders = await fake_broker.get_open_orders()
+    assert [o.order_id for o in orders] == [placed["order_id"]]
+
+
+def test_book_indexes_perm_id():
+    book = OrderBook()
+    trade = Trade(Stock("MSFT"), LimitOrder("BUY", 1, 400.0), OrderStatus(status="Submitted"))
+    trade.order.orderId, trade.orderStatus.permId = 7, 9001
+    book.update(trade)
+    other = Trade(Stock("NVDA"), Order(permId=9002), OrderStatus(status="Submitted"))
+    book.update(other)
+
+    assert book.get(7) is trade
+    assert book.get_by_perm_id(9001) is trade
+    assert book.get_by_perm_id(9002) is other
+    assert len(book.open_orders()) == 2
+
+
+def test_book_keys_order_ids_by_client():
+    book = OrderBook(client_id=1)
+    ours = Trade(Stock("MSFT"), LimitOrder("BUY", 1, 400.0), OrderStatus(status="Submitted"))
+    theirs = Trade(Stock("NVDA"), LimitOrder("BUY", 1, 180.0), OrderStatus(status="Submitted"))
+    ours.order.clientId, ours.order.orderId = 1, 7
+    theirs.order.clientId, theirs.order.orderId = 2, 7
+    book.update(ours)
+    book.update(theirs)
+
+    assert book.get(7) is ours
+    assert book.get(7, client_id=2) is theirs
+    assert [o.client_id for o in book.open_orders()] == [1, 2]
+
+
+def test_book_forgets_finished_orders_after_retention():
+    now = [0.0]
+    book = OrderBook(retention=60.0, clock=lambda: now[0])
+    done = Trade(Stock("MSFT"), LimitOrder("BUY", 1, 400.0), OrderStatus(status="Filled"))
+    done.order.orderId, done.orderStatus.permId = 1, 9001
+    book.update(done)
+    live = Trade(Stock("NVDA"), LimitOrder("BUY", 1, 180.0), OrderStatus(status="Submitted"))
+    live.order.orderId = 2
+    book.update(live)
+
+    now[0] = 30.0
+    book.update(done)  # A late event does not restart the clock.
+    now[0] = 61.0
+    book.update(live)
+    assert book.get(1) is None
+    assert book.get_by_perm_id(9001) is None
+    assert book.get(2) is live
+    assert book.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_is_placed_concurrently_and_paced(fake_broker, fake_ib, mock_config):
+    delays: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        delays.append(round(seconds, 6))
+        await asyncio.sleep(0)
+
+    # A frozen clock: every order reserves its slot up front.
+    fake_broker._order_throttle = MessageThrottle(100, clock=lambda: 0.0, sleep=sleep)
+    await fake_broker.connect()
+    placed_at_first_ack: list[int] = []
+
+    def on_status(trade: Trade) -> None:
+        if trade.orderStatus.status == "Submitted" and not placed_at_first_ack:
+            placed_at_first_ack.append(fake_ib.calls["placeOrder"])
+
+    fake_ib.orderStatusEvent += on_status
+    requests = [
+        OrderRequest("MSFT", "SELL", 10, 430.0),
+        OrderRequest("NVDA", "BUY", 5, 180.0),
+        OrderRequest("VWCE", "BUY", 20, 95.0, currency="EUR"),
+    ] * 3
+    result = await fake_broker.place_limit_orders(requests)
+
+    assert result["placed"] == 9
+    assert result["errors"] == []
+    assert [o["symbol"] for o in result["orders"]] == [r.symbol for r in requests]
+    assert {o["status"] for o in result["orders"]} == {"Submitted"}
+    assert fake_ib.calls["qualifyContractsAsync"] == 1
+    # Nine orders at 100/s go out 10ms apart...
+    assert delays == [round(0.01 * i, 6) for i in range(1, 9)]
+    assert fake_broker._order_throttle.stats() == {"sent": 9, "throttled": 8}
+    # ...and every order is sent before the first acknowledgement comes back.
+    assert placed_at_first_ack == [9]
+
+
+@pytest.mark.asyncio
+async def test_invalid_batch_places_nothing(fake_broker, fake_ib):
+    await fake_broker.connect()
+    result = await fake_broker.place_limit_orders([
+        OrderRequest("MSFT", "BUY", 10, 400.0),
+        OrderRequest("NOPE", "BUY", 10, 1.0),
+        OrderRequest("NVDA", "HOLD", 10, 180.0),
+    ])
+    assert result["placed"] == 0
+    assert [e["index"] for e in result["errors"]] == [2]
+    assert fake_ib.calls["placeOrder"] == 0
+
+    result = await fake_broker.place_limit_orders([
+        OrderRequest("MSFT", "BUY", 10, 400.0),
+        OrderRequest("NOPE", "BUY", 10, 1.0),
+    ])
+    assert result["errors"] == [{"index": 1, "symbol": "NOPE", "error": "Unknown contract"}]
+    assert fake_ib.calls["placeOrder"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_orders_by_ids_and_filters(fake_broker, fake_ib):
+    await fake_broker.connect()
+    placed = await fake_broker.place_limit_orders([
+        OrderRequest("MSFT", "BUY", 10, 400.0),
+        OrderRequest("MSFT", "SELL", 10, 450.0),
+        OrderRequest("NVDA", "BUY", 5, 180.0),
+    ])
+    msft_buy, msft_sell, nvda_buy = (o["order_id"] for o in placed["orders"])
+
+    result = await fake_broker.cancel_orders([msft_buy, 999])
+    assert result == {"cancel_requested": [msft_buy], "not_found": [999]}
+
+    result = await fake_broker.cancel_orders(action="BUY")
+    assert result["cancel_requested"] == [nvda_buy]
+
+    result = await fake_broker.cancel_orders()
+    assert set(result["cancel_requested"]) == {msft_sell}
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ibkr_mcp.pacing import HistoricalPacer, MessageThrottle, PacingKey
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def _key(con_id: int = 1, duration: str = "1 M", what_to_show: str = "TRADES") -> PacingKey:
+    return PacingKey(con_id, "SMART", "", duration, "1 day", what_to_show, True)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _pacer(clock: FakeClock, **kwargs) -> HistoricalPacer:
+    return HistoricalPacer(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def _recorder(clock: FakeClock, log: list, name: str):
+    async def request():
+        log.append((name, clock.now))
+        return name
+
+    return request
+
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_requests_share_one_call(clock):
+    pacer = _pacer(clock)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "bars"
+
+    results = await asyncio.gather(*(pacer.run(_key(), request) for _ in range(5)))
+    assert results == ["bars"] * 5
+    assert calls == 1
+    assert pacer.stats()["deduped"] == 4
+
+
+@pytest.mark.asyncio
+async def test_identical_request_waits_fifteen_seconds(clock):
+    pacer = _pacer(clock)
+    log: list = []
+    await pacer.run(_key(), _recorder(clock, log, "first"))
+    await pacer.run(_key(), _recorder(clock, log, "second"))
+    assert log == [("first", 0.0), ("second", 15.0)]
+    assert pacer.stats()["max_wait_ms"] == 15000.0
+
+
+@pytest.mark.asyncio
+async def test_replay_of_unanswered_request_is_not_held_back(clock):
+    pacer = _pacer(clock)
+    log: list = []
+
+    async def dropped():
+        log.append(("dropped", clock.now))
+        raise ConnectionError("Socket disconnect")
+
+    with pytest.raises(ConnectionError):
+        await pacer.run(_key(), dropped)
+    await pacer.run(_key(), _recorder(clock, log, "replay"))
+    assert log == [("dropped", 0.0), ("replay", 0.0)]
+
+
+@pytest.mark.asyncio
+async def test_ten_minute_window_limit(clock):
+    pacer = _pacer(clock, max_requests=3)
+    log: list = []
+    await asyncio.gather(
+        *(pacer.run(_key(con_id=i), _recorder(clock, log, i)) for i in range(4))
+    )
+    assert [t for _, t in log] == [0.0, 0.0, 0.0, 600.0]
+
+
+@pytest.mark.asyncio
+async def test_bid_ask_counts_twice(clock):
+    pacer = _pacer(clock, max_requests=3)
+    log: list = []
+    await asyncio.gather(
+        pacer.run(_key(con_id=1, what_to_show="BID_ASK"), _recorder(clock, log, "a")),
+        pacer.run(_key(con_id=2, what_to_show="BID_ASK"), _recorder(clock, log, "b")),
+    )
+    assert log == [("a", 0.0), ("b", 600.0)]
+
+
+@pytest.mark.asyncio
+async def test_same_contract_burst_limit(clock):
+    pacer = _pacer(clock)
+    log: list = []
+    await asyncio.gather(
+        *(pacer.run(_key(duration=f"{i} D"), _recorder(clock, log, i)) for i in range(1, 7))
+    )
+    assert [t for _, t in log] == [0.0] * 5 + [2.0]
+
+
+@pytest.mark.asyncio
+async def test_priority_order_when_paced(clock):
+    pacer = _pacer(clock, max_requests=1)
+    log: list = []
+    await pacer.run(_key(con_id=0), _recorder(clock, log, "warmup"))
+    await asyncio.gather(
+        pacer.run(_key(con_id=1), _recorder(clock, log, "backfill"), priority=1),
+        pacer.run(_key(con_id=2), _recorder(clock, log, "fresh"), priority=0),
+    )
+    assert [name for name, _ in log] == ["warmup", "fresh", "backfill"]
+    assert pacer.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_message_throttle_spaces_bursts(clock):
+    throttle = MessageThrottle(rate=10, clock=clock, sleep=clock.sleep)
+    sent = []
+    for _ in range(5):
+        await throttle.acquire()
+        sent.append(round(clock.now, 6))
+    assert sent == [0.0, 0.1, 0.2, 0.3, 0.4]
+
+    clock.now += 5
+    await throttle.acquire()
+    assert throttle.stats() == {"sent": 6, "throttled": 4}
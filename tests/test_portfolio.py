@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from ibkr_mcp.broker import AccountSummary, Position
+from ibkr_mcp.portfolio import (
+    PortfolioFrame,
+    combine_summaries,
+    load_snapshot,
+    merge_positions,
+)
+from tests.conftest import MOCK_POSITIONS, MOCK_SUMMARY
+
+
+@pytest.mark.asyncio
+async def test_load_snapshot_fetches_concurrently(mock_broker):
+    in_flight = peak = 0
+
+    def tracked(result):
+        async def call():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return result
+
+        return call
+
+    mock_broker.get_positions.side_effect = tracked(MOCK_POSITIONS)
+    mock_broker.get_account_summary.side_effect = tracked(MOCK_SUMMARY)
+
+    snapshot = await load_snapshot(mock_broker)
+
+    assert snapshot.positions == MOCK_POSITIONS
+    assert snapshot.summary == MOCK_SUMMARY
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_weighted_positions_sorted_by_weight(mock_broker):
+    snapshot = await load_snapshot(mock_broker)
+    weighted = snapshot.weighted_positions()
+    assert [p["symbol"] for p in weighted] == ["MSFT", "ARCC", "NVDA"]
+    assert weighted[0]["weight_pct"] == round(45667.60 / 147527.00 * 100, 2)
+
+
+def test_frame_records_match_position_dicts():
+    frame = PortfolioFrame(MOCK_POSITIONS)
+    assert frame.records() == [p.to_dict() for p in MOCK_POSITIONS]
+
+
+def test_frame_top_k_and_group_sum():
+    frame = PortfolioFrame(MOCK_POSITIONS)
+    assert frame.top_k(frame.market_value, 2).tolist() == [0, 1]
+    assert frame.top_k(frame.market_value).tolist() == [0, 1, 2]
+    assert frame.top_k(frame.market_value, 0).tolist() == []
+    sums = frame.group_sum(np.array(["USD", "EUR", "USD"], dtype=object), frame.shares)
+    assert sums == {"EUR": 1643.0, "USD": 174.0}
+    assert PortfolioFrame([]).group_sum(frame.currency[:0], frame.shares[:0]) == {}
+
+
+def _vwce(shares: float = 300) -> Position:
+    return Position(
+        symbol="VWCE", sec_type="STK", exchange="IBIS2", currency="EUR", shares=shares,
+        avg_cost=88.0, market_price=95.10, market_value=shares * 95.10,
+        unrealized_pnl=shares * 7.10, realized_pnl=0,
+    )
+
+
+def test_frame_converts_to_base_currency():
+    frame = PortfolioFrame([*MOCK_POSITIONS, _vwce()], {"EUR": 1.08, "USD": 1.0})
+    assert frame.fx.tolist() == [1.0, 1.0, 1.0, 1.08]
+    assert frame.market_value_base[3] == pytest.approx(28530.0 * 1.08)
+    assert frame.weights(100000.0)[3] == pytest.approx(0.308124)
+    exposure = frame.exposures(100000.0)["by_currency"]
+    assert exposure["EUR"] == 30.81
+
+
+@pytest.mark.asyncio
+async def test_load_snapshot_fetches_fx_for_foreign_positions(mock_broker):
+    mock_broker.get_positions.return_value = [*MOCK_POSITIONS, _vwce()]
+    mock_broker.get_fx_rates = AsyncMock(return_value={"EUR": 1.08})
+    snapshot = await load_snapshot(mock_broker)
+    mock_broker.get_fx_rates.assert_awaited_once_with({"EUR"}, "USD")
+    assert snapshot.fx_missing == []
+    weighted = {p["symbol"]: p for p in snapshot.weighted_positions()}
+    assert weighted["VWCE"]["market_value"] == 28530.0
+    assert weighted["VWCE"]["market_value_base"] == 30812.4
+    assert weighted["VWCE"]["weight_pct"] == round(30812.4 / 147527.0 * 100, 2)
+
+
+@pytest.mark.asyncio
+async def test_load_snapshot_single_currency_skips_fx(mock_broker):
+    mock_broker.get_fx_rates = AsyncMock()
+    snapshot = await load_snapshot(mock_broker)
+    mock_broker.get_fx_rates.assert_not_awaited()
+    assert snapshot.fx_rates == {}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_missing_rates(mock_broker):
+    mock_broker.get_positions.return_value = [*MOCK_POSITIONS, _vwce()]
+    mock_broker.get_fx_rates = AsyncMock(return_value={})
+    snapshot = await load_snapshot(mock_broker)
+    assert snapshot.fx_missing == ["EUR"]
+    assert snapshot.frame.market_value_base[3] == 28530.0
+
+
+def test_merge_positions_sums_holdings_across_accounts():
+    msft = MOCK_POSITIONS[0]
+    other = Position(
+        "MSFT", "STK", "NASDAQ", "USD", 50, 400.0, 426.80, 21340.0, 1340.0, 0, con_id=272093
+    )
+    merged = merge_positions([msft, MOCK_POSITIONS[1], other])
+    assert [p.symbol for p in merged] == ["MSFT", "ARCC"]
+    assert merged[0].shares == 157
+    assert merged[0].avg_cost == pytest.approx((107 * 380.50 + 50 * 400.0) / 157)
+    assert merged[0].market_value == pytest.approx(45667.60 + 21340.0)
+    assert merged[0].unrealized_pnl == pytest.approx(4954.10 + 1340.0)
+
+
+def test_combine_summaries_converts_to_base():
+    eur = AccountSummary(10000.0, 1000.0, 2000.0, 50.0, 0.0, cash=500.0, currency="EUR", as_of=5.0)
+    usd = replace(MOCK_SUMMARY, as_of=9.0)
+    total = combine_summaries([usd, eur], "USD", {"EUR": 1.08})
+    assert total.nav == pytest.approx(147527.0 + 10800.0)
+    assert total.cash == pytest.approx(540.0)
+    assert total.currency == "USD"
+    assert total.as_of == 5.0
+    assert combine_summaries([MOCK_SUMMARY, eur], "USD", {}).as_of is None
+
+
+@pytest.mark.asyncio
+async def test_load_snapshot_consolidates_accounts(fake_broker, sub_accounts):
+    snapshot = await load_snapshot(fake_broker, ["U16261491", "U2", "U3"])
+    assert list(snapshot.accounts) == ["U16261491", "U2", "U3"]
+    assert snapshot.summary.nav == 147527.0 + 30000.0 + 2000.0
+    shares = dict(zip(snapshot.frame.symbol.tolist(), snapshot.frame.shares.tolist()))
+    assert shares == {"MSFT": 150, "NVDA": 10, "ARCC": 100}
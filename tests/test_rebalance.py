@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ibkr_mcp.rebalance import Universe, plan_rebalance
+
+
+def _universe(**overrides) -> Universe:
+    columns = {
+        "symbol": np.array(["MSFT", "NVDA", "VWCE", "AGGG"], dtype=object),
+        "currency": np.array(["USD", "USD", "EUR", "EUR"], dtype=object),
+        "price": np.array([426.80, 185.45, 95.10, 5.20]),
+        "fx": np.array([1.0, 1.0, 1.08, 1.08]),
+        "shares": np.array([100.0, 200.0, 0.0, 0.0]),
+        "avg_cost": np.array([380.0, 120.0, 0.0, 0.0]),
+        "target": np.array([0.3, 0.0, 0.5, 0.2]),
+    }
+    columns.update(overrides)
+    return Universe(**columns)
+
+
+def test_whole_shares_within_cash():
+    u = _universe()
+    plan = plan_rebalance(u, cash=5000.0, reserve_pct=1.0)
+
+    assert np.array_equal(plan.final_shares, np.round(plan.final_shares))
+    assert plan.final_shares[1] == 0
+    after = plan.cash_after(plan.final_shares)
+    assert after >= plan.reserve
+    # Nothing left over that would buy another share of an underweight target.
+    assert after - plan.reserve < u.unit_value[2]
+    planned = {p["symbol"]: p["planned_weight_pct"] for p in plan.positions()}
+    assert planned["VWCE"] == pytest.approx(49.5, abs=0.15)
+
+
+def test_fractional_holdings_trade_whole_shares():
+    u = _universe(
+        shares=np.array([10.5, 200.25, 0.0, 0.0]),
+        target=np.array([0.0, 0.5, 0.5, 0.0]),
+    )
+    plan = plan_rebalance(u, cash=0.0)
+
+    assert plan.final_shares[0] == 0.5
+    assert np.array_equal(plan.final_shares - u.shares, np.round(plan.final_shares - u.shares))
+    orders = {o["symbol"]: o for o in plan.orders(u.shares, plan.final_shares)}
+    assert orders["MSFT"]["quantity"] == 10
+    assert orders["MSFT"]["estimated_value"] == round(10 * 426.80, 2)
+    traded = sum(
+        (1 if o["action"] == "SELL" else -1) * o["estimated_value"] for o in orders.values()
+    )
+    assert plan.cash_after(plan.final_shares) == pytest.approx(traded, abs=0.05)
+
+
+def test_tolerance_band_and_min_trade_value_skip_trades():
+    u = _universe(target=np.array([0.5, 0.45, 0.05, 0.0]))
+    plan = plan_rebalance(u, cash=0.0, tolerance_pct=5.0, min_trade_value=10_000)
+
+    # MSFT (50.35%) and NVDA (43.75%) are within 5 points; the VWCE buy is too small.
+    assert plan.final_shares.tolist() == [100, 200, 0, 0]
+    assert plan.orders(u.shares, plan.final_shares) == []
+
+
+def test_trims_buys_when_cash_is_short():
+    # MSFT is kept overweight by the tolerance band, so the NVDA buy must fit the cash.
+    u = _universe(
+        shares=np.array([100.0, 0.0, 0.0, 0.0]),
+        target=np.array([0.7, 0.3, 0.0, 0.0]),
+    )
+    plan = plan_rebalance(u, cash=10_000.0, tolerance_pct=15.0)
+    assert plan.final_shares.tolist() == [100, 53, 0, 0]
+    assert plan.cash_after(plan.final_shares) == pytest.approx(10_000 - 53 * 185.45)
+
+
+def test_phases_split_every_trade():
+    u = _universe()
+    plan = plan_rebalance(u, cash=0.0, phases=3)
+    phases = plan.phases()
+    assert len(phases) == 3
+
+    totals: dict[str, int] = {}
+    for phase in phases:
+        actions = [o["action"] for o in phase["orders"]]
+        assert actions == sorted(actions, reverse=True)  # sells first
+        for o in phase["orders"]:
+            totals[o["symbol"]] = totals.get(o["symbol"], 0) + o["quantity"]
+    final = plan.orders(u.shares, plan.final_shares)
+    assert totals == {o["symbol"]: o["quantity"] for o in final}
+    assert phases[-1]["cash_after"] == round(plan.cash_after(plan.final_shares), 2)
+
+
+def test_sell_reports_capital_gain_in_base_currency():
+    u = _universe(
+        fx=np.array([0.9, 0.9, 1.0, 1.0]),
+        target=np.array([0.0, 1.0, 0.0, 0.0]),
+    )
+    plan = plan_rebalance(u, cash=0.0)
+    (sell,) = [o for o in plan.orders(u.shares, plan.final_shares) if o["action"] == "SELL"]
+    assert sell["symbol"] == "MSFT"
+    assert sell["capital_gain"] == round(100 * (426.80 - 380.0) * 0.9, 2)
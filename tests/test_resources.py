@@ -43,3 +43,21 @@ async def test_portfolio_snapshot_resource(mock_ctx):
     assert "positions" in data
     assert "summary" in data
     assert data["total_positions"] == 3
+
+
+@pytest.mark.asyncio
+async def test_resource_payload_cached_until_broker_data_changes(mock_ctx, mock_broker):
+    first = await positions_resource(mock_ctx)
+    second = await positions_resource(mock_ctx)
+    assert first is second
+    assert mock_broker.get_positions_json.await_count == 1
+
+    mock_broker._ib.updatePortfolioEvent.emit(None)
+    await positions_resource(mock_ctx)
+    assert mock_broker.get_positions_json.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resources_compact_by_default(mock_ctx):
+    result = await account_summary_resource(mock_ctx)
+    assert "\n" not in result
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ibkr_mcp.serialization import PayloadCache, dumps
+
+
+def test_dumps_compact_and_pretty():
+    data = {"nav": 147527.0, "positions": [{"symbol": "MSFT"}]}
+    compact = dumps(data)
+    assert " " not in compact and "\n" not in compact
+    assert json.loads(compact) == data
+    pretty = dumps(data, pretty=True)
+    assert "\n  " in pretty
+    assert json.loads(pretty) == data
+
+
+@pytest.mark.asyncio
+async def test_payload_cache_reuses_until_version_changes():
+    clock_now = [0.0]
+    cache = PayloadCache(max_age=60, clock=lambda: clock_now[0])
+    encoded = 0
+
+    async def encode() -> str:
+        nonlocal encoded
+        encoded += 1
+        return f"payload-{encoded}"
+
+    assert await cache.get("positions", 1, encode) == "payload-1"
+    assert await cache.get("positions", 1, encode) == "payload-1"
+    assert await cache.get("positions", 2, encode) == "payload-2"
+    clock_now[0] = 61.0
+    assert await cache.get("positions", 2, encode) == "payload-3"
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from ibkr_mcp.broker import Broker
+from ibkr_mcp.server import mcp
+from tests.fake_ib import FakeIB
+
+
+@pytest.mark.asyncio
+async def test_server_serves_before_gateway_connects():
+    ib = FakeIB()
+    ib.connect_delay = 0.5
+    brokers: list[Broker] = []
+
+    def make_broker(config):
+        brokers.append(Broker(config, ib=ib))
+        return brokers[0]
+
+    with patch("ibkr_mcp.broker.Broker", make_broker):
+        async with create_connected_server_and_client_session(mcp) as session:
+            tools = await session.list_tools()
+            # Listed while the background connect is still waiting on the gateway.
+            assert brokers[0]._supervisor.reconnecting
+            assert not ib.isConnected()
+
+            result = await session.call_tool("get_account_summary", {})
+            assert ib.isConnected()
+
+    assert any(t.name == "get_account_summary" for t in tools.tools)
+    assert json.loads(result.content[0].text)["nav"] == 147527.00
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from ib_async import Stock
+
+from ibkr_mcp.subscriptions import SubscriptionManager
+from tests.fake_ib import CONTRACTS, FakeIB
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _contract(symbol: str) -> Stock:
+    return Stock(symbol, "SMART", "USD", conId=CONTRACTS[symbol][0])
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_at_line_limit():
+    ib = FakeIB()
+    manager = SubscriptionManager(ib, max_lines=2)
+    for symbol in ("MSFT", "NVDA", "MSFT", "ARCC"):
+        async with manager.ticker(_contract(symbol)):
+            pass
+
+    # NVDA was least recently used when ARCC needed a line.
+    assert ib.calls["reqMktData"] == 3
+    assert ib.calls["cancelMktData"] == 1
+    assert manager.stats()["evictions"] == 1
+    async with manager.ticker(_contract("MSFT")):
+        pass
+    assert ib.calls["reqMktData"] == 3
+
+
+@pytest.mark.asyncio
+async def test_in_use_subscription_is_not_evicted():
+    ib = FakeIB()
+    manager = SubscriptionManager(ib, max_lines=1)
+    released = asyncio.Event()
+
+    async def hold_msft():
+        async with manager.ticker(_contract("MSFT")):
+            await released.wait()
+
+    holder = asyncio.create_task(hold_msft())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(manager.ticker(_contract("NVDA")).__aenter__())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    assert ib.calls["cancelMktData"] == 0
+
+    released.set()
+    await holder
+    ticker = await waiter
+    assert ticker.contract.symbol == "NVDA"
+    assert ib.calls["cancelMktData"] == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_subscriptions_expire():
+    clock = FakeClock()
+    ib = FakeIB()
+    manager = SubscriptionManager(ib, max_lines=10, idle_ttl=60, clock=clock)
+    async with manager.ticker(_contract("MSFT")):
+        pass
+    clock.now += 61
+    async with manager.ticker(_contract("NVDA")):
+        pass
+    assert len(manager) == 1
+    assert ib.calls["cancelMktData"] == 1
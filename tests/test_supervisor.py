@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from ib_async import Stock
+
+from ibkr_mcp.supervisor import ConnectionSupervisor
+
+
+@pytest.mark.asyncio
+async def test_reconnect_backs_off_exponentially():
+    failures = 0
+    delays: list[float] = []
+
+    async def connect() -> None:
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise ConnectionRefusedError("gateway restarting")
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    connected = []
+    supervisor = ConnectionSupervisor(
+        connect, on_connect=lambda: connected.append(1), initial_delay=1, max_delay=3, sleep=sleep
+    )
+    await supervisor.start()
+    failures = 3
+    supervisor.connection_lost()
+    assert not supervisor.is_ready
+    await supervisor.wait_ready(1.0)
+
+    assert delays == [1, 2, 3]
+    assert connected == [1, 1]
+    assert supervisor.stats()["reconnects"] == 1
+    assert supervisor.stats()["failed_attempts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_wait_ready_times_out():
+    async def connect() -> None:
+        raise ConnectionRefusedError()
+
+    supervisor = ConnectionSupervisor(connect, initial_delay=10)
+    supervisor.connection_lost()
+    with pytest.raises(ConnectionError):
+        await supervisor.wait_ready(0.01)
+    supervisor.close()
+
+
+@pytest.mark.asyncio
+async def test_no_reconnect_after_close():
+    calls = 0
+
+    async def connect() -> None:
+        nonlocal calls
+        calls += 1
+
+    supervisor = ConnectionSupervisor(connect)
+    await supervisor.start()
+    supervisor.close()
+    supervisor.connection_lost()
+    await asyncio.sleep(0)
+    assert calls == 1
+    assert supervisor.is_ready
+
+
+@pytest.mark.asyncio
+async def test_broker_retries_read_across_gateway_restart(fake_broker, fake_ib, mock_config):
+    mock_config.reconnect_initial_delay = 0.01
+    await fake_broker.connect()
+    fake_ib.latency = 0.02
+
+    fetch = asyncio.ensure_future(fake_broker.get_account_summary(refresh=True))
+    await asyncio.sleep(0.005)
+    fake_ib.disconnect()
+    summary = await fetch
+
+    assert summary.nav == 147527.00
+    assert fake_ib.calls["accountSummaryAsync"] == 2
+    assert fake_ib.calls["connectAsync"] == 2
+    assert fake_broker.stats()["connection"]["reconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_market_data_resubscribed_after_reconnect(fake_broker, fake_ib):
+    await fake_broker.connect()
+    await fake_broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+    assert fake_ib.calls["reqMktData"] == 1
+
+    fake_ib.disconnect()
+    await fake_broker._supervisor.wait_ready(1.0)
+    assert fake_ib.calls["reqMktData"] == 2
+
+    quote = await fake_broker.get_market_price(Stock("MSFT", "SMART", "USD"))
+    assert quote["last"] == 426.80
+    assert fake_ib.calls["reqMktData"] == 2
+
+
+@pytest.mark.asyncio
+async def test_intentional_disconnect_does_not_reconnect(fake_broker, fake_ib):
+    await fake_broker.connect()
+    await fake_broker.disconnect()
+    await asyncio.sleep(0.1)
+    assert not fake_ib.isConnected()
+    assert fake_ib.calls["connectAsync"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_start_gates_requests(fake_broker, fake_ib):
+    fake_ib.connect_delay = 0.1
+    fake_broker.start()
+    assert not fake_broker.is_connected
+
+    summary = await fake_broker.get_account_summary()
+    assert fake_ib.isConnected()
+    assert summary.nav == 147527.00
+    assert fake_broker.stats()["connection"]["reconnects"] == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_fail_when_gateway_stays_down(fake_broker, fake_ib, mock_config):
+    mock_config.reconnect_timeout = 0.05
+    fake_ib.refuse_connect = True
+    fake_broker.start()
+    with pytest.raises(ConnectionError, match="not connected"):
+        await fake_broker.get_positions()
+    await fake_broker.disconnect()
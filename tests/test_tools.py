@@ -1,11 +1,26 @@
 from __future__ import annotations
 
+from unittest.mock import AsyncMock
+
 import pytest
 
-from ibkr_mcp.tools.account import get_account_summary, get_nav, get_open_orders, get_positions
-from ibkr_mcp.tools.market import get_historical_bars, get_quote, search_contracts
-from ibkr_mcp.tools.trading import cancel_order, place_order
+from ibkr_mcp.tools.account import (
+    get_account_summary,
+    get_nav,
+    get_open_orders,
+    get_positions,
+    wait_for_order,
+)
+from ibkr_mcp.tools.market import get_historical_bars, get_quote, get_quotes, search_contracts
+from ibkr_mcp.tools.trading import (
+    OrderSpec,
+    cancel_order,
+    cancel_orders,
+    place_order,
+    place_orders,
+)
 from ibkr_mcp.tools.analysis import concentration_check, portfolio_snapshot, transition_plan
+from ibkr_mcp.tools.diagnostics import server_metrics
 
 
 # --- Account tools ---
@@ -13,7 +28,7 @@ from ibkr_mcp.tools.analysis import concentration_check, portfolio_snapshot, tra
 
 @pytest.mark.asyncio
 async def test_get_positions(mock_ctx):
-    result = await get_positions(mock_ctx)
+    result = await get_positions(ctx=mock_ctx)
     assert isinstance(result, list)
     assert len(result) == 3
     assert result[0]["symbol"] == "MSFT"
@@ -23,7 +38,7 @@ async def test_get_positions(mock_ctx):
 
 @pytest.mark.asyncio
 async def test_get_account_summary(mock_ctx):
-    result = await get_account_summary(mock_ctx)
+    result = await get_account_summary(ctx=mock_ctx)
     assert result["nav"] == 147527.00
     assert result["currency"] == "USD"
     assert "buying_power" in result
@@ -31,7 +46,7 @@ async def test_get_account_summary(mock_ctx):
 
 @pytest.mark.asyncio
 async def test_get_nav(mock_ctx):
-    result = await get_nav(mock_ctx)
+    result = await get_nav(ctx=mock_ctx)
     assert result["nav"] == 147527.00
 
 
@@ -42,6 +57,14 @@ async def test_get_open_orders(mock_ctx):
     assert len(result) == 0
 
 
+@pytest.mark.asyncio
+async def test_wait_for_order(mock_ctx):
+    result = await wait_for_order(42, timeout=1000, ctx=mock_ctx)
+    assert result["reached"]
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.wait_for_order_state.assert_awaited_once_with(42, ["Filled"], 300.0)
+
+
 # --- Market tools ---
 
 
@@ -52,6 +75,14 @@ async def test_get_quote(mock_ctx):
     assert result["last"] == 426.80
 
 
+@pytest.mark.asyncio
+async def test_get_quotes(mock_ctx):
+    result = await get_quotes(["MSFT", "NVDA"], ctx=mock_ctx)
+    assert [q["symbol"] for q in result] == ["MSFT", "NVDA"]
+    contracts = mock_ctx.request_context.lifespan_context.broker.get_market_prices.call_args[0][0]
+    assert [c.symbol for c in contracts] == ["MSFT", "NVDA"]
+
+
 @pytest.mark.asyncio
 async def test_get_historical_bars(mock_ctx):
     result = await get_historical_bars("MSFT", ctx=mock_ctx)
@@ -107,18 +138,117 @@ async def test_cancel_order_success(mock_ctx):
     assert result["status"] == "cancel_requested"
 
 
+@pytest.mark.asyncio
+async def test_place_orders_blocked_by_safety(mock_ctx):
+    spec = OrderSpec(symbol="VWCE", action="BUY", quantity=10, limit_price=95.0)
+    result = await place_orders([spec], ctx=mock_ctx)
+    assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_place_orders_success(mock_ctx):
+    mock_ctx.request_context.lifespan_context.config.safety_paper_only = False
+    spec = OrderSpec(symbol="VWCE", action="BUY", quantity=10, limit_price=95.0, currency="EUR")
+    result = await place_orders([spec], ctx=mock_ctx)
+    assert result["placed"] == 1
+    broker = mock_ctx.request_context.lifespan_context.broker
+    (requests,) = broker.place_limit_orders.call_args[0]
+    assert requests[0].currency == "EUR"
+
+
+@pytest.mark.asyncio
+async def test_place_orders_batch_limit(mock_ctx):
+    mock_ctx.request_context.lifespan_context.config.safety_paper_only = False
+    spec = OrderSpec(symbol="VWCE", action="BUY", quantity=1, limit_price=95.0)
+    result = await place_orders([spec] * 101, ctx=mock_ctx)
+    assert "At most 100" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_orders(mock_ctx):
+    mock_ctx.request_context.lifespan_context.config.safety_paper_only = False
+    result = await cancel_orders(symbol="VWCE", ctx=mock_ctx)
+    assert result["cancel_requested"] == [42]
+    result = await cancel_orders([42], symbol="VWCE", ctx=mock_ctx)
+    assert "either" in result["error"]
+
+
 # --- Analysis tools ---
 
 
 @pytest.mark.asyncio
 async def test_portfolio_snapshot(mock_ctx):
-    result = await portfolio_snapshot(mock_ctx)
+    result = await portfolio_snapshot(ctx=mock_ctx)
     assert "positions" in result
     assert "summary" in result
     assert result["total_positions"] == 3
     # MSFT should be first (highest weight)
     assert result["positions"][0]["symbol"] == "MSFT"
     assert "weight_pct" in result["positions"][0]
+    assert result["exposure"]["by_currency"] == {"USD": 60.84}
+    assert result["concentration_warnings"] == ["MSFT: 31.0% of NAV (exceeds 25% limit)"]
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_converts_to_base_currency(mock_ctx):
+    from ibkr_mcp.broker import Position
+    from tests.conftest import MOCK_POSITIONS
+
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.get_positions.return_value = [
+        *MOCK_POSITIONS,
+        Position("VWCE", "STK", "IBIS2", "EUR", 400, 88.0, 95.10, 38040.0, 2840.0, 0),
+    ]
+    broker.get_fx_rates = AsyncMock(return_value={"EUR": 1.08})
+    result = await portfolio_snapshot(ctx=mock_ctx)
+    assert result["base_currency"] == "USD"
+    assert result["fx_rates"] == {"EUR": 1.08}
+    assert result["positions"][1]["symbol"] == "VWCE"
+    assert result["positions"][1]["weight_pct"] == 27.85
+    assert result["exposure"]["by_currency"] == {"EUR": 27.85, "USD": 60.84}
+    assert "fx_missing" not in result
+
+    broker.get_fx_rates.return_value = {}
+    result = await concentration_check(threshold_pct=25.0, ctx=mock_ctx)
+    assert [p["symbol"] for p in result["flagged_positions"]] == ["MSFT", "VWCE"]
+    assert result["flagged_positions"][1]["market_value_base"] == 38040.0
+
+
+@pytest.mark.asyncio
+async def test_tools_accept_accounts(fake_ctx, fake_broker, sub_accounts):
+    await fake_broker.connect()
+    positions = await get_positions(accounts=["U2", "U3"], ctx=fake_ctx)
+    assert [(p["account"], p["symbol"]) for p in positions] == [
+        ("U2", "MSFT"), ("U2", "NVDA"), ("U3", "ARCC"),
+    ]
+
+    summary = await get_account_summary(accounts="ALL", ctx=fake_ctx)
+    assert list(summary["accounts"]) == ["U16261491", "U2", "U3"]
+    assert summary["total"]["nav"] == 179527.0
+
+    nav = await get_nav(accounts=["U2"], ctx=fake_ctx)
+    assert nav["nav"] == 30000.0
+    assert nav["accounts"] == {"U2": {"nav": 30000.0, "currency": "USD"}}
+
+    snapshot = await portfolio_snapshot(accounts="ALL", ctx=fake_ctx)
+    assert snapshot["summary"]["nav"] == 179527.0
+    assert [p["symbol"] for p in snapshot["positions"]] == ["MSFT", "ARCC", "NVDA"]
+    assert snapshot["positions"][0]["shares"] == 150
+    assert set(snapshot["accounts"]) == {"U16261491", "U2", "U3"}
+
+    result = await concentration_check(threshold_pct=25.0, accounts="ALL", ctx=fake_ctx)
+    assert [p["symbol"] for p in result["flagged_positions"]] == ["MSFT"]
+    assert result["accounts"] == ["U16261491", "U2", "U3"]
+
+    assert await get_positions(accounts=["U9"], ctx=fake_ctx) == {"error": "Unknown accounts: U9"}
+    assert "error" in await portfolio_snapshot(accounts=[], ctx=fake_ctx)
+
+
+@pytest.mark.asyncio
+async def test_portfolio_snapshot_limit(mock_ctx):
+    result = await portfolio_snapshot(limit=2, ctx=mock_ctx)
+    assert [p["symbol"] for p in result["positions"]] == ["MSFT", "ARCC"]
+    assert result["total_positions"] == 3
 
 
 @pytest.mark.asyncio
@@ -140,13 +270,85 @@ async def test_concentration_check_high_threshold(mock_ctx):
 
 @pytest.mark.asyncio
 async def test_transition_plan(mock_ctx):
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.get_market_prices.return_value = [
+        {"symbol": "VWCE", "last": 95.10, "close": 94.80, "bid": 95.05, "ask": 95.15},
+        {"symbol": "AGGG", "last": 5.20, "close": 5.21, "bid": 5.19, "ask": 5.21},
+        {"symbol": "IBC1", "last": None, "close": None, "bid": 40.0, "ask": 40.2},
+    ]
+    broker.get_fx_rates = AsyncMock(return_value={"EUR": 1.08})
     targets = {"VWCE": 0.7, "AGGG": 0.2, "IBC1": 0.1}
-    result = await transition_plan(targets, ctx=mock_ctx)
-    assert "sells" in result
-    assert "buys" in result
-    assert len(result["sells"]) == 3
-    assert len(result["buys"]) == 3
+    currencies = {"VWCE": "EUR", "AGGG": "EUR", "IBC1": "EUR"}
+
+    result = await transition_plan(targets, currencies=currencies, ctx=mock_ctx)
+
+    assert [o["symbol"] for o in result["sells"]] == ["MSFT", "ARCC", "NVDA"]
+    assert [o["quantity"] for o in result["sells"]] == [107, 1643, 67]
+    assert [o["symbol"] for o in result["buys"]] == ["VWCE", "AGGG", "IBC1"]
+    assert all(isinstance(o["quantity"], int) for o in result["buys"])
+    assert result["buys"][2]["limit_price"] == 40.1
+    assert result["buys"][0]["currency"] == "EUR"
+    assert result["total_purchases"] <= result["total_proceeds"]
+    assert 0 <= result["cash"]["after"] < 40.2 * 1.08
+    assert result["fx_rates"] == {"EUR": 1.08}
     assert result["note"].startswith("This is a read-only plan")
+    contracts = broker.get_market_prices.call_args[0][0]
+    assert [(c.symbol, c.currency) for c in contracts] == [
+        ("VWCE", "EUR"), ("AGGG", "EUR"), ("IBC1", "EUR")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transition_plan_keeps_held_targets_and_phases(mock_ctx):
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.get_market_prices.return_value = []
+    broker.get_fx_rates = AsyncMock(return_value={})
+    targets = {"MSFT": 0.4, "ARCC": 0.35, "NVDA": 0.25}
+
+    result = await transition_plan(targets, tolerance_pct=2.0, phases=2, ctx=mock_ctx)
+
+    assert [o["symbol"] for o in result["sells"]] == ["MSFT"]
+    assert [o["symbol"] for o in result["buys"]] == ["NVDA"]
+    positions = {p["symbol"]: p for p in result["positions"]}
+    assert positions["ARCC"]["target_shares"] == 1643
+    phase_sells = [
+        o["quantity"] for p in result["phases"] for o in p["orders"] if o["action"] == "SELL"
+    ]
+    assert len(phase_sells) == 2
+    assert sum(phase_sells) == result["sells"][0]["quantity"]
+
+
+@pytest.mark.asyncio
+async def test_transition_plan_plans_stocks_only(mock_ctx):
+    from ibkr_mcp.broker import Position
+
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.get_positions.return_value = [
+        Position("MSFT", "OPT", "SMART", "USD", 2, 550.0, 6.0, 1200.0, 100.0, 0, con_id=7001),
+        Position("MSFT", "STK", "NASDAQ", "USD", 100, 380.0, 426.8, 42680.0, 4680.0, 0, con_id=272093),
+    ]
+    broker.get_market_prices.return_value = [
+        {"symbol": "VWCE", "last": 95.10, "close": 94.80, "bid": 95.05, "ask": 95.15},
+    ]
+    broker.get_fx_rates = AsyncMock(return_value={})
+
+    result = await transition_plan({"VWCE": 1.0}, ctx=mock_ctx)
+
+    assert [(o["symbol"], o["quantity"], o["limit_price"]) for o in result["sells"]] == [
+        ("MSFT", 100, 426.8)
+    ]
+    assert result["buys"][0]["symbol"] == "VWCE"
+    assert result["buys"][0]["quantity"] == 448  # 42680 / 95.10, rounded down
+    assert result["excluded"] == [{"symbol": "MSFT", "sec_type": "OPT", "con_id": 7001}]
+
+
+@pytest.mark.asyncio
+async def test_transition_plan_unpriced_target(mock_ctx):
+    broker = mock_ctx.request_context.lifespan_context.broker
+    broker.get_market_prices.return_value = [{"symbol": "NOPE", "error": "Unknown contract"}]
+    broker.get_fx_rates = AsyncMock(return_value={})
+    result = await transition_plan({"NOPE": 1.0}, ctx=mock_ctx)
+    assert result["symbols"] == ["NOPE"]
 
 
 @pytest.mark.asyncio
@@ -154,3 +356,13 @@ async def test_transition_plan_bad_weights(mock_ctx):
     targets = {"VWCE": 0.5, "AGGG": 0.2}
     result = await transition_plan(targets, ctx=mock_ctx)
     assert "error" in result
+
+
+# --- Diagnostics tools ---
+
+
+@pytest.mark.asyncio
+async def test_server_metrics(mock_ctx):
+    result = await server_metrics(mock_ctx)
+    assert "calls" in result
+    assert {"contracts", "market_data", "payloads", "connection"} <= set(result["components"])